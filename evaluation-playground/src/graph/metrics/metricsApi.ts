@@ -351,5 +351,28 @@ export class MetricsApi {
                 .then(response => response.json());
         });
     }
+
+    /**
+     * Appends a metrics export (see `downloadMetricsAsJson`) to the columnar result store of the backend.
+     * @param metricsExport The exported metrics with dataset info and visualizations
+     * @returns Promise with the stored file (relative to the store) and its number of rows
+     */
+    static storeMetricResults(metricsExport: Record<string, any>): Promise<{ path: string, rows: number }> {
+        const generatorApiUrl = useApiStore().generatorApiUrl;
+        const url = `${generatorApiUrl}/metrics/results`;
+
+        return fetch(url, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(metricsExport),
+        }).then(async response => {
+            if (!response.ok) {
+                throw new Error(`Failed to store metric results: ${response.status} ${await response.text()}`);
+            }
+            return response.json();
+        });
+    }
 }
 
@@ -4,6 +4,7 @@ import { useStorage } from '@vueuse/core'
 
 import { CommunicationGraph } from 'src/graph/commGraph'
 import { MetricsCollection, MetricResult } from 'src/graph/metrics/collection'
+import { MetricsApi } from 'src/graph/metrics/metricsApi'
 import { GraphLayouterSettings } from 'src/graph/layouter/settings/settings'
 import { SettingsCollection } from 'src/graph/layouter/settings/settingsCollection'
 import { UserInteractions } from 'src/graph/visualizations/interactions'
@@ -252,6 +253,10 @@ export const useGraphStore = defineStore('graph', {
                 csvSummary: csvString
             };
 
+            // Also append the results to the result store of the backend (the download does not depend on it)
+            MetricsApi.storeMetricResults(finalJson)
+                .catch(error => console.warn('Could not store the metric results in the backend', error));
+
             // Download as file
             const blob = new Blob([JSON.stringify(finalJson, null, 2)], { type: 'application/json' });
             const url = URL.createObjectURL(blob);
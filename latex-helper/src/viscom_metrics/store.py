@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Optional dependency (extra "store"), only needed to read the result store of the backend
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Directory inside the store with the index of the already read files
+INDEX_DIR = "_index"
+INDEX_FILE = "metrics.parquet"
+
+
+def list_store_files(store_dir: str) -> list[str]:
+    """Returns the paths (relative to the store) of all Parquet files of the result store, without the index."""
+    files = []
+    for root, dirs, file_names in os.walk(store_dir):
+        if root == store_dir and INDEX_DIR in dirs:
+            dirs.remove(INDEX_DIR)
+        files.extend(os.path.relpath(os.path.join(root, name), store_dir) for name in file_names if name.endswith(".parquet"))
+    return sorted(files)
+
+
+def read_store_files(store_dir: str, files: list[str]) -> "pa.Table":
+    """Reads the given files of the store, with the file of each row (relative to the store) in the column "file"."""
+    tables = []
+    for file in files:
+        table = pq.read_table(os.path.join(store_dir, file))
+        # Store the files relative to the store, so that the index stays valid if the store is moved
+        tables.append(table.append_column("file", pa.array([file] * table.num_rows, pa.string())))
+    return pa.concat_tables(tables)
+
+
+def update_store_index(store_dir: str) -> "pa.Table":
+    """
+    Returns all rows of the result store and updates the index of the store.
+
+    As the store is append-only, the index (one Parquet file with the rows of all files read so far) only has to be extended
+    by the rows of the new files. The index is rewritten atomically, a missing or broken index is rebuilt.
+    """
+    index_path = os.path.join(store_dir, INDEX_DIR, INDEX_FILE)
+
+    index = None
+    if os.path.exists(index_path):
+        try:
+            index = pq.read_table(index_path)
+        except (OSError, pa.ArrowInvalid) as e:
+            print(f"Rebuilding the index of {store_dir}: {e}")
+
+    indexed_files = set(index.column("file").unique().to_pylist()) if index is not None else set()
+    new_files = [file for file in list_store_files(store_dir) if file not in indexed_files]
+    if not new_files:
+        return index
+
+    new_rows = read_store_files(store_dir, new_files)
+    index = pa.concat_tables([index, new_rows.cast(index.schema)]) if index is not None else new_rows
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    temp_path = f"{index_path}.tmp"
+    pq.write_table(index, temp_path)
+    os.replace(temp_path, index_path)
+    return index
+
+
+def get_all_metrics_from_store(store_dir: str) -> pd.DataFrame:
+    """
+    Loads all metric results of the columnar result store of the backend (see viscom_backend.metrics.results_store).
+
+    Returns the same columns as `get_all_metrics_from_dir`: name, type, one col for each metric, title, nodes and connections,
+    with one row per visualization of each stored export.
+    """
+    if pa is None:
+        raise ImportError("Reading the result store requires pyarrow (install the 'store' extra of viscom-metrics)")
+
+    if not os.path.isdir(store_dir):
+        raise FileNotFoundError(f"Result store {store_dir} not found")
+
+    index = update_store_index(store_dir)
+    if index is None:
+        return pd.DataFrame(columns=["name", "type", "title", "nodes", "connections"])
+
+    long_df = index.to_pandas()
+
+    # One row per visualization of each export, one col for each metric
+    keys = ["file", "visualization_id", "visualization_name", "visualization_type", "dataset", "node_count", "connection_count"]
+    df = long_df.groupby([*keys, "metric"], sort=False, dropna=False)["value"].first().unstack("metric")
+    df.columns.name = None
+    df = df.reset_index()
+
+    # Distinguish the variants of the viscom visualizations by their name
+    names = df["visualization_name"].str.lower()
+    df["visualization_type"] = np.where(
+        df["visualization_type"] == "viscom",
+        np.select([names.str.contains("comm"), names.str.contains("virtual")], ["viscomComm", "viscomVirtual"], "viscomDefault"),
+        df["visualization_type"],
+    )
+
+    metric_cols = [col for col in df.columns if col not in keys]
+    df = df.rename(
+        columns={
+            "visualization_name": "name",
+            "visualization_type": "type",
+            "dataset": "title",
+            "node_count": "nodes",
+            "connection_count": "connections",
+        }
+    )
+    return df[["name", "type", *metric_cols, "title", "nodes", "connections"]]
@@ -1,5 +1,7 @@
+import hashlib
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 import pandas as pd
 
@@ -75,31 +77,93 @@ def get_metric_df_from_file(filepath: str) -> pd.DataFrame:
     return df
 
 
-def get_all_metrics_from_dir(dirpath: str) -> pd.DataFrame:
-    concatenated_df: pd.DataFrame = None  # type: ignore
-    # Get all files in the directory
-    files = os.listdir(dirpath)
+# Parsed files of this session, keyed by (path, mtime, size)
+_metric_df_cache: dict[tuple[str, int, int], pd.DataFrame] = {}
 
-    for file_name in files:
-        # Get the full path of the file
-        file = os.path.join(dirpath, file_name)
+# Directory (inside the metrics directory) with the parsed files of previous sessions
+CACHE_DIR_NAME = ".metrics_cache"
 
-        # Skip the file if it is a directory
-        if os.path.isdir(file):
-            continue
 
-        # Check if the file is a json file
-        if not file.endswith(".json"):
-            continue
+def get_file_cache_key(filepath: str) -> tuple[str, int, int]:
+    stat = os.stat(filepath)
+    return (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
 
-        df = get_metric_df_from_file(file)
-        # print(f"File: {file}, Rows: {len(df)}")
-        if concatenated_df is None:
-            concatenated_df = df
-        else:
-            concatenated_df = pd.concat([concatenated_df, df], ignore_index=True)
 
-    return concatenated_df
+def get_cache_file_prefix(cache_dir: str, filepath: str) -> str:
+    return os.path.join(cache_dir, hashlib.sha1(os.path.abspath(filepath).encode("utf-8")).hexdigest())
+
+
+def get_cache_file(cache_dir: str, key: tuple[str, int, int]) -> str:
+    path, mtime, size = key
+    return f"{get_cache_file_prefix(cache_dir, path)}_{mtime}_{size}.pkl"
+
+
+def read_cached_metric_df(cache_dir: str, key: tuple[str, int, int]) -> pd.DataFrame | None:
+    if key in _metric_df_cache:
+        return _metric_df_cache[key]
+    try:
+        df = pd.read_pickle(get_cache_file(cache_dir, key))
+    except Exception:
+        # Missing, corrupt or incompatible (e.g. written by another pandas version) cache files are parsed again
+        return None
+    _metric_df_cache[key] = df
+    return df
+
+
+def write_cached_metric_df(cache_dir: str, key: tuple[str, int, int], df: pd.DataFrame) -> None:
+    _metric_df_cache[key] = df
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Remove the entries of older versions of the file
+        prefix = os.path.basename(get_cache_file_prefix(cache_dir, key[0]))
+        for name in os.listdir(cache_dir):
+            if name.startswith(prefix):
+                os.remove(os.path.join(cache_dir, name))
+
+        cache_file = get_cache_file(cache_dir, key)
+        df.to_pickle(f"{cache_file}.tmp")
+        os.replace(f"{cache_file}.tmp", cache_file)
+    except OSError as e:
+        print(f"Could not cache {key[0]}: {e}")
+
+
+def get_all_metrics_from_dir(dirpath: str, cache_dir: str | None = None, max_workers: int | None = None) -> pd.DataFrame:
+    """
+    Loads the metrics of all json files in the directory.
+
+    Each parsed file is cached (in memory and as pickle in `cache_dir`, by default `.metrics_cache` inside the directory),
+    keyed by its path, modification time and size. Only new or changed files are parsed, in a process pool with
+    `max_workers` processes.
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(dirpath, CACHE_DIR_NAME)
+
+    # Get all json files in the directory
+    files = [
+        os.path.join(dirpath, file_name)
+        for file_name in os.listdir(dirpath)
+        if file_name.endswith(".json") and not os.path.isdir(os.path.join(dirpath, file_name))
+    ]
+
+    keys = {file: get_file_cache_key(file) for file in files}
+    dfs = {file: read_cached_metric_df(cache_dir, keys[file]) for file in files}
+    changed_files = [file for file, df in dfs.items() if df is None]
+
+    if len(changed_files) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            parsed_dfs = list(executor.map(get_metric_df_from_file, changed_files))
+    else:
+        parsed_dfs = [get_metric_df_from_file(file) for file in changed_files]
+
+    for file, df in zip(changed_files, parsed_dfs):
+        write_cached_metric_df(cache_dir, keys[file], df)
+        dfs[file] = df
+
+    if not dfs:
+        return None  # type: ignore
+
+    return pd.concat([dfs[file] for file in files], ignore_index=True)
 
 
 def split_camel_case(s: str, join=" ") -> str:
@@ -0,0 +1,51 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from viscom_backend.metrics.results_store import MetricsResultStore  # noqa: E402
+from viscom_metrics.store import get_all_metrics_from_store  # noqa: E402
+from viscom_metrics.util import get_all_metrics_from_dir  # noqa: E402
+
+METRICS_DIR = os.path.join(os.path.dirname(__file__), "..", "latexData", "metrics")
+EXPORTS = sorted(name for name in os.listdir(METRICS_DIR) if name.endswith(".json"))[:3]
+
+
+def normalize(df: pd.DataFrame) -> pd.DataFrame:
+    # Metrics without values are None in the JSON exports and NaN in the store
+    df = df.astype({col: float for col in df.columns if col not in ("name", "type", "title")})
+    return df.sort_values(["title", "name", "type"]).reset_index(drop=True)
+
+
+def test_store_matches_json_exports(tmp_path):
+    export_dir = tmp_path / "exports"
+    export_dir.mkdir()
+    store = MetricsResultStore(str(tmp_path / "store"))
+    for name in EXPORTS:
+        shutil.copy(os.path.join(METRICS_DIR, name), export_dir / name)
+        with open(export_dir / name) as file:
+            store.append(json.load(file))
+
+    expected = get_all_metrics_from_dir(str(export_dir), cache_dir=str(tmp_path / "cache"), max_workers=1)
+    actual = get_all_metrics_from_store(store.directory)
+
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(normalize(actual), normalize(expected))
+
+
+def test_index_is_extended_incrementally(tmp_path):
+    store = MetricsResultStore(str(tmp_path / "store"))
+    with open(os.path.join(METRICS_DIR, EXPORTS[0])) as file:
+        export = json.load(file)
+
+    store.append(export)
+    first = get_all_metrics_from_store(store.directory)
+    # Reading again uses the index only
+    assert len(get_all_metrics_from_store(store.directory)) == len(first)
+
+    store.append(export)
+    assert len(get_all_metrics_from_store(store.directory)) == 2 * len(first)
@@ -0,0 +1,296 @@
+"""
+Benchmark harness for the compute subsystems of the backend.
+
+Times the dataset reader, the commgraph converters, every node rank method, every community detection method and every
+registered layout metric (on a synthetic layout, see `metrics.layout_fixtures`) on the bundled datasets and on generated graphs,
+and writes the timings as JSON:
+
+    python -m viscom_backend.benchmark --output benchmark.json
+    python -m viscom_backend.benchmark --datasets "0026nodes*" --generated 500 --compare benchmark.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import fnmatch
+import inspect
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable
+
+import networkx as nx
+
+from viscom_backend.commgraph.converter import convert_multigraph_to_normal_graph, convert_node_connections_graph_to_topic_graph, convert_to_weighted_graph
+from viscom_backend.communities.community_detection_methods import community_methods_config
+from viscom_backend.data.catalog import DATASETS_DIR
+from viscom_backend.data.reader import RosMetaSysGraphGenerator
+from viscom_backend.data.writer import write_dataset
+from viscom_backend.generator.generator_methods import get_generator_methods_config
+from viscom_backend.metrics import MetricCalculator
+from viscom_backend.metrics.layout_fixtures import LAYOUT_TYPES, PATH_STYLES, LayoutType, PathStyle, get_layout_fixture
+from viscom_backend.metrics.metrics_calculator import LaidOutData, MetricTimeoutError, metric_time_budget
+from viscom_backend.noderank.centrality_cache import centrality_cache
+from viscom_backend.noderank.combined_ranks import NodeRankContext, calculate_noderank
+from viscom_backend.noderank.node_rank_methods import node_rank_methods_config
+
+# Datasets of the benchmark corpus: the real systems (e.g. 0026nodes_...) and the synthetic s_XXXXnodes_... graphs
+BENCHMARK_DATASET_PATTERN = re.compile(r"^(s_)?\d{4}nodes_.*\.json$")
+
+# Node counts of the generated graphs
+GENERATED_NODE_COUNTS = (500, 1000)
+GENERATOR = "communication_graph"
+GENERATOR_SEED = 42
+
+# Cases that are skipped for larger graphs, as they would dominate the benchmark runtime.
+# Their cost depends on the nodes of the graph or on the links of the layout fixture, which keeps the parallel topic edges
+# of the weighted multigraph and can have many more links than the graph has nodes.
+SLOW_CASE_MAX_NODES = {
+    "communities.edge_betweenness_partition": 200,
+}
+SLOW_CASE_MAX_LINKS = {
+    "metrics.edgeCrossings": 50,
+    "metrics.totalEdgeCrossings": 50,
+    "metrics.nodeEdgeOverlaps": 1000,
+}
+
+# Wall time limit in seconds per run of a case, cases exceeding it are reported as timeout and not repeated
+CASE_TIME_LIMIT = 60.0
+
+# Cases slower than the previous results by this factor are reported as regression
+REGRESSION_FACTOR = 1.25
+
+
+def get_default_params(params_config: list[dict[str, Any]]) -> dict[str, Any]:
+    return {param["key"]: param["default"] for param in params_config if "default" in param}
+
+
+def time_call(fn: Callable[[], Any], repeat: int, time_limit: float | None = CASE_TIME_LIMIT) -> dict[str, Any]:
+    """
+    Run `fn` `repeat` times and return the wall times in seconds, or the error of the first failing run.
+
+    Runs are interrupted after `time_limit` seconds (see `metric_time_budget`, only enforced in the main thread).
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            with metric_time_budget(time_limit):
+                fn()
+        except MetricTimeoutError:
+            return {"timeout": time_limit}
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "mean": statistics.fmean(times), "runs": len(times)}
+
+
+def get_benchmark_cases(
+    file_path: str, layout_type: LayoutType = "spring", path_style: PathStyle = "cubic"
+) -> tuple[dict[str, Callable[[], Any]], LaidOutData]:
+    """Return the benchmark cases of a dataset file, each as function without arguments, and the layout fixture of the metrics."""
+    graph = RosMetaSysGraphGenerator.read_graph_from_file(file_path)
+    weighted_graph = convert_to_weighted_graph(graph)
+    layout = get_layout_fixture(weighted_graph, layout_type, path_style)
+
+    cases: dict[str, Callable[[], Any]] = {
+        "reader.read_graph_from_file": lambda: RosMetaSysGraphGenerator.read_graph_from_file(file_path),
+        "reader.read_graph_from_file_streaming": lambda: RosMetaSysGraphGenerator.read_graph_from_file_streaming(file_path),
+        "converter.convert_node_connections_graph_to_topic_graph": lambda: convert_node_connections_graph_to_topic_graph(graph),
+        "converter.convert_to_weighted_graph": lambda: convert_to_weighted_graph(graph),
+        "converter.convert_multigraph_to_normal_graph": lambda: convert_multigraph_to_normal_graph(weighted_graph),
+    }
+
+    for method, config in node_rank_methods_config.items():
+
+        def run_noderank(method=method, params=get_default_params(config["params"])):
+            # Each run starts from scratch: no shared context and no cached commgraph centrality
+            centrality_cache.clear()
+            return calculate_noderank(NodeRankContext(weighted_graph), method, params)
+
+        cases[f"noderank.{method}"] = run_noderank
+
+    for method, config in community_methods_config.items():
+        cases[f"communities.{method}"] = lambda config=config: config["method"](weighted_graph, **get_default_params(config["params"]))
+
+    for method, calculator_class in MetricCalculator.AVAILABLE_METRICS.items():
+        # Abstract intermediate classes register themselves as well
+        if inspect.isabstract(calculator_class):
+            continue
+        cases[f"metrics.{method}"] = lambda calculator_class=calculator_class: calculator_class(layout).calculate()
+
+    return cases, layout
+
+
+def benchmark_graph(
+    name: str,
+    file_path: str,
+    source: str,
+    repeat: int,
+    case_filter: str | None = None,
+    layout_type: LayoutType = "spring",
+    path_style: PathStyle = "cubic",
+    time_limit: float | None = CASE_TIME_LIMIT,
+) -> dict[str, Any]:
+    graph = RosMetaSysGraphGenerator.read_graph_from_file(file_path)
+    node_count = graph.number_of_nodes()
+    result: dict[str, Any] = {
+        "name": name,
+        "source": source,
+        "file": os.path.basename(file_path),
+        "node_count": node_count,
+        "edge_count": graph.number_of_edges(),
+        "cases": {},
+    }
+
+    # The algorithms print progress on stdout, which is not part of the benchmark output
+    with contextlib.redirect_stdout(io.StringIO()):
+        cases, layout = get_benchmark_cases(file_path, layout_type, path_style)
+    link_count = len(layout.links)
+    result["layout_link_count"] = link_count
+
+    for case, fn in cases.items():
+        if case_filter and not fnmatch.fnmatch(case, case_filter):
+            continue
+        if node_count > SLOW_CASE_MAX_NODES.get(case, node_count):
+            result["cases"][case] = {"skipped": f"more than {SLOW_CASE_MAX_NODES[case]} nodes"}
+        elif link_count > SLOW_CASE_MAX_LINKS.get(case, link_count):
+            result["cases"][case] = {"skipped": f"more than {SLOW_CASE_MAX_LINKS[case]} layout links"}
+        else:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result["cases"][case] = time_call(fn, repeat, time_limit)
+        print(f"{name:60s} {case:60s} {format_timing(result['cases'][case])}", file=sys.stderr)
+
+    return result
+
+
+def format_timing(timing: dict[str, Any]) -> str:
+    if "error" in timing:
+        return f"error: {timing['error']}"
+    if "skipped" in timing:
+        return f"skipped: {timing['skipped']}"
+    if "timeout" in timing:
+        return f"timeout after {timing['timeout']:g} s"
+    return f"{timing['median'] * 1000:10.2f} ms"
+
+
+def get_git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_benchmark_datasets(pattern: str | None = None) -> list[str]:
+    files = sorted(file for file in os.listdir(DATASETS_DIR) if BENCHMARK_DATASET_PATTERN.match(file))
+    if pattern:
+        files = [file for file in files if fnmatch.fnmatch(file, pattern)]
+    return [os.path.join(DATASETS_DIR, file) for file in files]
+
+
+def run_benchmark(
+    dataset_pattern: str | None = None,
+    generated_node_counts: tuple[int, ...] = GENERATED_NODE_COUNTS,
+    repeat: int = 3,
+    case_filter: str | None = None,
+    layout_type: LayoutType = "spring",
+    path_style: PathStyle = "cubic",
+    time_limit: float | None = CASE_TIME_LIMIT,
+    on_graph: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Benchmark the datasets matching the pattern and generated graphs of the given sizes.
+
+    `on_graph` is called with the results so far after each graph, e.g. to write them, so that interrupted runs keep them.
+    """
+    results: dict[str, Any] = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": get_git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "networkx": nx.__version__,
+        "repeat": repeat,
+        "layout": {"type": layout_type, "paths": path_style},
+        "graphs": [],
+    }
+
+    for file_path in get_benchmark_datasets(dataset_pattern):
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        results["graphs"].append(benchmark_graph(name, file_path, "dataset", repeat, case_filter, layout_type, path_style, time_limit))
+        if on_graph is not None:
+            on_graph(results)
+
+    # Generated graphs are written as dataset first, so that they run through the same cases (including the reader)
+    with tempfile.TemporaryDirectory() as directory:
+        for node_count in generated_node_counts:
+            with contextlib.redirect_stdout(io.StringIO()):
+                graph = get_generator_methods_config()[GENERATOR]["method"](node_count=node_count, seed=GENERATOR_SEED)
+            name = f"generated_{GENERATOR}_{node_count:04d}nodes"
+            file_path = write_dataset(graph, name, directory=directory)
+            results["graphs"].append(benchmark_graph(name, file_path, "generated", repeat, case_filter, layout_type, path_style, time_limit))
+            if on_graph is not None:
+                on_graph(results)
+
+    return results
+
+
+def compare_results(previous: dict[str, Any], current: dict[str, Any], factor: float = REGRESSION_FACTOR) -> list[dict[str, Any]]:
+    """Return the cases whose median time increased by more than `factor` compared to previous results."""
+    previous_cases = {(graph["name"], case): timing for graph in previous["graphs"] for case, timing in graph["cases"].items()}
+    regressions = []
+    for graph in current["graphs"]:
+        for case, timing in graph["cases"].items():
+            previous_timing = previous_cases.get((graph["name"], case))
+            if not previous_timing or "median" not in previous_timing or "median" not in timing or previous_timing["median"] <= 0:
+                continue
+            ratio = timing["median"] / previous_timing["median"]
+            if ratio > factor:
+                regressions.append({"graph": graph["name"], "case": case, "previous": previous_timing["median"], "current": timing["median"], "ratio": ratio})
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the compute subsystems of the backend.")
+    parser.add_argument("--output", "-o", default="benchmark.json", help="JSON file for the results")
+    parser.add_argument("--datasets", default=None, help="Glob pattern for the dataset files, e.g. '0026nodes*'")
+    parser.add_argument("--generated", type=int, nargs="*", default=list(GENERATED_NODE_COUNTS), help="Node counts of the generated graphs")
+    parser.add_argument("--cases", default=None, help="Glob pattern for the cases, e.g. 'noderank.*'")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs per case")
+    parser.add_argument("--layout", choices=LAYOUT_TYPES, default="spring", help="Synthetic layout for the metrics")
+    parser.add_argument("--paths", choices=PATH_STYLES, default="cubic", help="Path style of the synthetic layout")
+    parser.add_argument("--time-limit", type=float, default=CASE_TIME_LIMIT, help="Wall time limit in seconds per run of a case (0 disables it)")
+    parser.add_argument("--compare", default=None, help="Previous results to report regressions against")
+    args = parser.parse_args(argv)
+
+    def write_results(results: dict[str, Any]) -> None:
+        # Written atomically after each graph, so that the file always contains complete JSON
+        temp_path = f"{args.output}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(results, file, indent=2)
+        os.replace(temp_path, args.output)
+
+    results = run_benchmark(args.datasets, tuple(args.generated), args.repeat, args.cases, args.layout, args.paths, args.time_limit or None, on_graph=write_results)
+
+    if args.compare:
+        with open(args.compare) as file:
+            results["regressions"] = compare_results(json.load(file), results)
+        for regression in results["regressions"]:
+            print(f"[REGRESSION] {regression['graph']} {regression['case']}: {regression['previous'] * 1000:.2f} ms -> {regression['current'] * 1000:.2f} ms", file=sys.stderr)
+
+    write_results(results)
+    print(f"Benchmark results written to {args.output}", file=sys.stderr)
+
+    return 1 if results.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
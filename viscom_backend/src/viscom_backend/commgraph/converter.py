@@ -4,11 +4,14 @@ import math
 
 import networkx as nx
 
+from viscom_backend.instrumentation import timed
+
 
 def get_topic_name(topic_type: str, topic_name: str) -> str:
     return f"{topic_type}/{topic_name}"
 
 
+@timed()
 def convert_normal_graph_to_commgraph(graph: nx.MultiDiGraph) -> nx.MultiDiGraph:
     """This convert method adds topics to the connections of a normal graph."""
 
@@ -68,6 +71,7 @@ def convert_normal_graph_to_commgraph(graph: nx.MultiDiGraph) -> nx.MultiDiGraph
     return new_graph
 
 
+@timed()
 def convert_node_connections_graph_to_topic_graph(graph: nx.MultiDiGraph, directed=True, reversed=False) -> nx.DiGraph:
     """
     Convert a node connections graph to a topic graph.
@@ -146,6 +150,7 @@ def convert_node_connections_graph_to_topic_graph(graph: nx.MultiDiGraph, direct
     return topic_graph
 
 
+@timed()
 def convert_to_weighted_graph(node_graph: nx.MultiDiGraph) -> nx.MultiDiGraph:
     topic_graph = convert_node_connections_graph_to_topic_graph(node_graph)
     weighted_graph = nx.MultiDiGraph()
@@ -184,6 +189,7 @@ def convert_to_weighted_graph(node_graph: nx.MultiDiGraph) -> nx.MultiDiGraph:
     return weighted_graph
 
 
+@timed()
 def convert_multigraph_to_normal_graph(graph: nx.MultiDiGraph) -> nx.DiGraph:
     """This convert method removes the topics from the connections of a commgraph and creates a normal graph."""
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 import math
 import random
 from collections import defaultdict
@@ -9,6 +10,9 @@ import networkx as nx
 from networkx.algorithms.community import modularity
 
 from viscom_backend.commgraph.converter import convert_node_connections_graph_to_topic_graph, convert_to_weighted_graph
+from viscom_backend.instrumentation import increment, timer
+
+logger = logging.getLogger(__name__)
 
 
 class Community:
@@ -179,7 +183,7 @@ class HyperNode:
                 # For all other nodes, we add the weights to the keep node
                 # and remove the node from the hypernode and the graph
                 for node_to_remove in other_nodes:
-                    print(f"[MERGING] {node_to_remove} to {keep_node}")
+                    logger.debug("Merging %s to %s", node_to_remove, keep_node)
                     for start_node, target_node, connection_data in origin_G.out_edges(node_to_remove, data=True):
                         if start_node == target_node:
                             continue
@@ -894,31 +898,32 @@ class CommGraphCommunityDetector:
 
         mod = modularity(self.weighted_node_graph, self.communities.get_communities_as_sets(), weight=weight, resolution=resolution)
 
-        print(f"Start mod: {mod}")
+        logger.debug("Start mod: %s", mod)
 
-        # Louvain as comparison
-        communities = nx.algorithms.community.louvain_communities(self.weighted_node_graph)
-        print(f"Louvain:")
-        for c in communities:
-            print(c)
+        # Louvain as comparison, which is only computed for debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            for c in nx.algorithms.community.louvain_communities(self.weighted_node_graph):
+                logger.debug("Louvain community: %s", c)
 
         while True:
             # Create the new graph according to the current hyper communities
             self.communities.generate_new_hypernode_graph()
 
             # Iterate a step to get the new improved communities
-            global_communities, inner_communities, improved = self._iterate_one_level(split_penalty)
+            with timer("communities.comm_splitter.level"):
+                global_communities, inner_communities, improved = self._iterate_one_level(split_penalty)
+            increment("comm_splitter_levels")
 
             new_mod = modularity(self.weighted_node_graph, self.communities.get_communities_as_sets(), weight=weight, resolution=resolution)
 
             if new_mod - mod < threshold:
-                print(f"End mod: {new_mod}")
+                logger.debug("End mod: %s", new_mod)
                 break
 
             mod = new_mod
 
             if not improved:
-                print(f"Did not improve End mod: {mod}")
+                logger.debug("Did not improve, end mod: %s", mod)
                 break
 
         return [c.origin_nodes for c in global_communities if not c.is_empty()]
@@ -1001,7 +1006,7 @@ class CommGraphCommunityDetector:
                         #         # print(f"  {neighbor}: {self.communities.origin_graph[node][neighbor]['weight']}")
 
                         # print("Splitting node", node, "to", community, "and", other_community)
-                        print("Splitting node", node, "having weight", weight_from_node_to_other_community)
+                        logger.debug("Splitting node %s having weight %s", node, weight_from_node_to_other_community)
                         weight_from_node_to_other_community = communities.get_weight_from_node_to_community(node, other_community)
                         communities.split_node_to_communities(node, community, other_community, penalty=split_penalty)
 
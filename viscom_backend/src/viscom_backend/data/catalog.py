@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+import networkx as nx
+
+from viscom_backend.data.stream_reader import STREAMING_THRESHOLD_BYTES, iter_meta_system
+
+logger = logging.getLogger(__name__)
+
+DATASETS_DIR = os.path.join(os.path.dirname(__file__), "datasets")
+
+# Number of parsed dataset graphs kept in memory
+MAX_CACHED_GRAPHS = 16
+
+# Poll interval of the directory watcher in seconds
+WATCH_INTERVAL_SEC = 2.0
+
+
+class DatasetInfo:
+    """Metadata of a dataset file in the catalog."""
+
+    def __init__(self, name: str, path: str, mtime_ns: int, size: int, meta: dict[str, Any]):
+        self.name: str = name
+        self.path: str = path
+        self.mtime_ns: int = mtime_ns
+        self.size: int = size
+        self.is_synthetic: bool = meta.get("is_synthetic", True)
+        self.node_count: int = meta.get("nodeCount", 0)
+        self.description: str = meta.get("description", "")
+        self.author: str = meta.get("author", "")
+
+    def __repr__(self) -> str:
+        return f"DatasetInfo({self.name}, nodes={self.node_count}, synthetic={self.is_synthetic})"
+
+    def is_up_to_date(self, stat: os.stat_result) -> bool:
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+
+def read_dataset_meta(path: str) -> dict[str, Any]:
+    """Read the top level meta information of a dataset file (everything except the node list)."""
+    if os.path.getsize(path) > STREAMING_THRESHOLD_BYTES:
+        meta: dict[str, Any] = {}
+        for item_type, item in iter_meta_system(path):
+            # Nodes are skipped while streaming, only one node is in memory at a time
+            if item_type == "meta":
+                key, value = item
+                meta[key] = value
+        return meta
+
+    with open(path) as file:
+        data = json.load(file)
+    data.pop("nodes", None)
+    return data
+
+
+class DatasetCatalog:
+    """
+    Memory-resident index of the dataset files in a directory.
+
+    The directory is only rescanned if its mtime changed (or a file was touched), and file metadata is only re-read for new or changed files.
+    Parsed graphs are kept in a bounded LRU keyed by path, mtime and read arguments.
+    """
+
+    def __init__(self, directory: str = DATASETS_DIR, max_cached_graphs: int = MAX_CACHED_GRAPHS):
+        self.directory = directory
+        self.max_cached_graphs = max_cached_graphs
+
+        self.datasets: dict[str, DatasetInfo] = {}
+        self._dir_mtime_ns: int | None = None
+
+        self._graphs: OrderedDict[tuple, nx.Graph] = OrderedDict()
+        self._lock = threading.RLock()
+
+        self._listeners: list[Callable[[DatasetCatalog], None]] = []
+        self._watcher: threading.Thread | None = None
+        self._stop_watcher = threading.Event()
+
+    def scan(self, force: bool = False) -> bool:
+        """Update the metadata index. Returns True if datasets were added, removed or changed."""
+        with self._lock:
+            dir_mtime_ns = os.stat(self.directory).st_mtime_ns
+            if not force and dir_mtime_ns == self._dir_mtime_ns:
+                return False
+
+            changed = False
+            datasets: dict[str, DatasetInfo] = {}
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+
+                stat = entry.stat()
+                info = self.datasets.get(entry.name)
+                if info is None or not info.is_up_to_date(stat):
+                    try:
+                        meta = read_dataset_meta(entry.path)
+                    except (OSError, ValueError) as e:
+                        logger.warning("Skipping dataset %s: %s", entry.name, e)
+                        continue
+                    info = DatasetInfo(entry.name, entry.path, stat.st_mtime_ns, stat.st_size, meta)
+                    changed = True
+                datasets[entry.name] = info
+
+            changed = changed or datasets.keys() != self.datasets.keys()
+            self.datasets = datasets
+            self._dir_mtime_ns = dir_mtime_ns
+
+            if changed:
+                # Drop cached graphs of removed or changed files
+                valid = {(info.path, info.mtime_ns) for info in datasets.values()}
+                for key in [key for key in self._graphs if key[:2] not in valid]:
+                    del self._graphs[key]
+
+        if changed:
+            for listener in self._listeners:
+                listener(self)
+
+        return changed
+
+    def get_datasets(self) -> dict[str, DatasetInfo]:
+        """Return the metadata index, rescanning the directory only if it changed."""
+        if self._dir_mtime_ns is None:
+            self.scan(force=True)
+        else:
+            self.scan()
+        return self.datasets
+
+    def get_dataset(self, name: str) -> DatasetInfo | None:
+        return self.get_datasets().get(name)
+
+    def get_graph(self, name: str, **kwargs) -> nx.Graph:
+        """
+        Return the graph of a dataset, parsing the file only if it is not in the LRU cache.
+
+        A copy is returned, so callers may modify the graph (e.g. add node attributes) without affecting the cache.
+        """
+        from viscom_backend.data.reader import RosMetaSysGraphGenerator
+
+        info = self.get_dataset(name)
+        if info is None:
+            raise FileNotFoundError(f"Unknown dataset: {name}")
+
+        stat = os.stat(info.path)
+        if not info.is_up_to_date(stat):
+            # The file was modified in place, which does not change the directory mtime
+            self.scan(force=True)
+            info = self.datasets[name]
+
+        key = (info.path, info.mtime_ns, tuple(sorted(kwargs.items())))
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                self._graphs.move_to_end(key)
+                return graph.copy()
+
+        graph = RosMetaSysGraphGenerator.read_graph_from_file(info.path, **kwargs)
+
+        with self._lock:
+            self._graphs[key] = graph
+            self._graphs.move_to_end(key)
+            while len(self._graphs) > self.max_cached_graphs:
+                self._graphs.popitem(last=False)
+
+        return graph.copy()
+
+    def add_listener(self, listener: Callable[[DatasetCatalog], None]) -> None:
+        """Register a callback that is called after the set of datasets changed."""
+        self._listeners.append(listener)
+
+    def start_watcher(self, interval: float = WATCH_INTERVAL_SEC) -> None:
+        """Start a daemon thread that polls the dataset directory, so that new datasets are picked up without a restart."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+
+        self._stop_watcher.clear()
+
+        def watch():
+            while not self._stop_watcher.wait(interval):
+                try:
+                    # Forced scans only stat the files, metadata is re-read for changed files only
+                    self.scan(force=True)
+                except OSError as e:
+                    logger.error("Error while scanning %s: %s", self.directory, e)
+
+        self._watcher = threading.Thread(target=watch, name="dataset-catalog-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop_watcher.set()
+        if self._watcher is not None:
+            self._watcher.join(1.0)
+            self._watcher = None
+
+
+dataset_catalog = DatasetCatalog()
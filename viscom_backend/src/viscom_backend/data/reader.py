@@ -1,52 +1,55 @@
+from __future__ import annotations
+
 import json
 import os
-from typing import Any
+from itertools import chain, product
+from typing import Any, Iterator, Literal
 
 import networkx as nx
 
 from viscom_backend.commgraph.converter import convert_node_connections_graph_to_topic_graph
+from viscom_backend.data.catalog import DatasetInfo, dataset_catalog
+from viscom_backend.data.stream_reader import STREAMING_THRESHOLD_BYTES, ProgressCallback, iter_meta_system, log_progress
 
 
 class RosMetaSysGraphGenerator:
     @staticmethod
     def get_available_datasets(return_full_path=False):
-        datasets = []
-
-        # Search for all jsons in the ./datasets folder
-        # Get the path relative to this reader.py file
-        path = os.path.join(os.path.dirname(__file__), "datasets")
-
-        for file in os.listdir(path):
-            if file.endswith(".json"):
-                datasets.append(file)
+        # The catalog only rescans the ./datasets folder if it changed
+        datasets = dataset_catalog.get_datasets()
 
         if return_full_path:
-            return [os.path.join(path, dataset) for dataset in datasets]
+            return [info.path for info in datasets.values()]
 
-        return datasets
+        return list(datasets.keys())
 
     @staticmethod
-    def extent_generator_methods(generator_methods_config: dict[str, Any]):
-        datasets = RosMetaSysGraphGenerator.get_available_datasets()
-        for dataset in datasets:
+    def extent_generator_methods(generator_methods_config: dict[str, Any], datasets: dict[str, DatasetInfo] | None = None) -> dict[str, Any]:
+        """
+        Return a copy of the generator config with an entry for every saved dataset (by default of a rescan of the catalog).
+
+        The given config is not modified, so that it can be swapped atomically while requests iterate over it.
+        """
+        if datasets is None:
+            datasets = dataset_catalog.get_datasets()
+
+        # Remove datasets that do not exist anymore
+        extended_config = {
+            key: config for key, config in generator_methods_config.items() if not config.get("is_saved_dataset", False) or key in datasets
+        }
+
+        for dataset, info in datasets.items():
+            existing_config = extended_config.get(dataset, None)
+            if existing_config is not None and existing_config.get("is_synthetic") == info.is_synthetic:
+                continue
 
             def callback(dataset=dataset, **kwargs):
                 print(f"Reading dataset {dataset} with kwargs {kwargs}")
-                graph = RosMetaSysGraphGenerator.read_graph_from_file(os.path.join(os.path.dirname(__file__), "datasets", dataset), **kwargs)
+                graph = dataset_catalog.get_graph(dataset, **kwargs)
                 # return convert_to_weighted_graph(graph)
                 return graph
 
-            is_synthetic = True
-
-            # "is_synthetic": false,
-            # "nodes": [
-            # Parse the json file to check, if it has the "is_synthetic" key
-
-            with open(os.path.join(os.path.dirname(__file__), "datasets", dataset)) as file:
-                data = json.load(file)
-                is_synthetic = data.get("is_synthetic", True)
-
-            generator_methods_config[dataset] = {
+            extended_config[dataset] = {
                 "params": [
                     # {
                     #     "key": "return_topic_graph",
@@ -57,18 +60,23 @@ class RosMetaSysGraphGenerator:
                 ],
                 "description": "A communication graph generated from a ROS meta system description.",
                 "is_saved_dataset": True,
-                "is_synthetic": is_synthetic,
+                "is_synthetic": info.is_synthetic,
+                "file_path": info.path,
                 # "method": create_lambda(),
                 "method": callback,
             }
 
+        return extended_config
+
     @staticmethod
     def read_graph_from_file(file_path: str, return_topic_graph: bool = False) -> nx.MultiDiGraph:
+        # Very large dumps are streamed instead of being loaded into memory as a whole
+        if os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES:
+            return RosMetaSysGraphGenerator.read_graph_from_file_streaming(file_path, return_topic_graph, progress=log_progress(file_path))
+
         with open(file_path) as file:
             data = json.load(file)
 
-        graph = nx.MultiDiGraph()
-
         # Meta information
         node_count = data.get("nodeCount", 0)
         author = data.get("author", "")
@@ -76,77 +84,145 @@ class RosMetaSysGraphGenerator:
 
         # Add nodes
         # Also store topic information to be able to add edges later
-        publisher_name_to_nodes: dict[str, list[str]] = {}
-        subscriber_name_to_nodes: dict[str, list[str]] = {}
-        service_name_to_nodes: dict[str, list[str]] = {}
-        client_name_to_nodes: dict[str, list[str]] = {}
+        index = MetaSystemIndex()
+        for node_data in data.get("nodes", []):
+            index.add_node(node_data)
 
-        topic_to_type: dict[str, str] = {}
+        graph = index.build_graph()
 
-        for node_data in data.get("nodes", []):
-            node_name = node_data["name"]
-            node_namespace: str = node_data["namespace"]
-            if not node_namespace.endswith("/"):
-                node_namespace += "/"
-            node_name = f"{node_namespace}{node_name}" if node_namespace != "/" else node_name
-            graph.add_node(node_name)
-
-            # print(node_data)
-
-            for topic in node_data["publishers"]:
-                topic_name = topic["name"]
-                topic_type = topic.get("type", "std_msgs/msg/Empty")
-                topic_to_type[topic_name] = topic_type
-
-                if topic_name not in publisher_name_to_nodes:
-                    publisher_name_to_nodes[topic_name] = []
-                publisher_name_to_nodes[topic_name].append(node_name)
-
-            for topic in node_data["subscribers"]:
-                topic_name = topic["name"]
-                topic_type = topic.get("type", "std_msgs/msg/Empty")
-                topic_to_type[topic_name] = topic_type
-
-                if topic_name not in subscriber_name_to_nodes:
-                    subscriber_name_to_nodes[topic_name] = []
-                subscriber_name_to_nodes[topic_name].append(node_name)
-
-            for topic in node_data["services"]:
-                topic_name = topic["name"]
-                topic_type = topic.get("type", "std_msgs/msg/Empty")
-                topic_to_type[topic_name] = topic_type
-
-                if topic_name not in service_name_to_nodes:
-                    service_name_to_nodes[topic_name] = []
-                service_name_to_nodes[topic_name].append(node_name)
-
-            for topic in node_data["clients"]:
-                topic_name = topic["name"]
-
-                topic_type = topic.get("type", "std_msgs/msg/Empty")
-                topic_to_type[topic_name] = topic_type
-
-                if topic_name not in client_name_to_nodes:
-                    client_name_to_nodes[topic_name] = []
-                client_name_to_nodes[topic_name].append(node_name)
-
-        # Add pub/sub edges
-        for pub_topic, pub_nodes in publisher_name_to_nodes.items():
-            sub_nodes = subscriber_name_to_nodes.get(pub_topic, [])
-            for pub_node in pub_nodes:
-                for sub_node in sub_nodes:
-                    graph.add_edge(pub_node, sub_node, pub_topic=pub_topic, topic_type=topic_to_type.get(pub_topic, "std_msgs/msg/Empty"))
-
-        # Add service edges
-        for service_name, service_nodes in service_name_to_nodes.items():
-            client_nodes = client_name_to_nodes.get(service_name, [])
-            for service_node in service_nodes:
-                for client_node in client_nodes:
-                    graph.add_edge(client_node, service_node, service_name=service_name, topic_type=topic_to_type.get(service_name, "std_msgs/msg/Empty"))
-
-        # graph = nx.node_link_graph(data)
+        if return_topic_graph:
+            return convert_node_connections_graph_to_topic_graph(graph)
+
+        return graph
+
+    @staticmethod
+    def read_graph_from_file_streaming(file_path: str, return_topic_graph: bool = False, progress: ProgressCallback | None = None) -> nx.MultiDiGraph:
+        """
+        Read a dataset file node by node with an incremental JSON parser.
+
+        The topic indexes are filled while streaming, so the peak memory is bounded by the graph itself instead of the parsed file.
+        """
+        index = MetaSystemIndex()
+        for item_type, item in iter_meta_system(file_path, progress=progress):
+            if item_type == "node":
+                index.add_node(item)
+
+        graph = index.build_graph()
 
         if return_topic_graph:
             return convert_node_connections_graph_to_topic_graph(graph)
 
         return graph
+
+    @staticmethod
+    def read_topic_hyperedges_from_file(file_path: str) -> tuple[list[str], list[TopicHyperedge]]:
+        """
+        Read the node names and one hyperedge record per topic / service of a dataset file.
+
+        For broadcast-heavy datasets this is much smaller than the expanded graph with one edge per publisher-subscriber pair.
+        """
+        with open(file_path) as file:
+            data = json.load(file)
+
+        index = MetaSystemIndex()
+        for node_data in data.get("nodes", []):
+            index.add_node(node_data)
+
+        return index.node_names, index.get_topic_hyperedges()
+
+
+class TopicHyperedge:
+    """
+    A topic (or service) connecting all its source nodes with all its target nodes.
+
+    For pub/sub topics, the sources are the publishers and the targets the subscribers.
+    For services, the sources are the clients and the targets the service providers.
+    """
+
+    def __init__(self, name: str, topic_type: str, kind: Literal["pub_topic", "service_name"], sources: list[str], targets: list[str]):
+        self.name: str = name
+        self.topic_type: str = topic_type
+        self.kind: Literal["pub_topic", "service_name"] = kind
+        self.sources: list[str] = sources
+        self.targets: list[str] = targets
+
+    def __repr__(self) -> str:
+        return f"TopicHyperedge({self.kind}={self.name}, {len(self.sources)} -> {len(self.targets)})"
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.sources) * len(self.targets)
+
+    def iter_edges(self) -> Iterator[tuple[str, str, dict[str, str]]]:
+        """Iterate the expanded (source, target, data) edges of this hyperedge. The data dict is shared, `add_edges_from` copies it."""
+        data = {self.kind: self.name, "topic_type": self.topic_type}
+        if self.kind == "service_name":
+            # Keep the insertion order of the per-edge construction: for each service node all its clients
+            return ((source, target, data) for target in self.targets for source in self.sources)
+        return ((source, target, data) for source, target in product(self.sources, self.targets))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"name": self.name, "topic_type": self.topic_type, "kind": self.kind, "sources": self.sources, "targets": self.targets}
+
+
+class MetaSystemIndex:
+    """Publisher / subscriber / service / client indexes of a ROS meta system description, filled node by node."""
+
+    def __init__(self):
+        self.node_names: list[str] = []
+
+        self.publisher_name_to_nodes: dict[str, list[str]] = {}
+        self.subscriber_name_to_nodes: dict[str, list[str]] = {}
+        self.service_name_to_nodes: dict[str, list[str]] = {}
+        self.client_name_to_nodes: dict[str, list[str]] = {}
+
+        self.topic_to_type: dict[str, str] = {}
+
+    @staticmethod
+    def get_node_name(node_data: dict[str, Any]) -> str:
+        node_name = node_data["name"]
+        node_namespace: str = node_data["namespace"]
+        if not node_namespace.endswith("/"):
+            node_namespace += "/"
+        return f"{node_namespace}{node_name}" if node_namespace != "/" else node_name
+
+    def _add_endpoints(self, node_name: str, topics: list[dict[str, Any]], name_to_nodes: dict[str, list[str]]) -> None:
+        topic_to_type = self.topic_to_type
+        for topic in topics:
+            topic_name = topic["name"]
+            topic_to_type[topic_name] = topic.get("type", "std_msgs/msg/Empty")
+            name_to_nodes.setdefault(topic_name, []).append(node_name)
+
+    def add_node(self, node_data: dict[str, Any]) -> str:
+        node_name = self.get_node_name(node_data)
+        self.node_names.append(node_name)
+
+        self._add_endpoints(node_name, node_data["publishers"], self.publisher_name_to_nodes)
+        self._add_endpoints(node_name, node_data["subscribers"], self.subscriber_name_to_nodes)
+        self._add_endpoints(node_name, node_data["services"], self.service_name_to_nodes)
+        self._add_endpoints(node_name, node_data["clients"], self.client_name_to_nodes)
+
+        return node_name
+
+    def get_topic_hyperedges(self) -> list[TopicHyperedge]:
+        """Return one record per connected topic and service."""
+        hyperedges: list[TopicHyperedge] = []
+
+        for pub_topic, pub_nodes in self.publisher_name_to_nodes.items():
+            sub_nodes = self.subscriber_name_to_nodes.get(pub_topic, [])
+            if sub_nodes:
+                hyperedges.append(TopicHyperedge(pub_topic, self.topic_to_type.get(pub_topic, "std_msgs/msg/Empty"), "pub_topic", pub_nodes, sub_nodes))
+
+        for service_name, service_nodes in self.service_name_to_nodes.items():
+            client_nodes = self.client_name_to_nodes.get(service_name, [])
+            if client_nodes:
+                hyperedges.append(TopicHyperedge(service_name, self.topic_to_type.get(service_name, "std_msgs/msg/Empty"), "service_name", client_nodes, service_nodes))
+
+        return hyperedges
+
+    def build_graph(self) -> nx.MultiDiGraph:
+        """Build the node connection graph, emitting the pub/sub and service edges in one batch."""
+        graph = nx.MultiDiGraph()
+        graph.add_nodes_from(self.node_names)
+        graph.add_edges_from(chain.from_iterable(hyperedge.iter_edges() for hyperedge in self.get_topic_hyperedges()))
+        return graph
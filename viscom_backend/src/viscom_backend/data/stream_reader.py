@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Any, Callable, Iterator, Literal, TextIO
+
+logger = logging.getLogger(__name__)
+
+# Files larger than this are read with the streaming parser instead of `json.load`
+STREAMING_THRESHOLD_BYTES = 32 * 1024 * 1024
+
+CHUNK_SIZE = 256 * 1024
+
+# Report progress in steps of this fraction of the file size
+PROGRESS_STEP = 0.1
+
+ProgressCallback = Callable[[int, int, int], None]
+"""Called with (bytes_read, total_bytes, nodes_read)."""
+
+_WHITESPACE = " \t\n\r"
+
+
+def log_progress(file_path: str) -> ProgressCallback:
+    """Create a progress callback that logs (at debug level) every `PROGRESS_STEP` of the file."""
+    next_report = [PROGRESS_STEP]
+
+    def callback(bytes_read: int, total_bytes: int, nodes_read: int):
+        if total_bytes <= 0:
+            return
+        fraction = bytes_read / total_bytes
+        if fraction >= next_report[0] or bytes_read >= total_bytes:
+            logger.debug("%s: %.0f%% (%d nodes)", os.path.basename(file_path), fraction * 100, nodes_read)
+            while next_report[0] <= fraction:
+                next_report[0] += PROGRESS_STEP
+
+    return callback
+
+
+class _StreamBuffer:
+    """Text buffer over a file that is refilled on demand and trimmed after consumed values."""
+
+    def __init__(self, file: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.chars_read = 0
+        self.decoder = json.JSONDecoder()
+
+    def read_more(self, size: int | None = None) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.chars_read += len(chunk)
+        # Drop the consumed part of the buffer to keep the memory bounded
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character (without consuming it) or an empty string at the end of the file."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_more():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} but found {char!r} in streamed JSON")
+        self.pos += 1
+        return char
+
+    def decode_value(self) -> Any:
+        """Decode the next complete JSON value, reading more data until the value (and its delimiter) is in the buffer."""
+        self.peek()
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer might be truncated, so require the following delimiter to be present
+                delimiter_pos = end
+                while delimiter_pos < len(self.buffer) and self.buffer[delimiter_pos] in _WHITESPACE:
+                    delimiter_pos += 1
+                if delimiter_pos < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+
+            # Grow the read size for large values to avoid re-parsing them too often
+            if not self.read_more(read_size):
+                if self.eof and self.pos < len(self.buffer):
+                    continue
+                raise ValueError("Unexpected end of streamed JSON")
+            read_size *= 2
+
+
+def iter_meta_system(
+    file_path: str, progress: ProgressCallback | None = None, chunk_size: int = CHUNK_SIZE
+) -> Iterator[tuple[Literal["meta", "node"], Any]]:
+    """
+    Stream a ROS meta system description.
+
+    Yields ("meta", (key, value)) for every top level entry except "nodes" and ("node", node_data) for every item of the "nodes" array.
+    Only one node is held in memory at a time (plus the current read buffer).
+    """
+    total_bytes = os.path.getsize(file_path)
+    nodes_read = 0
+
+    with open(file_path, encoding="utf-8") as file:
+        stream = _StreamBuffer(file, chunk_size)
+
+        def report():
+            # Characters approximate bytes, the dumps are (almost) pure ASCII
+            if progress is not None:
+                progress(min(stream.chars_read, total_bytes), total_bytes, nodes_read)
+
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+
+        while True:
+            key = stream.decode_value()
+            stream.expect(":")
+
+            if key == "nodes" and stream.peek() == "[":
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.expect("]")
+                else:
+                    while True:
+                        node_data = stream.decode_value()
+                        nodes_read += 1
+                        yield "node", node_data
+                        if nodes_read % 100 == 0:
+                            report()
+                        if stream.expect(",]") == "]":
+                            break
+            else:
+                yield "meta", (key, stream.decode_value())
+
+            if stream.expect(",}") == "}":
+                break
+
+        report()
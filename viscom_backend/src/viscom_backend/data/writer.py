@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Iterable, Iterator
+
+import networkx as nx
+
+from viscom_backend.data.catalog import DATASETS_DIR
+
+DATASET_VERSION = "1.0.0"
+DEFAULT_TOPIC_TYPE = "std_msgs/msg/Empty"
+
+# Characters that are replaced in dataset names, so that a name cannot leave the dataset directory
+_INVALID_NAME_CHARS = re.compile(r"[^A-Za-z0-9_.\-]")
+
+
+def iter_meta_system_nodes(graph: nx.Graph) -> Iterator[dict[str, Any]]:
+    """
+    Yield the nodes of a communication graph in the ROS meta system format.
+
+    The publishers and subscribers of each node are derived from the "pub_topic" of its out- and in-edges.
+    Edges without a topic get the topic name "<source>-><target>".
+    """
+    directed = graph.is_directed()
+    for node, node_data in graph.nodes(data=True):
+        publishers: dict[str, str] = {}
+        subscribers: dict[str, str] = {}
+        out_edges = graph.out_edges(node, data=True) if directed else graph.edges(node, data=True)
+        in_edges = graph.in_edges(node, data=True) if directed else []
+        for source, target, edge_data in out_edges:
+            publishers.setdefault(edge_data.get("pub_topic", edge_data.get("topic", f"{source}->{target}")), edge_data.get("type", DEFAULT_TOPIC_TYPE))
+        for source, target, edge_data in in_edges:
+            subscribers.setdefault(edge_data.get("pub_topic", edge_data.get("topic", f"{source}->{target}")), edge_data.get("type", DEFAULT_TOPIC_TYPE))
+
+        yield {
+            "name": str(node_data.get("name", node)),
+            "namespace": node_data.get("namespace", "/"),
+            "localhost_only": node_data.get("localhost_only", False),
+            "publishers": [{"name": topic, "type": topic_type} for topic, topic_type in publishers.items()],
+            "subscribers": [{"name": topic, "type": topic_type} for topic, topic_type in subscribers.items()],
+            "services": node_data.get("services", []),
+            "clients": node_data.get("clients", []),
+        }
+
+
+def get_meta_system_header(
+    name: str, node_count: int, description: str = "", author: str = "generator", is_synthetic: bool = True, created_at: datetime | None = None
+) -> dict[str, Any]:
+    """Return the top level entries of a ROS meta system description (everything except the nodes)."""
+    created_at = created_at or datetime.now()
+    return {
+        "version": DATASET_VERSION,
+        "name": name,
+        "description": description,
+        "created_at": created_at.isoformat(timespec="milliseconds"),
+        "nodeCount": node_count,
+        "author": author,
+        "is_synthetic": is_synthetic,
+    }
+
+
+def graph_to_meta_system(
+    graph: nx.Graph, name: str, description: str = "", author: str = "generator", is_synthetic: bool = True, created_at: datetime | None = None
+) -> dict[str, Any]:
+    """Convert a communication graph into a ROS meta system description, as read by `RosMetaSysGraphGenerator.read_graph_from_file`."""
+    data = get_meta_system_header(name, graph.number_of_nodes(), description=description, author=author, is_synthetic=is_synthetic, created_at=created_at)
+    data["nodes"] = list(iter_meta_system_nodes(graph))
+    return data
+
+
+def get_dataset_name(name: str) -> str:
+    """Replace the characters of a (request supplied) dataset name that are not allowed in file names, e.g. path separators."""
+    return _INVALID_NAME_CHARS.sub("_", name) or "_"
+
+
+def get_dataset_file_name(name: str, node_count: int, created_at: datetime | None = None, synthetic: bool = True) -> str:
+    """File name in the scheme of the existing datasets, e.g. `s_0025nodes_2025-04-15_11_06_37_S_0025_Dense.json`."""
+    created_at = created_at or datetime.now()
+    prefix = "s_" if synthetic else ""
+    return f"{prefix}{node_count:04d}nodes_{created_at.strftime('%Y-%m-%d_%H_%M_%S')}_{get_dataset_name(name)}.json"
+
+
+def write_dataset_nodes(
+    nodes: Iterable[dict[str, Any]],
+    node_count: int,
+    name: str,
+    directory: str = DATASETS_DIR,
+    description: str = "",
+    author: str = "generator",
+    is_synthetic: bool = True,
+) -> str:
+    """
+    Write a dataset file node by node and return its path, so that only one node is held in memory at a time.
+
+    The file is written to a temporary name first and then renamed, so that the dataset catalog never reads a partially written file.
+    """
+    created_at = datetime.now()
+    header = get_meta_system_header(name, node_count, description=description, author=author, is_synthetic=is_synthetic, created_at=created_at)
+    file_path = os.path.join(directory, get_dataset_file_name(name, node_count, created_at, is_synthetic))
+
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w") as file:
+        # Write the header without its closing brace and append the nodes array
+        file.write(json.dumps(header, indent=2)[:-2])
+        file.write(',\n  "nodes": [')
+        for i, node in enumerate(nodes):
+            file.write("\n    " if i == 0 else ",\n    ")
+            file.write(json.dumps(node))
+        file.write("\n  ]\n}\n")
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+def write_dataset(graph: nx.Graph, name: str, directory: str = DATASETS_DIR, description: str = "", author: str = "generator", is_synthetic: bool = True) -> str:
+    """Write a graph as dataset file and return its path."""
+    return write_dataset_nodes(
+        iter_meta_system_nodes(graph), graph.number_of_nodes(), name, directory=directory, description=description, author=author, is_synthetic=is_synthetic
+    )
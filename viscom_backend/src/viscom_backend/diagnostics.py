@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import networkx as nx
+from flask import Response, request
+
+from viscom_backend.transport import create_response
+
+# Log level of the backend, e.g. VISCOM_LOG_LEVEL=DEBUG
+LOG_LEVEL = os.environ.get("VISCOM_LOG_LEVEL", "INFO").upper()
+
+
+def configure_logging(level: str = LOG_LEVEL) -> None:
+    """Configure the root logger, unless it was already configured (e.g. by the metrics processor)."""
+    logging.basicConfig(level=level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    logging.getLogger("viscom_backend").setLevel(level)
+
+
+def is_debug_request() -> bool:
+    """Return whether the current request asks for the intermediate data with the query parameter `debug=true`."""
+    return request.args.get("debug", "false").lower() in ("true", "1", "yes")
+
+
+class DebugInfo:
+    """
+    Intermediate data of a request, which is only collected for requests with `debug=true`.
+
+    Without debug, all methods return immediately, so the hot path does no formatting work.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.data: dict[str, Any] = {}
+        self.timings: dict[str, float] = {}
+
+    @staticmethod
+    def from_request() -> DebugInfo:
+        return DebugInfo(is_debug_request())
+
+    def add(self, key: str, value: Any) -> None:
+        if self.enabled:
+            self.data[key] = value
+
+    def add_edges(self, key: str, graph: nx.Graph, attributes: tuple[str, ...] = ("distance", "weight")) -> None:
+        """Add the edges of a graph with the given attributes, e.g. the distances of the weighted graph."""
+        if self.enabled:
+            self.data[key] = [
+                {"source": source, "target": target, **{attribute: edge_data.get(attribute) for attribute in attributes}}
+                for source, target, edge_data in graph.edges(data=True)
+            ]
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Measure the wall time of a step in seconds."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def create_response(self, result: Any) -> Response:
+        """Return the plain result, or {"result", "debug"} for debug requests."""
+        if not self.enabled:
+            return create_response(result)
+        return create_response({"result": result, "debug": {**self.data, "timings": self.timings}})
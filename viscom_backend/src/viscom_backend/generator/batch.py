@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Any
+
+import numpy as np
+
+from viscom_backend.data.catalog import DATASETS_DIR
+
+# Upper bound for the number of graphs of a single batch request
+MAX_BATCH_SIZE = 1000
+
+
+def _get_grid_values(grid: dict[str, list[Any]]) -> list[list[Any]]:
+    return [value if isinstance(value, list) else [value] for value in grid.values()]
+
+
+def get_param_grid_size(grid: dict[str, list[Any]]) -> int:
+    """Return the number of combinations of the grid values, without expanding the grid."""
+    return math.prod(len(values) for values in _get_grid_values(grid))
+
+
+def expand_param_grid(grid: dict[str, list[Any]]) -> list[dict[str, Any]]:
+    """Return all combinations of the grid values, in the order of the grid keys (the last key varies fastest)."""
+    return [dict(zip(grid.keys(), combination)) for combination in product(*_get_grid_values(grid))]
+
+
+def get_batch_seeds(base_seed: int, count: int) -> list[int]:
+    """
+    Derive independent seeds for the items of a batch.
+
+    The seeds only depend on the base seed and the index of the item, so the output does not depend on the number of workers.
+    """
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(base_seed).spawn(count)]
+
+
+def _generate_batch_item(generator: str, params: dict[str, Any], name: str, directory: str) -> dict[str, Any]:
+    """Generate a single graph and write it as dataset. Runs in a worker process."""
+    from viscom_backend.data.writer import write_dataset, write_dataset_nodes
+    from viscom_backend.generator.generator_methods import get_generator_methods_config
+    from viscom_backend.generator.stream import GraphStream
+
+    config = get_generator_methods_config()[generator]
+    description = f"Generated by '{generator}' with {params}"
+    if "stream_method" in config:
+        # Bulk graphs are written node by node, without building the networkx graph
+        bulk_graph = config["stream_method"](**params)
+        dataset_nodes = GraphStream.from_bulk(bulk_graph).iter_dataset_nodes()
+        file_path = write_dataset_nodes(dataset_nodes, bulk_graph.node_count, name, directory=directory, description=description)
+        node_count, edge_count = bulk_graph.node_count, len(bulk_graph.sources)
+    else:
+        graph = config["method"](**params)
+        file_path = write_dataset(graph, name, directory=directory, description=description)
+        node_count, edge_count = graph.number_of_nodes(), graph.number_of_edges()
+
+    return {
+        "name": name,
+        "file": os.path.basename(file_path),
+        "params": params,
+        "node_count": node_count,
+        "edge_count": edge_count,
+    }
+
+
+def generate_batch(
+    generator: str,
+    param_sets: list[dict[str, Any]],
+    names: list[str],
+    workers: int = 1,
+    directory: str = DATASETS_DIR,
+) -> list[dict[str, Any]]:
+    """
+    Generate one dataset per parameter set in a process pool and return a summary per dataset (in the order of the parameter sets).
+
+    Worker processes are spawned instead of forked, as the server process runs other threads (e.g. the dataset catalog watcher).
+    """
+    args = [(generator, params, name, directory) for params, name in zip(param_sets, names)]
+
+    if workers <= 1 or len(args) <= 1:
+        return [_generate_batch_item(*item_args) for item_args in args]
+
+    workers = min(workers, len(args), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return list(executor.map(_generate_batch_item, *zip(*args)))
@@ -0,0 +1,561 @@
+from __future__ import annotations
+
+import logging
+from typing import Iterator
+
+import networkx as nx
+import numpy as np
+
+from viscom_backend.generator.generator import Distribution
+
+logger = logging.getLogger(__name__)
+
+TOPIC_TYPE = "std_msgs/msg/Empty"
+
+# Number of edges converted to Python objects at once when iterating the edges
+EDGE_BLOCK_SIZE = 65536
+
+
+def expand_ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenate the ranges [starts[i], starts[i] + counts[i]) without a Python loop."""
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+
+def unique_pairs(first: np.ndarray, second: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the unique (first, second) pairs of non-negative ints, sorted by first and then second."""
+    if len(first) == 0:
+        return first, second
+    # Encode each pair into a single int64, which is much faster to sort than `np.unique(..., axis=0)`
+    base = int(second.max()) + 1
+    keys = np.unique(first * base + second)
+    return keys // base, keys % base
+
+
+class EdgeArrays:
+    """Growable NumPy arrays of (source, target, topic id) edges. Removed edges are only marked as dead."""
+
+    def __init__(self, capacity: int = 1024):
+        self.sources = np.empty(capacity, dtype=np.int64)
+        self.targets = np.empty(capacity, dtype=np.int64)
+        self.topics = np.empty(capacity, dtype=np.int64)
+        self.alive = np.empty(capacity, dtype=bool)
+        self.size = 0
+
+    def _reserve(self, count: int) -> None:
+        required = self.size + count
+        if required <= len(self.sources):
+            return
+        capacity = max(required, 2 * len(self.sources))
+        for attr in ("sources", "targets", "topics", "alive"):
+            array = getattr(self, attr)
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[: self.size] = array[: self.size]
+            setattr(self, attr, grown)
+
+    def add(self, sources: np.ndarray, targets: np.ndarray, topics: np.ndarray | int) -> np.ndarray:
+        """Append edges and return their indices."""
+        count = len(sources)
+        self._reserve(count)
+        end = self.size + count
+        self.sources[self.size : end] = sources
+        self.targets[self.size : end] = targets
+        self.topics[self.size : end] = topics
+        self.alive[self.size : end] = True
+        indices = np.arange(self.size, end)
+        self.size = end
+        return indices
+
+    def remove(self, indices: np.ndarray) -> None:
+        self.alive[indices] = False
+
+    def get_alive(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        alive = self.alive[: self.size]
+        return self.sources[: self.size][alive], self.targets[: self.size][alive], self.topics[: self.size][alive]
+
+    def __len__(self) -> int:
+        return int(self.alive[: self.size].sum())
+
+
+class NodeAdjacency:
+    """
+    CSR view of the unique (node, neighbor) pairs of a set of edges.
+
+    For every pair, the topic of the first inserted edge is kept.
+    """
+
+    def __init__(self, nodes: np.ndarray, neighbors: np.ndarray, topics: np.ndarray, node_count: int):
+        order = np.lexsort((np.arange(len(nodes)), neighbors, nodes))
+        nodes, neighbors, topics = nodes[order], neighbors[order], topics[order]
+        first = np.ones(len(nodes), dtype=bool)
+        first[1:] = (nodes[1:] != nodes[:-1]) | (neighbors[1:] != neighbors[:-1])
+
+        self.nodes = nodes[first]
+        self.neighbors = neighbors[first]
+        self.topics = topics[first]
+        self.indptr = np.searchsorted(self.nodes, np.arange(node_count + 1))
+
+    def expand(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """For each of the given nodes, return (index into `nodes`, neighbor, topic) rows of all its neighbors."""
+        starts = self.indptr[nodes]
+        counts = self.indptr[nodes + 1] - starts
+        index = expand_ranges(starts, counts)
+        return np.repeat(np.arange(len(nodes)), counts), self.neighbors[index], self.topics[index]
+
+
+class NodeTopicSets:
+    """Per-node sets of published topics, stored as CSR arrays and merged incrementally with new edges."""
+
+    def __init__(self, node_count: int):
+        self.node_count = node_count
+        self.nodes = np.empty(0, dtype=np.int64)
+        self.topics = np.empty(0, dtype=np.int64)
+        self.indptr = np.zeros(node_count + 1, dtype=np.int64)
+
+    def update(self, nodes: np.ndarray, topics: np.ndarray) -> None:
+        if len(nodes) == 0:
+            return
+        self.nodes, self.topics = unique_pairs(np.concatenate([self.nodes, nodes]), np.concatenate([self.topics, topics]))
+        self.indptr = np.searchsorted(self.nodes, np.arange(self.node_count + 1))
+
+    def sample(self, nodes: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Draw one random published topic for each node, -1 for nodes without topics."""
+        starts = self.indptr[nodes]
+        counts = self.indptr[nodes + 1] - starts
+        result = np.full(len(nodes), -1, dtype=np.int64)
+        has_topics = counts > 0
+        offsets = (rng.random(int(has_topics.sum())) * counts[has_topics]).astype(np.int64)
+        result[has_topics] = self.topics[starts[has_topics] + offsets]
+        return result
+
+
+class BulkCommGraph:
+    """Result of the bulk generator: node count and edge arrays with topic ids."""
+
+    def __init__(self, node_count: int, sources: np.ndarray, targets: np.ndarray, topics: np.ndarray, topic_count: int):
+        self.node_count = node_count
+        self.sources = sources
+        self.targets = targets
+        self.topics = topics
+        self.topic_count = topic_count
+
+    @staticmethod
+    def get_topic_name(topic_id: int) -> str:
+        return f"/topic_{topic_id}"
+
+    def get_node_topics(self, endpoint_nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return the unique topics per node as CSR arrays (indptr, topics) for the given edge endpoints (sources or targets)."""
+        nodes, topics = unique_pairs(endpoint_nodes, self.topics)
+        return np.searchsorted(nodes, np.arange(self.node_count + 1)), topics
+
+    def get_node_data(self, node: int, publishers: list[int], subscribers: list[int]) -> dict:
+        return {
+            "name": f"node_{node}",
+            "namespace": "/",
+            "localhost_only": False,
+            "publishers": [{"name": self.get_topic_name(t), "type": TOPIC_TYPE, "topic_type": TOPIC_TYPE} for t in publishers],
+            "subscribers": [{"name": self.get_topic_name(t), "type": TOPIC_TYPE, "topic_type": TOPIC_TYPE} for t in subscribers],
+            "services": [],
+            "clients": [],
+        }
+
+    def iter_nodes(self) -> Iterator[tuple[int, dict]]:
+        """Yield (node, node data) one by one, the topic lists are only created for the current node."""
+        pub_indptr, pub_topics = self.get_node_topics(self.sources)
+        sub_indptr, sub_topics = self.get_node_topics(self.targets)
+        for node in range(self.node_count):
+            publishers = pub_topics[pub_indptr[node] : pub_indptr[node + 1]].tolist()
+            subscribers = sub_topics[sub_indptr[node] : sub_indptr[node + 1]].tolist()
+            yield node, self.get_node_data(node, publishers, subscribers)
+
+    def get_edge_keys(self) -> np.ndarray:
+        """Return the multigraph key of each edge, i.e. the index among the parallel edges with the same source and target."""
+        count = len(self.sources)
+        order = np.lexsort((np.arange(count), self.targets, self.sources))
+        sources, targets = self.sources[order], self.targets[order]
+        group_starts = np.ones(count, dtype=bool)
+        group_starts[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+        group_start_index = np.maximum.accumulate(np.where(group_starts, np.arange(count), 0))
+        keys = np.empty(count, dtype=np.int64)
+        keys[order] = np.arange(count) - group_start_index
+        return keys
+
+    def iter_edges(self, block_size: int = EDGE_BLOCK_SIZE) -> Iterator[tuple[int, int, int, dict]]:
+        """Yield (source, target, key, edge data), converting the arrays block by block."""
+        keys = self.get_edge_keys()
+        for start in range(0, len(self.sources), block_size):
+            end = start + block_size
+            for source, target, key, topic in zip(
+                self.sources[start:end].tolist(), self.targets[start:end].tolist(), keys[start:end].tolist(), self.topics[start:end].tolist()
+            ):
+                yield source, target, key, {"pub_topic": self.get_topic_name(topic), "type": TOPIC_TYPE}
+
+    def to_networkx(self) -> nx.MultiDiGraph:
+        """Build the communication graph in the same format as the `communication_graph` generator returns it."""
+        graph = nx.MultiDiGraph()
+        graph.add_nodes_from(self.iter_nodes())
+        graph.add_edges_from(self.iter_edges())
+        return graph
+
+
+class BulkCommGraphGenerator:
+    """
+    Vectorized variant of the `CommGraphGenerator`.
+
+    The generation stages (pipelines, forward / backward edges, cross connections and integrations, diamonds, node rewiring and broadcasts)
+    follow the same rules, but each stage draws its random choices in NumPy batches and works on a snapshot of the edges of the previous stages.
+    Edges are kept in growable arrays and networkx is only built at the end, so that large graphs can be generated in seconds.
+    """
+
+    def __init__(self):
+        self.reset(42)
+
+    def reset(self, seed: int | None) -> None:
+        if seed == 0:
+            seed = None
+        self.rng = np.random.default_rng(seed)
+        self.edges = EdgeArrays()
+        self.committed_edge_count = 0
+        self.topic_count = 0
+        self.node_count = 0
+        self.pub_topics = NodeTopicSets(0)
+
+        # Pipelines as permutation of the node ids, split by start offsets
+        self.order = np.empty(0, dtype=np.int64)
+        self.pipeline_starts = np.empty(0, dtype=np.int64)
+        self.pipeline_lengths = np.empty(0, dtype=np.int64)
+        # For each node (by id): pipeline index and position inside the pipeline
+        self.node_pipeline = np.empty(0, dtype=np.int64)
+        self.node_position = np.empty(0, dtype=np.int64)
+        # For each position in `order`: index of the edge to the next node of the pipeline (-1 for the last node)
+        self.pipeline_edges = np.empty(0, dtype=np.int64)
+
+        self.stats: dict[str, int] = {}
+
+    ####################################################################################################
+    # Helpers
+    ####################################################################################################
+
+    def new_topics(self, count: int) -> np.ndarray:
+        topics = np.arange(self.topic_count, self.topic_count + count, dtype=np.int64)
+        self.topic_count += count
+        return topics
+
+    def choose_topics(self, sources: np.ndarray, reuse_topic_probability: float) -> np.ndarray:
+        """Choose one topic per source: with the given probability an already published topic of the source, otherwise a new one."""
+        topics = np.full(len(sources), -1, dtype=np.int64)
+        reuse = self.rng.random(len(sources)) < reuse_topic_probability
+        if reuse.any():
+            topics[reuse] = self.pub_topics.sample(sources[reuse], self.rng)
+        missing = topics < 0
+        topics[missing] = self.new_topics(int(missing.sum()))
+        return topics
+
+    def add_edges(self, sources: np.ndarray, targets: np.ndarray, topics: np.ndarray) -> np.ndarray:
+        return self.edges.add(sources, targets, topics)
+
+    def commit_stage(self, name: str, count: int) -> None:
+        """Merge the topics published in the last stage into the per-node topic sets."""
+        new_edges = slice(self.committed_edge_count, self.edges.size)
+        alive = self.edges.alive[new_edges]
+        self.pub_topics.update(self.edges.sources[new_edges][alive], self.edges.topics[new_edges][alive])
+        self.committed_edge_count = self.edges.size
+        self.stats[name] = count
+
+    def sample_without_replacement(self, sizes: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """For each group g, draw counts[g] distinct offsets from range(sizes[g]). Returns (group, offset) rows."""
+        total = int(sizes.sum())
+        group_starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+        group = np.repeat(np.arange(len(sizes)), sizes)
+        offsets = np.arange(total) - group_starts
+
+        # Random order inside each group, the groups stay contiguous
+        order = np.lexsort((self.rng.random(total), group))
+        group, offsets = group[order], offsets[order]
+        keep = np.arange(total) - group_starts < np.repeat(counts, sizes)
+        return group[keep], offsets[keep]
+
+    def random_pipeline_nodes(self, count: int) -> np.ndarray:
+        """Draw a random node of a random pipeline, `count` times."""
+        pipelines = self.rng.integers(0, len(self.pipeline_lengths), size=count)
+        positions = self.rng.integers(0, self.pipeline_lengths[pipelines])
+        return self.order[self.pipeline_starts[pipelines] + positions]
+
+    def sample_edge_counts(self, max_counts: np.ndarray) -> np.ndarray:
+        """Vectorized `Distribution(0, sqrt(m), min_value=1).sample_int(only_positive=True)`, limited to m."""
+        values = np.maximum(np.abs(self.rng.normal(0, np.sqrt(max_counts))), 1)
+        return np.minimum(np.round(values).astype(np.int64), max_counts)
+
+    def get_adjacency(self) -> tuple[NodeAdjacency, NodeAdjacency]:
+        """Return the (successor, predecessor) adjacency of the current edges."""
+        sources, targets, topics = self.edges.get_alive()
+        return NodeAdjacency(sources, targets, topics, self.node_count), NodeAdjacency(targets, sources, topics, self.node_count)
+
+    ####################################################################################################
+    # Stages
+    ####################################################################################################
+
+    def generate_pipelines(self, pipeline_length: Distribution) -> None:
+        n = self.node_count
+        mu = max(pipeline_length.get_parameters(n)[0], 1)
+
+        # Draw pipeline lengths in batches until all nodes are covered
+        lengths: list[np.ndarray] = []
+        covered = 0
+        while covered < n:
+            batch_size = max(16, int((n - covered) / mu) + 16)
+            batch = np.maximum(pipeline_length.sample_int_many(n, batch_size, rng=self.rng), 1)
+            lengths.append(batch)
+            covered += int(batch.sum())
+        all_lengths = np.concatenate(lengths)
+        cumulative = np.cumsum(all_lengths)
+        pipeline_count = int(np.searchsorted(cumulative, n)) + 1
+        all_lengths = all_lengths[:pipeline_count]
+        all_lengths[-1] -= int(cumulative[pipeline_count - 1]) - n
+
+        self.order = self.rng.permutation(n).astype(np.int64)
+        self.pipeline_lengths = all_lengths
+        self.pipeline_starts = np.cumsum(all_lengths) - all_lengths
+
+        pipeline_of_position = np.repeat(np.arange(pipeline_count), all_lengths)
+        position = np.arange(n) - self.pipeline_starts[pipeline_of_position]
+        self.node_pipeline = np.empty(n, dtype=np.int64)
+        self.node_position = np.empty(n, dtype=np.int64)
+        self.node_pipeline[self.order] = pipeline_of_position
+        self.node_position[self.order] = position
+
+        # Connect consecutive nodes, every pipeline node is unconnected before, so all topics are new
+        has_next = position < all_lengths[pipeline_of_position] - 1
+        source_positions = np.flatnonzero(has_next)
+        sources = self.order[source_positions]
+        targets = self.order[source_positions + 1]
+        indices = self.add_edges(sources, targets, self.new_topics(len(sources)))
+
+        self.pipeline_edges = np.full(n, -1, dtype=np.int64)
+        self.pipeline_edges[source_positions] = indices
+        self.commit_stage("pipelines", pipeline_count)
+
+    def generate_forward_edges(self, probability: float, reuse_topic_probability: float, backward: bool = False) -> None:
+        n = self.node_count
+        positions = np.arange(n)
+        pipelines = np.repeat(np.arange(len(self.pipeline_lengths)), self.pipeline_lengths)
+        index_in_pipeline = positions - self.pipeline_starts[pipelines]
+
+        if backward:
+            # Targets are all predecessors before the direct predecessor
+            candidate_counts = np.maximum(index_in_pipeline - 1, 0)
+            candidate_starts = self.pipeline_starts[pipelines]
+        else:
+            # Targets are all successors after the direct successor
+            candidate_counts = np.maximum(self.pipeline_lengths[pipelines] - index_in_pipeline - 2, 0)
+            candidate_starts = positions + 2
+
+        selected = (self.rng.random(n) < probability) & (candidate_counts > 0)
+        source_positions = positions[selected]
+        sources = self.order[source_positions]
+        candidate_counts = candidate_counts[selected]
+        candidate_starts = candidate_starts[selected]
+
+        edge_counts = self.sample_edge_counts(candidate_counts)
+        topics = self.choose_topics(sources, reuse_topic_probability)
+        group, offsets = self.sample_without_replacement(candidate_counts, edge_counts)
+        self.add_edges(sources[group], self.order[candidate_starts[group] + offsets], topics[group])
+
+        self.commit_stage("backward_edges" if backward else "forward_edges", len(group))
+
+    def generate_cross_connections(self, probability: float, reuse_topic_probability: float) -> None:
+        sources = self.order[self.rng.random(self.node_count) < probability]
+        targets = self.random_pipeline_nodes(len(sources))
+        self.add_edges(sources, targets, self.choose_topics(sources, reuse_topic_probability))
+        self.commit_stage("cross_connections", len(sources))
+
+    def generate_cross_integrations(self, probability: float, reuse_topic_probability: float) -> None:
+        positions = np.flatnonzero(self.pipeline_edges >= 0)
+        positions = positions[self.rng.random(len(positions)) < probability]
+        count = len(positions)
+
+        nodes = self.order[positions]
+        next_nodes = self.order[positions + 1]
+        other_nodes = self.random_pipeline_nodes(count)
+
+        edge_indices = self.pipeline_edges[positions]
+        has_orig_topic = self.edges.alive[edge_indices]
+        orig_topics = self.edges.topics[edge_indices]
+
+        topics = []
+        for _ in range(2):
+            reuse = (self.rng.random(count) < reuse_topic_probability) & has_orig_topic
+            topic = np.where(reuse, orig_topics, -1)
+            topic[~reuse] = self.new_topics(int((~reuse).sum()))
+            topics.append(topic)
+
+        # Integrate the other node between node and next node
+        self.edges.remove(edge_indices)
+        self.add_edges(np.concatenate([nodes, other_nodes]), np.concatenate([other_nodes, next_nodes]), np.concatenate(topics))
+        self.commit_stage("cross_integrations", count)
+
+    def generate_diamonds(self, probability: float, reuse_topic_probability: float) -> None:
+        lengths = self.pipeline_lengths
+        max_diamond_counts = lengths - 2
+        selected = np.flatnonzero((self.rng.random(len(lengths)) < probability) & (max_diamond_counts >= 2))
+        if len(selected) == 0:
+            self.commit_stage("diamonds", 0)
+            return
+
+        max_counts = max_diamond_counts[selected]
+        diamond_counts = np.where(max_counts > 2, self.rng.integers(2, np.maximum(max_counts, 3)), 2)
+        start_positions = self.pipeline_starts[selected] + self.rng.integers(0, lengths[selected] - diamond_counts)
+
+        # Flat list of the diamond nodes, grouped by diamond
+        diamond_offsets = np.cumsum(diamond_counts) - diamond_counts
+        diamond_positions = expand_ranges(start_positions, diamond_counts)
+        diamond_nodes = self.order[diamond_positions]
+        first_nodes = self.order[start_positions]
+        last_nodes = self.order[start_positions + diamond_counts - 1]
+
+        # One topic per diamond, optionally reusing a topic published by a random diamond node
+        topics = self.choose_topics(diamond_nodes[diamond_offsets + self.rng.integers(0, diamond_counts)], reuse_topic_probability)
+
+        successors, predecessors = self.get_adjacency()
+
+        # Predecessors of the first node -> all diamond nodes
+        group, pred_nodes, _ = predecessors.expand(first_nodes)
+        members = expand_ranges(diamond_offsets[group], diamond_counts[group])
+        self.add_edges(np.repeat(pred_nodes, diamond_counts[group]), diamond_nodes[members], np.repeat(topics[group], diamond_counts[group]))
+
+        # All diamond nodes -> successors of the last node
+        group, succ_nodes, _ = successors.expand(last_nodes)
+        members = expand_ranges(diamond_offsets[group], diamond_counts[group])
+        self.add_edges(diamond_nodes[members], np.repeat(succ_nodes, diamond_counts[group]), np.repeat(topics[group], diamond_counts[group]))
+
+        # Remove the direct connections between the diamond nodes
+        index_in_diamond = np.arange(len(diamond_positions)) - np.repeat(diamond_offsets, diamond_counts)
+        inner_edges = self.pipeline_edges[diamond_positions[index_in_diamond < np.repeat(diamond_counts, diamond_counts) - 1]]
+        self.edges.remove(inner_edges[inner_edges >= 0])
+
+        self.commit_stage("diamonds", len(selected))
+
+    def generate_node_rewirings(self, probability: float, reuse_topic_probability: float) -> None:
+        lengths = self.pipeline_lengths[self.node_pipeline]
+        selected = np.flatnonzero((self.rng.random(self.node_count) < probability) & (lengths > 1))
+        if len(selected) == 0:
+            self.commit_stage("node_rewirings", 0)
+            return
+
+        # Random other node of the same pipeline
+        own_positions = self.node_position[selected]
+        other_positions = self.rng.integers(0, lengths[selected] - 1)
+        other_positions += other_positions >= own_positions
+        source_nodes = self.order[self.pipeline_starts[self.node_pipeline[selected]] + other_positions]
+        reuse = self.rng.random(len(selected)) < reuse_topic_probability
+
+        successors, predecessors = self.get_adjacency()
+
+        # All predecessors of the source node are connected to the node
+        group, pred_nodes, pred_topics = predecessors.expand(source_nodes)
+        topics = np.where(reuse[group], pred_topics, -1)
+        topics[~reuse[group]] = self.new_topics(int((~reuse[group]).sum()))
+        self.add_edges(pred_nodes, selected[group], topics)
+
+        # The node is connected to all successors of the source node
+        group, succ_nodes, succ_topics = successors.expand(source_nodes)
+        keep = succ_nodes != selected[group]
+        group, succ_nodes, succ_topics = group[keep], succ_nodes[keep], succ_topics[keep]
+        topics = np.where(reuse[group], succ_topics, -1)
+        topics[~reuse[group]] = self.new_topics(int((~reuse[group]).sum()))
+        self.add_edges(selected[group], succ_nodes, topics)
+
+        self.commit_stage("node_rewirings", len(selected))
+
+    def generate_broadcasts(self, probability: float, max_connection_fraction: float) -> None:
+        n = self.node_count
+        broadcast_nodes = np.flatnonzero(self.rng.random(n) < probability)
+        if n < 2 or len(broadcast_nodes) == 0:
+            self.commit_stage("broadcasts", 0)
+            return
+
+        max_targets = max(1, int(n * max_connection_fraction))
+        target_counts = np.minimum(self.rng.integers(1, max_targets + 1, size=len(broadcast_nodes)), n - 1)
+        connection_types = self.rng.random(len(broadcast_nodes))
+        directions_in = self.rng.random(len(broadcast_nodes)) < 0.5
+
+        sources: list[np.ndarray] = []
+        targets: list[np.ndarray] = []
+        topics: list[np.ndarray] = []
+        for node, target_count, connection_type, direction_in in zip(broadcast_nodes, target_counts, connection_types, directions_in):
+            # Sample from all other nodes
+            target_nodes = self.rng.choice(n - 1, int(target_count), replace=False)
+            target_nodes += target_nodes >= node
+            node_array = np.full(len(target_nodes), node, dtype=np.int64)
+
+            if connection_type < 0.5:
+                topic = self.new_topics(1)[0]
+                if direction_in:
+                    sources.append(target_nodes)
+                    targets.append(node_array)
+                else:
+                    sources.append(node_array)
+                    targets.append(target_nodes)
+                topics.append(np.full(len(target_nodes), topic, dtype=np.int64))
+            else:
+                in_topic, out_topic = self.new_topics(2)
+                split_point = len(target_nodes) // 2
+                sources += [target_nodes[:split_point], node_array[split_point:]]
+                targets += [node_array[:split_point], target_nodes[split_point:]]
+                topics += [np.full(split_point, in_topic, dtype=np.int64), np.full(len(target_nodes) - split_point, out_topic, dtype=np.int64)]
+
+        self.add_edges(np.concatenate(sources), np.concatenate(targets), np.concatenate(topics))
+        self.commit_stage("broadcasts", len(broadcast_nodes))
+
+    ####################################################################################################
+    # Entry points
+    ####################################################################################################
+
+    def generate_arrays(
+        self,
+        node_count: int,
+        seed: int | None = 42,
+        pipeline_length_mu="4",
+        pipeline_length_deviation="4",
+        pipeline_min_len="3",
+        forward_edge_probability=0.0,
+        backward_edge_probability=0.0,
+        cross_connection_probability=0.0,
+        cross_integration_probability=0.0,
+        diamond_probability=0.0,
+        node_rewiring_probability=0.0,
+        reuse_topic_probability=0.1,
+        broadcast_probability=0.05,
+        broadcast_connection_fraction=0.01,
+    ) -> BulkCommGraph:
+        self.reset(int(seed) if seed is not None else None)
+        self.node_count = int(node_count)
+        self.pub_topics = NodeTopicSets(self.node_count)
+        reuse_topic_probability = float(reuse_topic_probability)
+
+        if self.node_count > 0:
+            self.generate_pipelines(Distribution(pipeline_length_mu, pipeline_length_deviation, pipeline_min_len))
+            self.generate_forward_edges(float(forward_edge_probability), reuse_topic_probability)
+            self.generate_forward_edges(float(backward_edge_probability), reuse_topic_probability, backward=True)
+            self.generate_cross_connections(float(cross_connection_probability), reuse_topic_probability)
+            self.generate_cross_integrations(float(cross_integration_probability), reuse_topic_probability)
+            self.generate_diamonds(float(diamond_probability), reuse_topic_probability)
+            self.generate_node_rewirings(float(node_rewiring_probability), reuse_topic_probability)
+            self.generate_broadcasts(float(broadcast_probability), float(broadcast_connection_fraction))
+
+        logger.debug("Generated %d edges on %d topics for %d nodes: %s", len(self.edges), self.topic_count, self.node_count, self.stats)
+
+        sources, targets, topics = self.edges.get_alive()
+        return BulkCommGraph(self.node_count, sources, targets, topics, self.topic_count)
+
+    def generate(self, node_count: int, seed: int | None = 42, **kwargs) -> nx.MultiDiGraph:
+        return self.generate_arrays(node_count, seed, **kwargs).to_networkx()
+
+    @staticmethod
+    def generate_graph(node_count: int, seed: int | None = 42, **kwargs) -> nx.MultiDiGraph:
+        # A new instance per call, so that concurrent requests do not share the generator state
+        return BulkCommGraphGenerator().generate(node_count, seed, **kwargs)
+
+    @staticmethod
+    def generate_graph_arrays(node_count: int, seed: int | None = 42, **kwargs) -> BulkCommGraph:
+        """Generate the graph without building networkx, e.g. for streaming it."""
+        return BulkCommGraphGenerator().generate_arrays(node_count, seed, **kwargs)
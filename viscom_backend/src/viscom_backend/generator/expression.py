@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import ast
+import math
+import operator
+from functools import lru_cache
+from typing import Callable
+
+# Names that can be used in expressions besides the node count `n`
+EXPRESSION_FUNCTIONS: dict[str, Callable] = {
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "round": round,
+    "sqrt": math.sqrt,
+    "log": math.log,
+    "log2": math.log2,
+    "log10": math.log10,
+    "ceil": math.ceil,
+    "floor": math.floor,
+}
+
+# Limits for powers, so that expressions like "9**9**9" or "((9**64)**64)**64" cannot block the server
+MAX_EXPONENT = 64
+MAX_RESULT_BITS = 1024
+
+_BINARY_OPERATORS: dict[type, Callable[[float, float], float]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPERATORS: dict[type, Callable[[float], float]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+Expression = Callable[[float | None], float]
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions that are invalid or use anything else than arithmetic on `n`."""
+
+
+def _power(base: float, exponent: float) -> float:
+    if abs(exponent) > MAX_EXPONENT:
+        raise ExpressionError(f"Exponent {exponent} exceeds the limit of {MAX_EXPONENT}")
+    # Estimate the size of the result before computing it, integer powers are computed exactly
+    if abs(base) > 1 and abs(exponent) * math.log2(abs(base)) > MAX_RESULT_BITS:
+        raise ExpressionError(f"Result of {base}**{exponent} exceeds the limit of {MAX_RESULT_BITS} bits")
+    return operator.pow(base, exponent)
+
+
+def _compile_node(node: ast.AST, expression: str) -> Expression:
+    """Translate an AST node into a closure that evaluates it for a given `n`."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = node.value
+        return lambda n: value
+
+    if isinstance(node, ast.Name) and node.id == "n":
+
+        def get_n(n):
+            if n is None:
+                raise ExpressionError(f"Expression '{expression}' requires the node count n")
+            return n
+
+        return get_n
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        left = _compile_node(node.left, expression)
+        right = _compile_node(node.right, expression)
+        op = _power if isinstance(node.op, ast.Pow) else _BINARY_OPERATORS[type(node.op)]
+        return lambda n: op(left(n), right(n))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        operand = _compile_node(node.operand, expression)
+        unary_op = _UNARY_OPERATORS[type(node.op)]
+        return lambda n: unary_op(operand(n))
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in EXPRESSION_FUNCTIONS and not node.keywords:
+        func = EXPRESSION_FUNCTIONS[node.func.id]
+        args = [_compile_node(arg, expression) for arg in node.args]
+        return lambda n: func(*(arg(n) for arg in args))
+
+    raise ExpressionError(f"Unsupported element '{type(node).__name__}' in expression '{expression}'")
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> Expression:
+    """
+    Compile an arithmetic expression on the node count `n` (e.g. "sqrt(n) / 2 + 1") into a function of `n`.
+
+    Only numbers, `n`, the arithmetic operators and the functions in `EXPRESSION_FUNCTIONS` are allowed.
+    The compiled function is cached per expression string.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression '{expression}': {e.msg}") from None
+    evaluate = _compile_node(tree.body, expression)
+
+    def evaluate_checked(n: float | None) -> float:
+        try:
+            return evaluate(n)
+        except (ArithmeticError, TypeError, ValueError) as e:
+            if isinstance(e, ExpressionError):
+                raise
+            raise ExpressionError(f"Failed to evaluate expression '{expression}' for n={n}: {e}") from None
+
+    return evaluate_checked
+
+
+def evaluate_expression(expression: float | int | str, n: float | None = None) -> float:
+    """Return the value of a number or an expression string for the given node count."""
+    if isinstance(expression, (int, float)):
+        return expression
+    return compile_expression(str(expression))(n)
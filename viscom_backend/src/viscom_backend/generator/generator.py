@@ -1,9 +1,12 @@
+from __future__ import annotations
+
 import math
-import random
 
 import networkx as nx
 import numpy as np
 
+from viscom_backend.generator.expression import evaluate_expression
+
 
 class Distribution:
     def __init__(
@@ -18,31 +21,69 @@ class Distribution:
 
     @staticmethod
     def get_value(value: float | str, total_node_count: int | None) -> float:
-        if isinstance(value, float):
-            return value
-        else:
-            return eval(str(value), {"n": total_node_count} if total_node_count else {})
+        # Expressions are restricted to arithmetic on n and compiled once per expression string
+        return evaluate_expression(value, total_node_count)
+
+    def get_parameters(self, total_node_count: int | None) -> tuple[float, float, float]:
+        """Return the evaluated (expected value, deviation, min value) for the given node count."""
+        return (
+            Distribution.get_value(self.expected_value, total_node_count),
+            Distribution.get_value(self.deviation, total_node_count),
+            Distribution.get_value(self.min_value, total_node_count),
+        )
 
-    def sample(self, total_node_count: int | None, only_positive=False) -> float:
-        expected_value = Distribution.get_value(self.expected_value, total_node_count)
-        deviation = Distribution.get_value(self.deviation, total_node_count)
+    def sample(self, total_node_count: int | None, only_positive=False, rng: np.random.Generator | None = None) -> float:
+        expected_value, deviation, min_value = self.get_parameters(total_node_count)
 
-        val = np.random.normal(expected_value, deviation)
+        val = rng.normal(expected_value, deviation) if rng is not None else np.random.normal(expected_value, deviation)
 
         if only_positive:
             val = abs(val)
-        val = max(val, Distribution.get_value(self.min_value, total_node_count))
+        val = max(val, min_value)
         return val
 
-    def sample_int(self, total_node_count: int | None, only_positive=False) -> int:
-        return round(self.sample(total_node_count, only_positive))
+    def sample_int(self, total_node_count: int | None, only_positive=False, rng: np.random.Generator | None = None) -> int:
+        return round(self.sample(total_node_count, only_positive, rng))
 
+    def sample_many(self, total_node_count: int | None, size: int, only_positive=False, rng: np.random.Generator | None = None) -> np.ndarray:
+        """Draw `size` samples at once, evaluating the parameter expressions only once."""
+        expected_value, deviation, min_value = self.get_parameters(total_node_count)
 
-class GenBase:
-    topic_counter: int = 0
+        values = rng.normal(expected_value, deviation, size) if rng is not None else np.random.normal(expected_value, deviation, size)
 
-    def __init__(self):
+        if only_positive:
+            values = np.abs(values)
+        return np.maximum(values, min_value)
+
+    def sample_int_many(self, total_node_count: int | None, size: int, only_positive=False, rng: np.random.Generator | None = None) -> np.ndarray:
+        return np.round(self.sample_many(total_node_count, size, only_positive, rng)).astype(np.int64)
+
+
+class GenContext:
+    """
+    State of a single generator run: the random number generator and the topic counter.
+
+    All stages of a run share one context, so that concurrent runs neither share randomness nor topic names.
+    """
+
+    def __init__(self, seed: int | None = None):
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        self.topic_counter: int = 0
+
+    def get_new_topic_name(self) -> str:
+        topic_name = f"/topic_{self.topic_counter}"
+        self.topic_counter += 1
+        return topic_name
+
+
+class GenBase:
+    def __init__(self, context: GenContext | None = None):
         self.count_already_generated = 0
+        self.context = context or GenContext()
+
+    @property
+    def rng(self) -> np.random.Generator:
+        return self.context.rng
 
     def generate(self, graph: nx.MultiDiGraph) -> nx.MultiDiGraph:
         self.generate_implementation(graph)
@@ -59,16 +100,18 @@ class GenBase:
         count = min(node_count, len(node_ids))
         if count == 0 or len(node_ids) == 0:
             return []
-        random_ids: list = np.random.choice(list(node_ids), count, replace=False).tolist()
+        random_ids: list = self.rng.choice(list(node_ids), count, replace=False).tolist()
         return random_ids
 
     def do_with_probability(self, probability: float) -> bool:
-        return np.random.rand() < probability
+        return self.rng.random() < probability
 
-    @staticmethod
-    def get_random_selection_of_ids(ids: set[int], count: int) -> list[int]:
+    def random_choice(self, items: list):
+        return items[self.rng.integers(len(items))]
+
+    def get_random_selection_of_ids(self, ids: set[int], count: int) -> list[int]:
         count = min(count, len(ids))
-        return np.random.choice(list(ids), count, replace=False).tolist()  # type: ignore
+        return self.rng.choice(list(ids), count, replace=False).tolist()  # type: ignore
 
     @staticmethod
     def get_unconnected_ids(graph: nx.MultiDiGraph) -> set[int]:
@@ -86,9 +129,7 @@ class GenBase:
             graph.add_edge(source_id, target_id, topic=topic_name, type="std_msgs/msg/Empty")
 
     def get_new_topic_name(self):
-        topic_name = f"/topic_{GenBase.topic_counter}"
-        GenBase.topic_counter += 1
-        return topic_name
+        return self.context.get_new_topic_name()
 
     def get_node_pub_topics(self, graph: nx.MultiDiGraph, node_id: int) -> list[str]:
         topics = []
@@ -116,8 +157,8 @@ class GenPipeline(GenBase):
     - prioritize source and sink nodes to be already connected nodes
     """
 
-    def __init__(self, pipeline_length: Distribution, reuse_topic_probability: float = 0.1):
-        super().__init__()
+    def __init__(self, pipeline_length: Distribution, reuse_topic_probability: float = 0.1, context: GenContext | None = None):
+        super().__init__(context)
         self.pipeline_length = pipeline_length
         self.generated_pipelines: list[list[int]] = []
         self.reuse_topic_probability = float(reuse_topic_probability)
@@ -131,7 +172,7 @@ class GenPipeline(GenBase):
             if self.do_with_probability(self.reuse_topic_probability):
                 source_topics = self.get_node_pub_topics(graph, node_ids[i - 1])
                 if source_topics:
-                    topic = random.choice(source_topics)
+                    topic = self.random_choice(source_topics)
                 else:
                     topic = self.get_new_topic_name()
             else:
@@ -141,16 +182,23 @@ class GenPipeline(GenBase):
 
     def generate_implementation(self, graph: nx.MultiDiGraph, node_count: int = -1) -> nx.MultiDiGraph:
         total_node_count = len(graph.nodes)
-        unconnected_ids = self.get_unconnected_ids(graph)
-        while len(unconnected_ids) > 0:
-            # Get number of nodes to generate
-            pipeline_length = self.pipeline_length.sample_int(total_node_count)
+        # Random order of the unconnected nodes, pipelines take consecutive slices of it
+        unconnected_ids: list[int] = self.rng.permutation(sorted(self.get_unconnected_ids(graph))).tolist()
+        pipeline_lengths: list[int] = []
+        start = 0
+        while start < len(unconnected_ids):
+            if not pipeline_lengths:
+                # Draw the lengths in batches, roughly as many as pipelines are still needed
+                expected_length = max(self.pipeline_length.get_parameters(total_node_count)[0], 1)
+                batch_size = int((len(unconnected_ids) - start) / expected_length) + 1
+                pipeline_lengths = self.pipeline_length.sample_int_many(total_node_count, batch_size, rng=self.rng).tolist()[::-1]
+            # Get number of nodes to generate (at least one, so that the loop terminates)
+            pipeline_length = max(pipeline_lengths.pop(), 1)
             # Get random IDs from unconnected nodes
-            random_ids = self.get_random_selection_of_ids(unconnected_ids, pipeline_length)
+            random_ids = unconnected_ids[start : start + pipeline_length]
+            start += len(random_ids)
             # Connect nodes in pipeline
             self.connect_ids_with_a_pipeline(graph, random_ids)
-            # Remove connected nodes from unconnected nodes
-            unconnected_ids -= set(random_ids)
             # Add pipeline to generated pipelines
             self.generated_pipelines.append(random_ids)
             print(f"[PIPELINE] Generated pipeline: {random_ids}")
@@ -166,7 +214,7 @@ class GenForwardEdge(GenBase):
     """
 
     def __init__(self, pipeline_generator: GenPipeline, probability: float, reuse_topic_probability: float = 0.1):
-        super().__init__()
+        super().__init__(pipeline_generator.context)
         self.probability = float(probability)
         self.pipeline_generator = pipeline_generator
         self.count_added_forward_edges = 0
@@ -185,12 +233,12 @@ class GenForwardEdge(GenBase):
                     # The max count of forwart edges is the length of the pipeline minus the current node
                     max_forward_edges = len(all_successor_ids_after_direct_successor)
                     distribution = Distribution(0, math.sqrt(max_forward_edges), min_value=1)
-                    forward_edge_count = distribution.sample_int(max_forward_edges, only_positive=True)
+                    forward_edge_count = distribution.sample_int(max_forward_edges, only_positive=True, rng=self.rng)
                     target_ids = self.get_random_selection_of_ids(set(all_successor_ids_after_direct_successor), forward_edge_count)
                     if self.do_with_probability(self.reuse_topic_probability):
                         source_topics = self.get_node_pub_topics(graph, node_id)
                         if source_topics:
-                            topic = random.choice(source_topics)
+                            topic = self.random_choice(source_topics)
                         else:
                             topic = self.get_new_topic_name()
                     else:
@@ -212,7 +260,7 @@ class GenBackwardEdge(GenBase):
     """
 
     def __init__(self, pipeline_generator: GenPipeline, probability: float, reuse_topic_probability: float = 0.1):
-        super().__init__()
+        super().__init__(pipeline_generator.context)
         self.probability = float(probability)
         self.pipeline_generator = pipeline_generator
         self.count_added_backward_edges = 0
@@ -234,7 +282,7 @@ class GenBackwardEdge(GenBase):
                     # The max count of backward edges is the length of the pipeline minus the current node
                     max_backward_edges = len(all_predecessor_ids_before_direct_predecessor)
                     distribution = Distribution(0, math.sqrt(max_backward_edges), min_value=1)
-                    backward_edge_count = distribution.sample_int(max_backward_edges, only_positive=True)
+                    backward_edge_count = distribution.sample_int(max_backward_edges, only_positive=True, rng=self.rng)
                     # Get target nodes
                     target_ids = self.get_random_selection_of_ids(
                         set(all_predecessor_ids_before_direct_predecessor),
@@ -243,7 +291,7 @@ class GenBackwardEdge(GenBase):
                     if self.do_with_probability(self.reuse_topic_probability):
                         source_topics = self.get_node_pub_topics(graph, node_id)
                         if source_topics:
-                            topic = random.choice(source_topics)
+                            topic = self.random_choice(source_topics)
                         else:
                             topic = self.get_new_topic_name()
                     else:
@@ -262,7 +310,7 @@ class GenCrossConnection(GenBase):
     """
 
     def __init__(self, pipeline_generator: GenPipeline, probability: float, reuse_topic_probability: float = 0.1):
-        super().__init__()
+        super().__init__(pipeline_generator.context)
         self.probability = float(probability)
         self.pipeline_generator = pipeline_generator
         self.reuse_topic_probability = float(reuse_topic_probability)
@@ -273,12 +321,12 @@ class GenCrossConnection(GenBase):
             for node in pipeline:
                 if self.do_with_probability(self.probability):
                     # Get random pipeline
-                    other_pipeline = random.choice(pipelines)
-                    other_node = random.choice(other_pipeline)
+                    other_pipeline = self.random_choice(pipelines)
+                    other_node = self.random_choice(other_pipeline)
                     if self.do_with_probability(self.reuse_topic_probability):
                         source_topics = self.get_node_pub_topics(graph, node)
                         if source_topics:
-                            topic = random.choice(source_topics)
+                            topic = self.random_choice(source_topics)
                         else:
                             topic = self.get_new_topic_name()
                     else:
@@ -295,7 +343,7 @@ class GenCrossIntegration(GenBase):
     """
 
     def __init__(self, pipeline_generator: GenPipeline, probability: float, reuse_topic_probability: float = 0.1):
-        super().__init__()
+        super().__init__(pipeline_generator.context)
         self.probability = float(probability)
         self.pipeline_generator = pipeline_generator
         self.reuse_topic_probability = float(reuse_topic_probability)
@@ -308,8 +356,8 @@ class GenCrossIntegration(GenBase):
                 next_node = pipeline[node_index + 1]
                 if self.do_with_probability(self.probability):
                     # Get random pipeline
-                    other_pipeline = random.choice(pipelines)
-                    other_node = random.choice(other_pipeline)
+                    other_pipeline = self.random_choice(pipelines)
+                    other_node = self.random_choice(other_pipeline)
 
                     # Remove edge between node and next node
                     # Connect node with other node
@@ -369,7 +417,7 @@ class GenDiamond(GenBase):
     """
 
     def __init__(self, pipeline_generator: GenPipeline, probability: float, reuse_topic_probability: float = 0.1):
-        super().__init__()
+        super().__init__(pipeline_generator.context)
         self.pipeline_generator = pipeline_generator
         self.probability = float(probability)
         self.reuse_topic_probability = float(reuse_topic_probability)
@@ -382,15 +430,15 @@ class GenDiamond(GenBase):
                 max_diamond_count = pipeline_length - 2
                 if max_diamond_count < 2:
                     continue
-                diamond_count = np.random.randint(2, max_diamond_count) if max_diamond_count > 2 else 2
-                start_index = np.random.randint(0, pipeline_length - diamond_count)
+                diamond_count = int(self.rng.integers(2, max_diamond_count)) if max_diamond_count > 2 else 2
+                start_index = int(self.rng.integers(0, pipeline_length - diamond_count))
                 diamond_nodes = pipeline[start_index : start_index + diamond_count]
                 if self.do_with_probability(self.reuse_topic_probability):
                     all_topics = []
                     for node in diamond_nodes:
                         all_topics.extend(self.get_node_pub_topics(graph, node))
                     if all_topics:
-                        diamond_topic = random.choice(all_topics)
+                        diamond_topic = self.random_choice(all_topics)
                     else:
                         diamond_topic = self.get_new_topic_name()
                 else:
@@ -425,7 +473,7 @@ class GenNodeRewiring(GenBase):
     """
 
     def __init__(self, pipeline_generator: GenPipeline, probability: float, reuse_topic_probability: float = 0.1):
-        super().__init__()
+        super().__init__(pipeline_generator.context)
         self.pipeline_generator = pipeline_generator
         self.probability = float(probability)
         self.reuse_topic_probability = float(reuse_topic_probability)
@@ -437,7 +485,7 @@ class GenNodeRewiring(GenBase):
             for node_index, node in enumerate(pipeline):
                 if self.do_with_probability(self.probability):
                     max_tries = 10
-                    while (source_node := random.choice(pipeline)) == node:
+                    while (source_node := self.random_choice(pipeline)) == node:
                         max_tries -= 1
                         if max_tries == 0:
                             break
@@ -548,8 +596,8 @@ class GenNodeRewiring(GenBase):
 
 
 class GenBroadcast(GenBase):
-    def __init__(self, probability: float, max_connection_fraction: float):
-        super().__init__()
+    def __init__(self, probability: float, max_connection_fraction: float, context: GenContext | None = None):
+        super().__init__(context)
         self.probability = float(probability)
         self.connection_fraction = float(max_connection_fraction)
 
@@ -559,14 +607,15 @@ class GenBroadcast(GenBase):
             if self.do_with_probability(self.probability):
                 # target_count = max(1, int(len(nodes) * self.connection_fraction))
                 target_count = max(1, int(len(nodes) * self.connection_fraction))
-                target_count = random.randint(1, target_count)
+                target_count = int(self.rng.integers(1, target_count + 1))
                 potential_targets = [n for n in nodes if n != node]
                 if not potential_targets:
                     continue
-                target_nodes = random.sample(potential_targets, min(target_count, len(potential_targets)))
-                connection_type = random.random()
+                target_indices = self.rng.choice(len(potential_targets), min(target_count, len(potential_targets)), replace=False)
+                target_nodes = [potential_targets[i] for i in target_indices]
+                connection_type = self.rng.random()
                 if connection_type < 0.5:
-                    direction = "in" if random.random() < 0.5 else "out"
+                    direction = "in" if self.rng.random() < 0.5 else "out"
                     broadcast_topic = self.get_new_topic_name()
                     if direction == "in":
                         for target in target_nodes:
@@ -616,15 +665,14 @@ class CommGraphGenerator:
     ) -> nx.MultiDiGraph:
         if seed == 0:
             seed = None
-        np.random.seed(seed)
-        random.seed(seed)
+        # Randomness and topic counter of this run, shared by all stages
+        context = GenContext(seed)
         graph = nx.MultiDiGraph()
-        GenBase.topic_counter = 0
         # Add nodes
         for i in range(node_count):
             graph.add_node(i)
         # Generate pipelines
-        pipeline_gen = GenPipeline(Distribution(pipeline_length_mu, pipeline_length_deviation, pipeline_min_len), reuse_topic_probability)
+        pipeline_gen = GenPipeline(Distribution(pipeline_length_mu, pipeline_length_deviation, pipeline_min_len), reuse_topic_probability, context=context)
         pipeline_gen.generate(graph)
         print(f"Generated {pipeline_gen.generated_pipeline_count} pipelines.")
         # Generate forward edges
@@ -653,7 +701,7 @@ class CommGraphGenerator:
         print("Generated node rewirings.")
 
         # Generate broadcast nodes
-        broadcast_gen = GenBroadcast(probability=broadcast_probability, max_connection_fraction=broadcast_connection_fraction)
+        broadcast_gen = GenBroadcast(probability=broadcast_probability, max_connection_fraction=broadcast_connection_fraction, context=context)
         broadcast_gen.generate(graph)
         print("Generated broadcast nodes.")
 
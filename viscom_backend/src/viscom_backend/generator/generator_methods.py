@@ -1,19 +1,36 @@
 from __future__ import annotations
 
-import random
+import inspect
+import threading
+from typing import Any
 
 import networkx as nx
+import numpy as np
 
 from viscom_backend.commgraph.converter import convert_normal_graph_to_commgraph
+from viscom_backend.data.catalog import DatasetInfo, dataset_catalog
 from viscom_backend.data.reader import RosMetaSysGraphGenerator
+from viscom_backend.generator.bulk_generator import BulkCommGraphGenerator
 from viscom_backend.generator.generator import CommGraphGenerator
 
 MAX_NODES = 1000
+# The bulk generator is meant for scaling benchmarks with much larger graphs
+MAX_BULK_NODES = 200_000
 
 
 def get_nx_to_commgraph_method(nx_method):
-    def nx_to_commgraph_method(*args, **kwargs):
+    # The seed is passed on to the wrapped method only if it accepts one
+    accepts_seed = "seed" in inspect.signature(nx_method).parameters
+
+    def nx_to_commgraph_method(*args, seed: int | None = None, **kwargs):
+        # The frontend sends 0 for an unset seed, so 0 means a random graph like in the other generators
+        if seed == 0:
+            seed = None
+        if accepts_seed:
+            kwargs["seed"] = seed
         graph: nx.Graph = nx_method(*args, **kwargs)
+        # Per-call random number generator, so that concurrent calls do not share random state
+        rng = np.random.default_rng(seed)
 
         # Convert to directed graph if not already
         if not graph.is_directed():
@@ -26,7 +43,7 @@ def get_nx_to_commgraph_method(nx_method):
             graph = nx.DiGraph()
             for start_node, connections in dir_graph.adjacency():
                 for target_node, topic_data in connections.items():
-                    if random.random() < 0.5:
+                    if rng.random() < 0.5:
                         graph.add_edge(start_node, target_node, **topic_data)
 
         # # Print the graph information
@@ -51,8 +68,8 @@ def get_generator_output(graph_generator):
     return generator_output
 
 
-def get_lfr_benchmark_graph(*args, **kwargs):
-    graph = nx.LFR_benchmark_graph(*args, **kwargs)
+def get_lfr_benchmark_graph(*args, seed: int | None = None, **kwargs):
+    graph = nx.LFR_benchmark_graph(*args, seed=seed, **kwargs)
     # return convert_to_weighted_graph(graph)
 
     # Remove the community attribute from each of the nodes
@@ -67,8 +84,10 @@ generator_methods_config = {
         "params": [
             {"key": "r", "type": "int", "description": "Branching factor of the tree", "range": [1, 10], "default": 2},
             {"key": "n", "type": "int", "description": "Number of nodes", "range": [1, MAX_NODES], "default": 10},
+            {"key": "seed", "type": "int", "description": "Seed for random number generator", "range": [0, 2**32 - 1], "default": None},
         ],
         "description": "Creates a full r-ary tree of n nodes.",
+        "seed_param": "seed",
         "method": get_nx_to_commgraph_method(nx.full_rary_tree),
     },
     "watts_strogatz": {
@@ -79,6 +98,7 @@ generator_methods_config = {
             {"key": "seed", "type": "int", "description": "Seed for random number generator", "range": [0, 2**32 - 1], "default": None},
         ],
         "description": "Generates a Watts-Strogatz small-world graph.",
+        "seed_param": "seed",
         "method": get_generator_output(get_nx_to_commgraph_method(nx.watts_strogatz_graph)),
     },
     "barabasi_albert": {
@@ -88,14 +108,17 @@ generator_methods_config = {
             {"key": "seed", "type": "int", "description": "Seed for random number generator", "range": [0, 2**32 - 1], "default": None},
         ],
         "description": "Generates a Barabási-Albert preferential attachment graph.",
+        "seed_param": "seed",
         "method": get_generator_output(get_nx_to_commgraph_method(nx.barabasi_albert_graph)),
     },
     "random_graph": {
         "params": [
             {"key": "n", "type": "int", "description": "Number of nodes", "range": [1, MAX_NODES], "default": 10},
             {"key": "p", "type": "float", "description": "Probability for edge creation", "range": [0.0, 1.0], "default": 0.1},
+            {"key": "seed", "type": "int", "description": "Seed for random number generator", "range": [0, 2**32 - 1], "default": None},
         ],
         "description": "Generates a random graph using the Erdős-Rényi model.",
+        "seed_param": "seed",
         "method": get_generator_output(get_nx_to_commgraph_method(nx.gnp_random_graph)),
     },
     "communication_graph": {
@@ -136,8 +159,52 @@ generator_methods_config = {
             },
         ],
         "description": "Generates a random graph using the Erdős-Rényi model.",
+        "seed_param": "seed",
         "method": get_generator_output(get_nx_to_commgraph_method(CommGraphGenerator().generate)),
     },
+    "communication_graph_bulk": {
+        "params": [
+            {"key": "node_count", "type": "int", "description": "Number of nodes", "range": [1, MAX_BULK_NODES], "default": 10000},
+            {"key": "seed", "type": "int", "description": "Seed for random number generator", "range": [0, 2**32 - 1], "default": "55"},
+            {"key": "pipeline_length_mu", "type": "str", "description": "Mean of the pipeline length distribution", "default": "4"},
+            {"key": "pipeline_length_deviation", "type": "str", "description": "Standard deviation of the pipeline length distribution", "default": "4"},
+            {"key": "pipeline_min_len", "type": "str", "description": "Minimum length of the pipeline", "default": "3"},
+            {"key": "forward_edge_probability", "type": "str", "description": "Probability to generate a forward edge inside a pipeline", "default": "0.0"},
+            {"key": "backward_edge_probability", "type": "str", "description": "Probability to generate a backward edge inside a pipeline", "default": "0.0"},
+            {"key": "cross_connection_probability", "type": "str", "description": "Probability to generate a cross connection between pipelines", "default": "0.0"},
+            {"key": "cross_integration_probability", "type": "str", "description": "Probability to generate a cross integration between pipelines", "default": "0.0"},
+            {"key": "diamond_probability", "type": "str", "description": "Probability to generate a diamond connection in a pipeline", "default": "0.0"},
+            {
+                "key": "node_rewiring_probability",
+                "type": "str",
+                "description": "Probability to rewire the connections of a node to another node in the same pipeline",
+                "default": "0.0",
+            },
+            {
+                "key": "reuse_topic_probability",
+                "type": "str",
+                "description": "Probability to reuse an existing topic instead of creating a new one",
+                "default": "0.1",
+            },
+            {
+                "key": "broadcast_probability",
+                "type": "str",
+                "description": "Probability for a node to become a broadcast node",
+                "default": "0.05",
+            },
+            {
+                "key": "broadcast_connection_fraction",
+                "type": "str",
+                "description": "Max. Fraction of nodes that a broadcast node connects to",
+                "default": "0.01",
+            },
+        ],
+        "description": "Vectorized variant of the communication graph generator for large graphs (e.g. for scaling benchmarks).",
+        "seed_param": "seed",
+        "method": get_generator_output(BulkCommGraphGenerator.generate_graph),
+        # Generates the edge arrays only, the streaming endpoint creates nodes and edges from them on the fly
+        "stream_method": BulkCommGraphGenerator.generate_graph_arrays,
+    },
     "LFR_benchmark": {
         "params": [
             {"key": "n", "type": "int", "description": "Number of nodes", "range": [1, MAX_NODES], "default": 100},
@@ -147,15 +214,46 @@ generator_methods_config = {
             {"key": "min_degree", "type": "int", "description": "Minimum degree of nodes", "range": [1, MAX_NODES], "default": 2},
             {"key": "min_community", "type": "int", "description": "Minimum community size", "range": [1, MAX_NODES], "default": 5},
             {"key": "max_community", "type": "int", "description": "Maximum community size", "range": [1, MAX_NODES], "default": 50},
+            {"key": "seed", "type": "int", "description": "Seed for random number generator", "range": [0, 2**32 - 1], "default": None},
         ],
         "description": "Generates a LFR benchmark graph.",
+        "seed_param": "seed",
         "method": get_generator_output(get_nx_to_commgraph_method(get_lfr_benchmark_graph)),
     },
     "zacharys_karate_club": {
-        "params": [],
+        "params": [
+            {"key": "seed", "type": "int", "description": "Seed for random number generator", "range": [0, 2**32 - 1], "default": None},
+        ],
         "description": "Generates the Zachary's Karate Club graph.",
+        "seed_param": "seed",
         "method": get_generator_output(get_nx_to_commgraph_method(nx.karate_club_graph)),
     },
 }
 
-RosMetaSysGraphGenerator.extent_generator_methods(generator_methods_config)
+_generator_methods_lock = threading.Lock()
+
+
+def get_generator_methods_config() -> dict[str, Any]:
+    """
+    Return the current generator config including the saved datasets.
+
+    The config is replaced as a whole when the datasets change, so callers should fetch it once per request and not modify it.
+    """
+    return generator_methods_config
+
+
+def update_generator_methods_config(datasets: dict[str, DatasetInfo] | None = None) -> dict[str, Any]:
+    """Rebuild the saved dataset entries from the given datasets (by default of a rescan of the catalog) and swap in the new config."""
+    global generator_methods_config
+    # Rescan outside the lock, as a changed directory calls the listener below, which updates the config itself
+    if datasets is None:
+        datasets = dataset_catalog.get_datasets()
+    with _generator_methods_lock:
+        generator_methods_config = RosMetaSysGraphGenerator.extent_generator_methods(generator_methods_config, datasets)
+        return generator_methods_config
+
+
+update_generator_methods_config()
+
+# Keep the saved datasets in sync with the dataset directory
+dataset_catalog.add_listener(lambda catalog: update_generator_methods_config(catalog.datasets))
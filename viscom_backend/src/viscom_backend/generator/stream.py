@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Iterator
+
+import networkx as nx
+
+from viscom_backend.data.writer import iter_meta_system_nodes
+from viscom_backend.generator.bulk_generator import BulkCommGraph
+from viscom_backend.transport import dumps_json
+
+MIME_NDJSON = "application/x-ndjson"
+
+# Serialized items are collected into chunks of about this size before they are sent
+STREAM_CHUNK_SIZE = 64 * 1024
+
+NodeItem = tuple[Any, dict[str, Any]]
+EdgeItem = tuple[Any, Any, Any, dict[str, Any]]
+
+
+class GraphStream:
+    """
+    Nodes and edges of a generated graph that can be iterated (once or multiple times) without building the serialized graph in memory.
+
+    Graphs of the bulk generator are not even built as networkx graph, their nodes and edges are created from the edge arrays on the fly.
+    """
+
+    def __init__(
+        self,
+        node_count: int,
+        iter_nodes: Callable[[], Iterable[NodeItem]],
+        iter_edges: Callable[[], Iterable[EdgeItem]],
+        iter_dataset_nodes: Callable[[], Iterable[dict[str, Any]]],
+        directed: bool = True,
+        multigraph: bool = True,
+        graph_data: dict[str, Any] | None = None,
+    ):
+        self.node_count = node_count
+        self.iter_nodes = iter_nodes
+        self.iter_edges = iter_edges
+        self.iter_dataset_nodes = iter_dataset_nodes
+        self.directed = directed
+        self.multigraph = multigraph
+        self.graph_data = graph_data or {}
+
+    @staticmethod
+    def from_graph(graph: nx.Graph) -> GraphStream:
+        multigraph = graph.is_multigraph()
+
+        def iter_edges() -> Iterator[EdgeItem]:
+            if multigraph:
+                yield from graph.edges(keys=True, data=True)
+            else:
+                for source, target, edge_data in graph.edges(data=True):
+                    yield source, target, None, edge_data
+
+        return GraphStream(
+            graph.number_of_nodes(),
+            lambda: graph.nodes(data=True),
+            iter_edges,
+            lambda: iter_meta_system_nodes(graph),
+            directed=graph.is_directed(),
+            multigraph=multigraph,
+            graph_data=graph.graph,
+        )
+
+    @staticmethod
+    def from_bulk(bulk_graph: BulkCommGraph) -> GraphStream:
+        # The bulk node data is already in the ROS meta system format
+        return GraphStream(bulk_graph.node_count, bulk_graph.iter_nodes, bulk_graph.iter_edges, lambda: (data for _, data in bulk_graph.iter_nodes()))
+
+    def get_header(self) -> dict[str, Any]:
+        return {"directed": self.directed, "multigraph": self.multigraph, "graph": self.graph_data}
+
+    def iter_node_link_items(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Yield ("node", node) and ("link", link) items in the node-link format of `graph_to_node_link`."""
+        for node, node_data in self.iter_nodes():
+            yield "node", {**node_data, "id": node}
+        for source, target, key, edge_data in self.iter_edges():
+            link = {**edge_data, "source": source, "target": target}
+            if self.multigraph:
+                link["key"] = key
+            yield "link", link
+
+
+def _chunked(parts: Iterable[bytes], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Join small byte strings into chunks of about `chunk_size` bytes."""
+    buffer: list[bytes] = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def iter_ndjson(stream: GraphStream) -> Iterator[bytes]:
+    """
+    Serialize a graph stream as newline delimited JSON.
+
+    Each line is an object with a single key: the first line {"graph": {"directed", "multigraph", "graph"}}, followed by one
+    {"node": {"id", ...}} line per node and one {"link": {"source", "target", "key", ...}} line per link.
+    """
+
+    def iter_lines() -> Iterator[bytes]:
+        yield dumps_json({"graph": stream.get_header()}) + b"\n"
+        for item_type, item in stream.iter_node_link_items():
+            yield dumps_json({item_type: item}) + b"\n"
+
+    return _chunked(iter_lines())
+
+
+def iter_node_link_json(stream: GraphStream) -> Iterator[bytes]:
+    """Serialize a graph stream as a single node-link JSON document (the same format as `/generate/<generator>`), piece by piece."""
+
+    def iter_parts() -> Iterator[bytes]:
+        header = dumps_json(stream.get_header())
+        yield header[:-1] + b',"nodes":['
+        previous_type = "node"
+        first = True
+        for item_type, item in stream.iter_node_link_items():
+            if item_type != previous_type:
+                yield b'],"links":['
+                previous_type = item_type
+                first = True
+            yield (b"" if first else b",") + dumps_json(item)
+            first = False
+        if previous_type == "node":
+            yield b'],"links":['
+        yield b"]}"
+
+    return _chunked(iter_parts())
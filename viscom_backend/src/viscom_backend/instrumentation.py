@@ -0,0 +1,217 @@
+"""
+Lightweight timing instrumentation of the compute stages.
+
+Stages are timed with the `timer` context manager or the `timed` decorator, events are counted with `increment`:
+
+    with timer("communities.comm_splitter.level"):
+        ...
+
+    @timed()  # stage "converter.convert_to_weighted_graph"
+    def convert_to_weighted_graph(...): ...
+
+All measurements are aggregated in the process wide `instrumentation` registry, which is exposed in the Prometheus text format.
+Additionally, the stages of the current request are collected (see `start_request_stages`) to be returned as `Server-Timing` header.
+
+The registry is per process: stages running in the worker processes of the metrics processor are not part of it.
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Prefix of all exported Prometheus metrics
+METRIC_PREFIX = "viscom"
+
+# Upper bounds (in seconds) of the buckets of the stage duration histograms
+DURATION_BUCKETS: tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+_INVALID_TOKEN_CHARS = re.compile(r"[^a-zA-Z0-9_.\-]")
+
+
+def _get_labels(labels: dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label_value(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class TimerStats:
+    """Count, sum, maximum and histogram of the durations of a stage."""
+
+    __slots__ = ("count", "total", "max", "bucket_counts")
+
+    def __init__(self, bucket_count: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bucket_counts = [0] * bucket_count
+
+    def observe(self, seconds: float, buckets: tuple[float, ...]) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for i, upper_bound in enumerate(buckets):
+            if seconds <= upper_bound:
+                self.bucket_counts[i] += 1
+                break
+
+
+class Instrumentation:
+    """Thread-safe registry of the stage durations and counters of the process."""
+
+    def __init__(self, buckets: tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self._timers: dict[tuple[str, Labels], TimerStats] = {}
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, **labels: Any) -> None:
+        key = (stage, _get_labels(labels))
+        with self._lock:
+            stats = self._timers.get(key)
+            if stats is None:
+                stats = self._timers[key] = TimerStats(len(self.buckets))
+            stats.observe(seconds, self.buckets)
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = (name, _get_labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    def get_stage_stats(self) -> dict[str, dict[str, float]]:
+        """Return count, sum and maximum of the durations per stage (summed over the labels)."""
+        stages: dict[str, dict[str, float]] = {}
+        with self._lock:
+            for (stage, _), stats in self._timers.items():
+                entry = stages.setdefault(stage, {"count": 0, "sum": 0.0, "max": 0.0})
+                entry["count"] += stats.count
+                entry["sum"] += stats.total
+                entry["max"] = max(entry["max"], stats.max)
+        return stages
+
+    def render_prometheus(self) -> str:
+        """Render all measurements in the Prometheus text exposition format."""
+        with self._lock:
+            timers = sorted((key, (stats.count, stats.total, stats.max, list(stats.bucket_counts))) for key, stats in self._timers.items())
+            counters = sorted(self._counters.items())
+
+        duration_name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines = [
+            f"# HELP {duration_name} Wall time of the instrumented stages.",
+            f"# TYPE {duration_name} histogram",
+        ]
+        max_lines = [
+            f"# HELP {duration_name}_max Longest wall time of the instrumented stages.",
+            f"# TYPE {duration_name}_max gauge",
+        ]
+        for (stage, labels), (count, total, maximum, bucket_counts) in timers:
+            stage_labels = (("stage", stage),) + labels
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{duration_name}_bucket{_format_labels(stage_labels + (('le', _format_value(upper_bound)),))} {cumulative}")
+            lines.append(f"{duration_name}_bucket{_format_labels(stage_labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{duration_name}_sum{_format_labels(stage_labels)} {_format_value(total)}")
+            lines.append(f"{duration_name}_count{_format_labels(stage_labels)} {count}")
+            max_lines.append(f"{duration_name}_max{_format_labels(stage_labels)} {_format_value(maximum)}")
+        lines.extend(max_lines)
+
+        counter_names = sorted({name for (name, _), _ in counters})
+        for name in counter_names:
+            metric_name = f"{METRIC_PREFIX}_{_INVALID_NAME_CHARS.sub('_', name)}_total"
+            lines.append(f"# TYPE {metric_name} counter")
+            for (counter_name, labels), value in counters:
+                if counter_name == name:
+                    lines.append(f"{metric_name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+instrumentation = Instrumentation()
+
+# Summed stage durations of the current request, None outside of requests
+_request_stages: ContextVar[dict[str, float] | None] = ContextVar("request_stages", default=None)
+
+
+def start_request_stages() -> None:
+    """Start collecting the stage durations of the current request (in the current context)."""
+    _request_stages.set({})
+
+
+def finish_request_stages() -> dict[str, float]:
+    """Stop collecting and return the stage durations of the current request."""
+    stages = _request_stages.get() or {}
+    _request_stages.set(None)
+    return stages
+
+
+def record_duration(stage: str, seconds: float, **labels: Any) -> None:
+    instrumentation.observe(stage, seconds, **labels)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timer(stage: str, **labels: Any) -> Iterator[None]:
+    """Measure the wall time of a stage, also if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_duration(stage, time.perf_counter() - start, **labels)
+
+
+def timed(stage: str | None = None, **labels: Any) -> Callable[[F], F]:
+    """Decorator measuring each call of a function as stage (by default named after the module and function)."""
+
+    def decorator(fn: F) -> F:
+        name = stage or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def increment(name: str, value: float = 1, **labels: Any) -> None:
+    instrumentation.increment(name, value, **labels)
+
+
+def format_server_timing(stages: dict[str, float], total: float | None = None) -> str:
+    """Format stage durations (in seconds) as value of the `Server-Timing` header (durations in milliseconds)."""
+    entries = [f"{_INVALID_TOKEN_CHARS.sub('_', stage)};dur={seconds * 1000:.2f}" for stage, seconds in stages.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
@@ -1,22 +1,49 @@
 from __future__ import annotations
 
 import atexit
+import logging
+import math
 import multiprocessing
+import os
 import threading
-from typing import Any, Callable, Dict
+import time
+import uuid
+from typing import Any, Dict, Mapping
 
 import networkx as nx
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, send_file, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import BadRequest
 
-from viscom_backend.commgraph.converter import convert_multigraph_to_normal_graph, convert_to_weighted_graph
+from viscom_backend.commgraph.converter import convert_to_weighted_graph
 from viscom_backend.communities.community_detection_methods import community_methods_config
-from viscom_backend.data.reader import RosMetaSysGraphGenerator
-from viscom_backend.generator.generator_methods import generator_methods_config
+from viscom_backend.data.catalog import dataset_catalog
+from viscom_backend.diagnostics import DebugInfo, configure_logging
+from viscom_backend.data.writer import get_dataset_name
+from viscom_backend.generator.batch import MAX_BATCH_SIZE, expand_param_grid, generate_batch, get_batch_seeds, get_param_grid_size
+from viscom_backend.generator.generator_methods import get_generator_methods_config, update_generator_methods_config
+from viscom_backend.generator.stream import MIME_NDJSON, GraphStream, iter_ndjson, iter_node_link_json
 from viscom_backend.graphviz.graphVizApi import register_routes as register_graphviz_routes
+from viscom_backend.instrumentation import finish_request_stages, format_server_timing, increment, instrumentation, start_request_stages, timer
 from viscom_backend.metrics.metrics_calculator import MetricCalculator
-from viscom_backend.noderank.commgraph_centrality import calculate_commgraph_centrality
+from viscom_backend.metrics.results_store import metrics_result_store
+from viscom_backend.noderank.centrality_cache import centrality_cache
 from viscom_backend.noderank.node_rank_methods import node_rank_methods_config
+from viscom_backend.noderank.combined_ranks import (
+    NODERANK_WORKERS,
+    NodeRankContext,
+    calculate_noderank,
+    calculate_noderank_table,
+    get_default_method_specs,
+    normalize_ranks,
+    parse_method_spec,
+)
+from viscom_backend.profiling import PROFILE_ID_HEADER, PROFILE_SORT_KEYS, is_profile_request, profile_store, start_profiler, stop_profiler
+from viscom_backend.response_cache import compress_response, create_cached_response, get_cache_key, get_file_hash
+from viscom_backend.transport import MIME_JSON, create_graph_response, create_response, get_request_data, get_request_graph
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -25,6 +52,64 @@ CORS(app)
 # Register GraphViz routes
 register_graphviz_routes(app)
 
+# Compress larger responses if the client supports it
+app.after_request(compress_response)
+
+
+@app.before_request
+def start_request_timing():
+    g.request_start = time.perf_counter()
+    start_request_stages()
+
+
+@app.after_request
+def add_server_timing(response: Response) -> Response:
+    """Record the duration of the request and return the durations of its stages as Server-Timing header."""
+    duration = time.perf_counter() - g.get("request_start", time.perf_counter())
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    instrumentation.observe("request", duration, endpoint=endpoint)
+    increment("http_requests", endpoint=endpoint, method=request.method, status=response.status_code)
+
+    response.headers["Server-Timing"] = format_server_timing(finish_request_stages(), total=duration)
+    response.headers["Timing-Allow-Origin"] = "*"
+    return response
+
+
+@app.before_request
+def start_request_profile():
+    if is_profile_request():
+        g.profiler = start_profiler()
+        g.profile_id = uuid.uuid4().hex
+
+
+@app.after_request
+def add_request_profile_id(response: Response) -> Response:
+    """Return the id of the profile of a profiled request in the X-Viscom-Profile-Id header."""
+    if g.get("profiler") is not None:
+        g.profile_status = response.status_code
+        response.headers[PROFILE_ID_HEADER] = g.profile_id
+    return response
+
+
+@app.teardown_request
+def stop_request_profile(exception: BaseException | None) -> None:
+    """
+    Store the profile of a profiled request.
+
+    The profiler is stopped on teardown, which also runs if an exception skipped the after request handlers,
+    so that the profiler lock is always released.
+    """
+    if g.get("profiler") is not None:
+        info = {"method": request.method, "path": request.full_path, "status": g.get("profile_status", 500)}
+        if exception is not None:
+            info["error"] = repr(exception)
+        stop_profiler(g.profiler, g.profile_id, info)
+        g.profiler = None
+
+
+# Pick up new or changed datasets without a restart
+dataset_catalog.start_watcher()
+
 MAX_NODES: int = 1000
 
 # Lazy import and initialize metrics processor to avoid multiprocessing issues
@@ -44,6 +129,12 @@ def get_metrics_processor():
     return _metrics_processor
 
 
+# Start the metrics processor with the server, so that jobs left unfinished by a previous instance are resumed right away.
+# Child processes (e.g. spawned workers importing this module) must not start their own processor.
+if multiprocessing.parent_process() is None:
+    get_metrics_processor()
+
+
 # Register shutdown function
 @atexit.register
 def shutdown_metrics_processor():
@@ -52,14 +143,6 @@ def shutdown_metrics_processor():
         _metrics_processor.shutdown()
 
 
-import inspect
-
-
-def has_param(func: Callable, param_name: str) -> bool:
-    sig = inspect.signature(func)
-    return param_name in sig.parameters
-
-
 def convert_param(param_config: Dict[str, Any], param_value: Any) -> Any:
     if param_config["type"] == "int":
         return int(param_value)
@@ -75,61 +158,216 @@ def convert_param(param_config: Dict[str, Any], param_value: Any) -> Any:
 def get_methods():
     # Drop method references from config
     # Deep copy to avoid modifying the original config
-    methods_config_copy = {k: v.copy() for k, v in generator_methods_config.items()}
+    methods_config_copy = {k: v.copy() for k, v in get_generator_methods_config().items()}
     for method in methods_config_copy.values():
         method.pop("method", None)
+        method.pop("stream_method", None)
 
     return jsonify(methods_config_copy)
 
 
-@app.route("/generate/<generator>", methods=["GET"])
-def generate_graph(generator):
-    if generator not in generator_methods_config:
-        return jsonify({"error": "Unknown generator"}), 400
+def get_generator_cache_key(generator: str, config: Dict[str, Any], params: Dict[str, Any], centrality: str = "none") -> str | None:
+    """Return a cache key for deterministic generator calls (saved datasets and seeded generators), otherwise None."""
+
+    if config.get("is_saved_dataset", False) and "file_path" in config:
+        return get_cache_key(generator, params, centrality, get_file_hash(config["file_path"]))
+
+    seed_param = config.get("seed_param", None)
+    if seed_param is not None and params.get(seed_param):
+        return get_cache_key(generator, params, centrality)
 
+    return None
+
+
+def parse_generator_params(config: Dict[str, Any], values: Mapping[str, Any]) -> Dict[str, Any]:
+    """Convert and validate the parameters of a generator (given by its config), using the defaults for missing values. Raises ValueError for invalid parameters."""
     params = {}
     # for param_name, param_config in generator_methods_config[generator]['params'].items():
-    for param_config in generator_methods_config[generator]["params"]:
+    for param_config in config["params"]:
         param_name = param_config["key"]
-        param_value = request.args.get(param_name)
+        param_value = values.get(param_name)
         if param_value is None:
             # Use default value if parameter is missing
             if "default" in param_config:
                 param_value = param_config["default"]
             else:
-                return jsonify({"error": f"Missing parameter: {param_name}"}), 400
+                raise ValueError(f"Missing parameter: {param_name}")
+
+        # Optional parameters (e.g. seeds) may default to None
+        if param_value is None:
+            params[param_name] = None
+            continue
 
         # Convert parameter value to correct type
         param_value = convert_param(param_config, param_value)
 
         # Check if parameter value is within valid range
         if "range" in param_config and not (param_config["range"][0] <= param_value <= param_config["range"][1]):
-            return jsonify({"error": f"Parameter {param_name} out of range"}), 400
+            raise ValueError(f"Parameter {param_name} out of range")
 
         params[param_name] = param_value
 
-    graph = generator_methods_config[generator]["method"](**params)
+    return params
+
+
+@app.route("/generate/batch", methods=["POST"])
+def generate_batch_route():
+    """
+    Generate a corpus of datasets from a parameter grid and write them to the dataset directory.
+
+    Body: {"generator": str, "grid": {param: [values]}, "params": {param: value}, "seed": int, "name": str, "workers": int}
+    Grid values are combined with each other, "params" are used for all graphs. Seeded generators get an independent seed per graph
+    derived from "seed", unless the seed parameter is part of the grid or params. The datasets are named "<name>_<index>", with the
+    characters of "name" that are not allowed in file names replaced (see `get_dataset_name`). Graphs of bulk generators are written
+    node by node, without building them in memory.
+    """
+    data = get_request_data() or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
 
-    # Get also the commgraph node rank for each node in the generated graph
-    # print("[GEN] Calculating commgraph centrality ####################################")
-    # weighted_graph = convert_to_weighted_graph(graph)
-    centrality = calculate_commgraph_centrality(graph, mode="significance")
-    # centrality = calculate_commgraph_centrality(weighted_graph, mode="significance")
-    # centrality = calculate_commgraph_centrality(graph, mode="closeness")
-    # centrality = calculate_commgraph_centrality(graph, mode="reachability")
+    generator = data.get("generator")
+    generator_methods_config = get_generator_methods_config()
+    if generator not in generator_methods_config or generator_methods_config[generator].get("is_saved_dataset", False):
+        return jsonify({"error": "Unknown generator"}), 400
+
+    fixed_params = data.get("params", {})
+    grid = data.get("grid", {})
+    if not isinstance(fixed_params, dict) or not isinstance(grid, dict):
+        return jsonify({"error": "'params' and 'grid' must be JSON objects"}), 400
+
+    try:
+        base_seed = int(data.get("seed", 42))
+        workers = int(data.get("workers", 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "'seed' and 'workers' must be integers"}), 400
+    if base_seed < 0:
+        return jsonify({"error": "'seed' must not be negative"}), 400
+
+    # Check the size before expanding the grid, so that huge grids are rejected without allocating them
+    batch_size = get_param_grid_size(grid)
+    if batch_size > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Batch too large ({batch_size} > {MAX_BATCH_SIZE} graphs)"}), 400
+
+    grid_param_sets = expand_param_grid(grid)
+    seeds = get_batch_seeds(base_seed, len(grid_param_sets))
+    seed_param = generator_methods_config[generator].get("seed_param", None)
+
+    param_sets = []
+    for grid_params, seed in zip(grid_param_sets, seeds):
+        values = {**fixed_params, **grid_params}
+        if seed_param is not None and seed_param not in values:
+            values[seed_param] = seed
+        try:
+            params = parse_generator_params(generator_methods_config[generator], values)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        param_sets.append(params)
+
+    name = data.get("name", generator)
+    if not isinstance(name, str):
+        return jsonify({"error": "'name' must be a string"}), 400
+    name = get_dataset_name(name)
+    names = [f"{name}_{i:03d}" for i in range(len(param_sets))]
+    results = generate_batch(generator, param_sets, names, workers=workers)
+
+    # Make the new datasets available as generators right away
+    dataset_catalog.scan()
+    return create_response({"generator": generator, "datasets": results})
+
+
+@app.route("/generate/<generator>", methods=["GET"])
+def generate_graph(generator):
+    # Fetch the config once, the watcher may swap it while the request runs
+    config = get_generator_methods_config().get(generator)
+    if config is None:
+        return jsonify({"error": "Unknown generator"}), 400
+
+    try:
+        params = parse_generator_params(config, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    # print("[GEN] Centrality calculated ####################################")
-    nx.set_node_attributes(graph, centrality, "commgraph_centrality")
+    centrality = get_centrality_option()
 
-    data = nx.node_link_data(graph, edges="links")
-    # print("[GEN] Graph generated ####################################")
-    # print(data)
-    return jsonify(data)
+    def create_generator_response():
+        return _create_generator_response(generator, config, params, centrality)
+
+    cache_key = get_generator_cache_key(generator, config, params, centrality)
+    if cache_key is None:
+        return create_generator_response()
+
+    return create_cached_response(cache_key, create_generator_response)
+
+
+@app.route("/generate/<generator>/stream", methods=["GET"])
+def generate_graph_stream(generator):
+    """
+    Generate a graph and stream it to the client, without serializing it as a whole in memory.
+
+    Query parameters besides the generator parameters:
+    - format: "ndjson" (default, one JSON object per line) or "json" (node-link JSON as returned by /generate/<generator>)
+    - centrality: "true" to annotate the nodes with the commgraph centrality (requires building the whole graph, no async mode)
+    """
+    config = get_generator_methods_config().get(generator)
+    if config is None:
+        return jsonify({"error": "Unknown generator"}), 400
+
+    try:
+        params = parse_generator_params(config, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    stream_format = request.args.get("format", "ndjson")
+    if stream_format not in ("ndjson", "json"):
+        return jsonify({"error": f"Unknown stream format: {stream_format}"}), 400
+    with_centrality = get_centrality_option() != "none"
+
+    if "stream_method" in config and not with_centrality:
+        stream = GraphStream.from_bulk(config["stream_method"](**params))
+    else:
+        graph = config["method"](**params)
+        if with_centrality:
+            nx.set_node_attributes(graph, centrality_cache.calculate(graph, mode="significance"), "commgraph_centrality")
+        stream = GraphStream.from_graph(graph)
+
+    if stream_format == "json":
+        return Response(stream_with_context(iter_node_link_json(stream)), mimetype=MIME_JSON)
+    return Response(stream_with_context(iter_ndjson(stream)), mimetype=MIME_NDJSON)
+
+
+def get_centrality_option() -> str:
+    """
+    Return how the commgraph centrality should be annotated, given by the "centrality" query parameter:
+    "sync" ("true"), "async" or "none" (default, also "false").
+    """
+    value = request.args.get("centrality", "false").lower()
+    if value in ("true", "1", "yes", "sync"):
+        return "sync"
+    if value == "async":
+        return "async"
+    return "none"
+
+
+def _create_generator_response(generator: str, config: Dict[str, Any], params: Dict[str, Any], centrality: str = "none"):
+    with timer(f"generate.{generator}"):
+        graph = config["method"](**params)
+
+    if centrality == "sync":
+        # Get also the commgraph node rank for each node in the generated graph
+        # weighted_graph = convert_to_weighted_graph(graph)
+        nx.set_node_attributes(graph, centrality_cache.calculate(graph, mode="significance"), "commgraph_centrality")
+        # centrality = calculate_commgraph_centrality(graph, mode="closeness")
+        # centrality = calculate_commgraph_centrality(graph, mode="reachability")
+    elif centrality == "async":
+        # The client fetches the result later via /analyze/noderank/commgraph_centrality/<fingerprint>
+        graph.graph["commgraph_centrality_fingerprint"] = centrality_cache.submit(graph, mode="significance")
+
+    return create_graph_response(graph)
 
 
 @app.route("/analyze/communities/methods", methods=["GET"])
 def get_community_methods():
-    RosMetaSysGraphGenerator.extent_generator_methods(generator_methods_config)
+    update_generator_methods_config()
 
     # Drop method references from config
     # Deep copy to avoid modifying the original config
@@ -142,10 +380,6 @@ def get_community_methods():
 
 @app.route("/analyze/communities/<method>", methods=["POST"])
 def analyze_communities(method):
-    # Get the body of the request
-    data = request.get_json()
-    # print(data)
-
     if method not in community_methods_config:
         return jsonify({"error": "Unknown method"}), 400
 
@@ -168,21 +402,22 @@ def analyze_communities(method):
 
         params[param["key"]] = param_value
 
-    data = request.get_json()
-    graph = nx.node_link_graph(data, edges="links")
-    # graph = nx.node_link_graph(data)
-    weighted_graph = convert_to_weighted_graph(graph)
-    # for node in weighted_graph.nodes:
-    #     print(node)
-    #     for edge in weighted_graph.edges(node):
-    #         print("\t", edge, weighted_graph.get_edge_data(*edge)[0]["weight"])
-    result = community_methods_config[method]["method"](weighted_graph, **params)
-    print(result)
+    debug = DebugInfo.from_request()
+    debug.add("params", params)
+
+    graph = get_request_graph()
+    with debug.timer("convert"):
+        weighted_graph = convert_to_weighted_graph(graph)
+    debug.add_edges("weighted_edges", weighted_graph)
+
+    with debug.timer("communities"):
+        result = community_methods_config[method]["method"](weighted_graph, **params)
 
     # Convert sets in the result to lists
     result = [list(community) for community in result]
+    logger.debug("Community detection %s found %d communities", method, len(result))
 
-    return jsonify(result)
+    return debug.create_response(result)
 
 
 @app.route("/analyze/noderank/methods", methods=["GET"])
@@ -192,84 +427,132 @@ def get_noderank_methods():
     noderank_methods_config_copy = {k: v.copy() for k, v in node_rank_methods_config.items()}
     for method in noderank_methods_config_copy.values():
         method.pop("method", None)
+        method.pop("sparse_method", None)
 
     return jsonify(noderank_methods_config_copy)
 
 
-@app.route("/analyze/noderank/<method>", methods=["POST"])
-def analyze_noderank(method):
-    # Get the body of the request
-    data = request.get_json()
-    # print(data)
+@app.route("/analyze/noderank/commgraph_centrality/<fingerprint>", methods=["GET"])
+def get_commgraph_centrality_result(fingerprint):
+    """Fetch a commgraph centrality requested with /generate/<generator>?centrality=async (202 while it is still being computed)."""
+    mode = request.args.get("mode", "significance")
+    result = centrality_cache.get(fingerprint, mode)
+    if result is not None:
+        return create_response(result)
+    if centrality_cache.is_pending(fingerprint, mode):
+        return jsonify({"status": "pending"}), 202
+    return jsonify({"error": f"No centrality for graph {fingerprint}"}), 404
 
-    if method not in node_rank_methods_config:
-        return jsonify({"error": "Unknown method"}), 400
 
+def parse_noderank_params(method: str, values: Mapping[str, Any]) -> Dict[str, Any]:
+    """Convert and validate the parameters of a node rank method, using the defaults for missing values. Raises ValueError for invalid parameters."""
     params = {}
     for param in node_rank_methods_config[method]["params"]:
-        param_value = request.args.get(param["key"])
+        param_value = values.get(param["key"])
         if param_value is None:
             # Use default value if parameter is missing
             if "default" in param:
                 param_value = param["default"]
             else:
-                return jsonify({"error": f"Missing parameter: {param['key']}"}), 400
+                raise ValueError(f"Missing parameter: {param['key']}")
 
         # Convert parameter value to correct type
         param_value = convert_param(param, param_value)
 
         # Check if parameter value is within valid range
         if "range" in param and not (param["range"][0] <= param_value <= param["range"][1]):
-            return jsonify({"error": f"Parameter {param['key']} out of range"}), 400
+            raise ValueError(f"Parameter {param['key']} out of range")
 
         params[param["key"]] = param_value
 
-    data = request.get_json()
-    graph = nx.node_link_graph(data, directed=True, multigraph=True)
-    graph = convert_to_weighted_graph(graph)
+    return params
 
-    if node_rank_methods_config[method].get("reverse_graph", False):
-        graph = graph.reverse()
 
-    # graph = graph.reverse()
+@app.route("/analyze/noderank/all", methods=["POST"])
+def analyze_all_noderanks():
+    """
+    Compute multiple node ranks of a graph in one request, sharing the graph conversion and the shortest path computations.
 
-    # Print the graph
-    for node in graph.nodes:
-        print(node)
-        for edge in graph.edges(node):
-            print("\t", edge, [e["distance"] for e in graph.get_edge_data(*edge).values()])
+    Query:
+    - methods: comma separated method specs, "<method>" or "<method>:<choice>" (e.g. "commgraph_centrality:harmonic").
+      Defaults to all methods, the commgraph centrality in every mode.
+    - <method>.<param>: parameter of a method (e.g. "pagerank.alpha=0.9"), the defaults are used otherwise
+    - workers: number of threads
 
-    if node_rank_methods_config[method].get("convert_to_simple_graph", False):
-        graph = convert_multigraph_to_normal_graph(graph)
+    Returns {"nodes": [...], "methods": [...], "ranks": {spec: [normalized rank per node]}, "errors": {spec: message}}.
+    """
+    specs = [spec.strip() for spec in request.args.get("methods", "").split(",") if spec.strip()] or get_default_method_specs()
 
-    # Check if the method has a distance parameter
-    method_cb = node_rank_methods_config[method]["method"]
+    try:
+        method_params = {}
+        for spec in specs:
+            method, spec_params = parse_method_spec(spec)
+            prefix = f"{method}."
+            values = {key[len(prefix) :]: value for key, value in request.args.items() if key.startswith(prefix)}
+            method_params[spec] = (method, {**parse_noderank_params(method, values), **spec_params})
+        workers = int(request.args.get("workers", NODERANK_WORKERS))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    graph = get_request_graph(directed=True, multigraph=True)
+    graph = convert_to_weighted_graph(graph)
 
-    if (d := node_rank_methods_config[method].get("distance", None)) is not None and has_param(method_cb, "distance"):
-        params["distance"] = d
+    return create_response(calculate_noderank_table(graph, method_params, workers=workers))
 
-    if (w := node_rank_methods_config[method].get("weight", None)) is not None and has_param(method_cb, "weight"):
-        params["weight"] = w
 
-    print(params)
-    result = method_cb(graph, **params)
-    # print(result)
+@app.route("/analyze/noderank/<method>", methods=["POST"])
+def analyze_noderank(method):
+    if method not in node_rank_methods_config:
+        return jsonify({"error": "Unknown method"}), 400
+
+    try:
+        params = parse_noderank_params(method, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    debug = DebugInfo.from_request()
+    debug.add("params", params)
+
+    graph = get_request_graph(directed=True, multigraph=True)
+    with debug.timer("convert"):
+        graph = convert_to_weighted_graph(graph)
+    debug.add_edges("weighted_edges", graph)
+
+    logger.debug("Node rank %s with %s on %d nodes", method, params, graph.number_of_nodes())
+    with debug.timer("rank"):
+        result = calculate_noderank(NodeRankContext(graph), method, params)
+    debug.add("raw_result", result)
 
     # Normalize the result
-    max_value = max(result.values())
-    result = {node: value / max_value for node, value in result.items()}
+    result = normalize_ranks(result)
 
-    for node, value in result.items():
-        print(node, value)
+    return debug.create_response(result)
 
-    return jsonify(result)
+
+def get_metric_job_options() -> Dict[str, Any]:
+    """
+    Options of a metrics job from the query parameters: profiling and the time budget per metric in seconds (`time_budget`).
+    A time budget of 0 disables the budget, so that the metrics are computed exactly.
+
+    Raises ValueError if the time budget is not a finite number of at least 0.
+    """
+    options: Dict[str, Any] = {"profile": is_profile_request()}
+    if (value := request.args.get("time_budget")) is not None:
+        try:
+            time_budget = float(value)
+        except ValueError:
+            time_budget = math.nan
+        if not math.isfinite(time_budget) or time_budget < 0:
+            raise ValueError(f"Invalid time budget: {value} (must be a finite number of seconds, 0 to disable the budget)")
+        options["time_budget"] = time_budget or None
+    return options
 
 
 @app.route("/metrics/calculate", methods=["POST"])
 def calculate_metrics_endpoint():
     """Submit a job to calculate all metrics for a graph layout."""
     try:
-        data_dict: Dict[str, Any] = request.get_json()
+        data_dict: Dict[str, Any] = get_request_data()
         if not data_dict or "nodes" not in data_dict or "links" not in data_dict:
             return jsonify({"error": "Invalid data format"}), 400
 
@@ -277,9 +560,14 @@ def calculate_metrics_endpoint():
         async_mode = request.args.get("async", "true").lower() in ["true", "1", "yes"]
 
         if async_mode:
+            try:
+                options = get_metric_job_options()
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
             # Submit the job for asynchronous processing
             metrics_processor = get_metrics_processor()
-            job_id = metrics_processor.submit_job(data_dict)
+            job_id = metrics_processor.submit_job(data_dict, **options)
 
             return jsonify({"job_id": job_id, "status": "pending", "message": "Metrics calculation job submitted"})
         else:
@@ -288,8 +576,10 @@ def calculate_metrics_endpoint():
 
             laid_out_data = convert_dict_to_laid_out_data(data_dict)
             metrics_results = calculate_all_metrics(laid_out_data)
-            return jsonify([metric.__dict__ for metric in metrics_results])
+            return create_response([metric.__dict__ for metric in metrics_results])
 
+    except BadRequest as e:
+        return jsonify({"error": e.description}), 400
     except Exception as e:
         return jsonify({"error": f"Error calculating metrics: {str(e)}"}), 500
 
@@ -298,26 +588,27 @@ def calculate_metrics_endpoint():
 def calculate_specific_metric_endpoint(method: str):
     """Submit a job to calculate a specific metric for a graph layout."""
     try:
-        data_dict: Dict[str, Any] = request.get_json()
+        data_dict: Dict[str, Any] = get_request_data()
         if not data_dict or "nodes" not in data_dict or "links" not in data_dict:
             return jsonify({"error": "Invalid data format"}), 400
 
         # Check if the requested metric exists
         if method not in MetricCalculator.AVAILABLE_METRICS:
-            print(f"Unknown metric method: {method} (available: {MetricCalculator.AVAILABLE_METRICS.keys()})")
-
-            metrics_processor = get_metrics_processor()
-
-            print(f"... (available: {MetricCalculator.AVAILABLE_METRICS.keys()})")
+            logger.warning("Unknown metric method: %s (available: %s)", method, list(MetricCalculator.AVAILABLE_METRICS.keys()))
             return jsonify({"error": f"Unknown metric method: {method}"}), 400
 
         # Get execution mode (synchronous or asynchronous)
         async_mode = request.args.get("async", "true").lower() in ["true", "1", "yes"]
 
         if async_mode:
+            try:
+                options = get_metric_job_options()
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
             # Submit the job for asynchronous processing
             metrics_processor = get_metrics_processor()
-            job_id = metrics_processor.submit_job(data_dict, method=method)
+            job_id = metrics_processor.submit_job(data_dict, method=method, **options)
 
             return jsonify({"job_id": job_id, "method": method, "status": "pending", "message": f"Metrics calculation job for {method} submitted"})
         else:
@@ -326,12 +617,27 @@ def calculate_specific_metric_endpoint(method: str):
 
             laid_out_data = convert_dict_to_laid_out_data(data_dict)
             metric_result = calculate_metrics(laid_out_data, method)
-            return jsonify(metric_result.__dict__)
+            return create_response(metric_result.__dict__)
 
+    except BadRequest as e:
+        return jsonify({"error": e.description}), 400
     except Exception as e:
         return jsonify({"error": f"Error calculating metric {method}: {str(e)}"}), 500
 
 
+@app.route("/metrics/jobs", methods=["GET"])
+def find_jobs():
+    """Find the stored metrics jobs of a layout by its hash (`layout_hash`), optionally of a specific metric (`method`)."""
+    layout_hash = request.args.get("layout_hash")
+    if not layout_hash:
+        return jsonify({"error": "Missing query parameter layout_hash"}), 400
+
+    try:
+        return create_response(get_metrics_processor().find_jobs(layout_hash, method=request.args.get("method")))
+    except Exception as e:
+        return jsonify({"error": f"Error finding jobs: {str(e)}"}), 500
+
+
 @app.route("/metrics/jobs/<job_id>", methods=["GET"])
 def get_job_status(job_id: str):
     """Get the status of a metrics calculation job."""
@@ -342,11 +648,90 @@ def get_job_status(job_id: str):
         if not job_status:
             return jsonify({"error": f"Job {job_id} not found"}), 404
 
-        return jsonify(job_status)
+        return create_response(job_status)
     except Exception as e:
         return jsonify({"error": f"Error retrieving job status: {str(e)}"}), 500
 
 
+@app.route("/metrics/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id: str):
+    """Cancel a pending or running metrics calculation job."""
+    try:
+        job_status = get_metrics_processor().cancel_job(job_id)
+
+        if not job_status:
+            return jsonify({"error": f"Job {job_id} not found"}), 404
+
+        return create_response(job_status)
+    except Exception as e:
+        return jsonify({"error": f"Error cancelling job: {str(e)}"}), 500
+
+
+@app.route("/metrics/stats", methods=["GET"])
+def get_metric_stats():
+    """Get the rolling wall time statistics per metric (overall and per graph size) of the finished metrics jobs."""
+    return create_response(get_metrics_processor().get_metric_stats())
+
+
+@app.route("/metrics/results", methods=["POST"])
+def store_metric_results():
+    """Append a metrics export of the evaluation playground to the columnar result store."""
+    if not metrics_result_store.is_available():
+        return jsonify({"error": "The metrics result store requires pyarrow"}), 501
+
+    export: Dict[str, Any] = get_request_data()
+    if not export or "dataset" not in export or "visualizations" not in export:
+        return jsonify({"error": "Invalid data format"}), 400
+
+    try:
+        path, row_count = metrics_result_store.append(export)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid metrics export: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Error storing metric results: {str(e)}"}), 500
+
+    return jsonify({"path": os.path.relpath(path, metrics_result_store.directory), "rows": row_count}), 201
+
+
+@app.route("/metrics/internal", methods=["GET"])
+def get_internal_metrics():
+    """Get the request and stage timings of the backend in the Prometheus text format."""
+    return Response(instrumentation.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/debug/profiles", methods=["GET"])
+def get_profiles():
+    """Get the ids and metadata of the stored request and job profiles, newest first."""
+    return jsonify(profile_store.list())
+
+
+@app.route("/debug/profiles/<profile_id>", methods=["GET"])
+def get_profile(profile_id: str):
+    """
+    Get a stored profile as text report (query parameters `sort` and `limit`),
+    or as pstats file with `format=pstats`, e.g. to open it with snakeviz.
+    """
+    try:
+        path = profile_store.get_stats_path(profile_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if path is None:
+        return jsonify({"error": f"Profile {profile_id} not found"}), 404
+
+    if request.args.get("format", "text") == "pstats":
+        return send_file(path, mimetype="application/octet-stream", as_attachment=True, download_name=f"{profile_id}.prof")
+
+    sort = request.args.get("sort", "cumulative")
+    if sort not in PROFILE_SORT_KEYS:
+        return jsonify({"error": f"Invalid sort key: {sort} (available: {', '.join(PROFILE_SORT_KEYS)})"}), 400
+    try:
+        limit = int(request.args.get("limit", 50))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+
+    return Response(profile_store.render(profile_id, sort=sort, limit=limit), mimetype="text/plain")
+
+
 @app.route("/metrics/methods", methods=["GET"])
 def get_available_metrics():
     """Get a list of all available metrics."""
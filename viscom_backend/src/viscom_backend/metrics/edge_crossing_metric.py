@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from svgpathtools.path import Path
 
 from .graph_metric_calculator import GraphMetricCalculator
 from .metrics_calculator import MetricResult
 
 
+def estimate_total_crossings(path_count: int, checked_pairs: int, crossing_count: int) -> Optional[float]:
+    """Extrapolate the crossings found in the first `checked_pairs` path pairs to all pairs of an interrupted calculation."""
+    if checked_pairs == 0:
+        return None
+    return crossing_count * (path_count * (path_count - 1) / 2) / checked_pairs
+
+
 class EdgeCrossingMetricCalculator(GraphMetricCalculator):
     """
     Calculator for measuring edge crossing count in layouts.
@@ -40,6 +49,8 @@ class EdgeCrossingMetricCalculator(GraphMetricCalculator):
         # Count actual edge crossings
         crossing_count: int = 0
         path_count: int = len(valid_links)
+        # Checked path pairs and crossings so far, for the approximation of an interrupted calculation
+        self.crossing_progress: tuple[int, int] = (0, 0)
         print(f"Checking {path_count} paths for crossings...")
 
         for i in range(path_count):
@@ -97,21 +108,11 @@ class EdgeCrossingMetricCalculator(GraphMetricCalculator):
                 except Exception as e:
                     print(f"Error calculating intersection: {str(e)}")
 
+                self.crossing_progress = (self.crossing_progress[0] + 1, crossing_count)
+
         # Calculate maximum possible crossings
-        graph = self.get_graph()
         edge_count = len(valid_links)
-
-        # Calculate c_all = |E|*(|E|-1)/2
-        c_all = (edge_count * (edge_count - 1)) / 2
-
-        # Calculate c_impossible = (1/2)*sum(degree(u_i)*(degree(u_i)-1))
-        c_impossible = 0
-        node_degrees = dict(graph.degree())
-        for degree in node_degrees.values():
-            c_impossible += (degree * (degree - 1)) / 2
-
-        # Calculate c_max = c_all - c_impossible
-        c_max = c_all - c_impossible
+        c_max, c_all, c_impossible, node_degrees = self.get_max_crossings()
 
         # Avoid division by zero
         if c_max <= 0:
@@ -137,6 +138,31 @@ class EdgeCrossingMetricCalculator(GraphMetricCalculator):
             type="lower-better",  # Fewer crossings is better for readability
         )
 
+    def get_max_crossings(self) -> tuple[float, float, float, dict[str, int]]:
+        """Return c_max, c_all, c_impossible and the node degrees of the normalization."""
+        graph = self.get_graph()
+        edge_count = len(self.valid_links)
+
+        # Calculate c_all = |E|*(|E|-1)/2
+        c_all = (edge_count * (edge_count - 1)) / 2
+
+        # Calculate c_impossible = (1/2)*sum(degree(u_i)*(degree(u_i)-1))
+        c_impossible = 0
+        node_degrees = dict(graph.degree())
+        for degree in node_degrees.values():
+            c_impossible += (degree * (degree - 1)) / 2
+
+        # Calculate c_max = c_all - c_impossible
+        return c_all - c_impossible, c_all, c_impossible, node_degrees
+
+    def get_partial_result(self) -> Optional[MetricResult]:
+        """Normalize the crossings extrapolated from the checked path pairs."""
+        estimated_crossings = estimate_total_crossings(len(self.valid_links), *getattr(self, "crossing_progress", (0, 0)))
+        c_max = self.get_max_crossings()[0]
+        if estimated_crossings is None or c_max <= 0:
+            return None
+        return MetricResult(key=self.API_METHOD_NAME, value=min(estimated_crossings / c_max, 1.0), type="lower-better")
+
 
 class TotalEdgeCrossingMetricCalculator(GraphMetricCalculator):
     """
@@ -164,6 +190,8 @@ class TotalEdgeCrossingMetricCalculator(GraphMetricCalculator):
         # Count actual edge crossings
         crossing_count: int = 0
         path_count: int = len(valid_links)
+        # Checked path pairs and crossings so far, for the approximation of an interrupted calculation
+        self.crossing_progress: tuple[int, int] = (0, 0)
 
         for i in range(path_count):
             path1: Path = valid_links[i].path
@@ -206,8 +234,17 @@ class TotalEdgeCrossingMetricCalculator(GraphMetricCalculator):
                 except Exception as e:
                     print(f"Error calculating intersection: {str(e)}")
 
+                self.crossing_progress = (self.crossing_progress[0] + 1, crossing_count)
+
         return MetricResult(
             key=self.API_METHOD_NAME,
             value=float(crossing_count),
             type="lower-better",  # Fewer crossings is better for readability
         )
+
+    def get_partial_result(self) -> Optional[MetricResult]:
+        """Extrapolate the crossings of the checked path pairs to all pairs."""
+        estimated_crossings = estimate_total_crossings(len(self.valid_links), *getattr(self, "crossing_progress", (0, 0)))
+        if estimated_crossings is None:
+            return None
+        return MetricResult(key=self.API_METHOD_NAME, value=float(round(estimated_crossings)), type="lower-better")
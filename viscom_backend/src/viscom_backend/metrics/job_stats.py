@@ -0,0 +1,118 @@
+"""
+Resource accounting of the metrics jobs.
+
+The worker process measures its CPU time, its peak RSS and the wall time of each metric (see `JobResourceUsage`).
+The processor aggregates the metric wall times of the finished jobs in rolling per-metric statistics (see `MetricTimeStats`),
+also per graph size, to see which calculators blow up on which graph sizes and to derive time budgets from real data.
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any
+
+# Not available on Windows
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+# Number of recent samples per metric the rolling statistics are computed from
+METRIC_STATS_WINDOW = 200
+
+# Upper bounds of the node counts of the graph size classes of the statistics
+METRIC_STATS_SIZE_CLASSES: tuple[int, ...] = (50, 100, 250, 500, 1000)
+
+
+def get_peak_rss() -> int | None:
+    """Return the peak resident set size of the current process in bytes."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def get_size_class(node_count: int) -> str:
+    for upper_bound in METRIC_STATS_SIZE_CLASSES:
+        if node_count <= upper_bound:
+            return f"<={upper_bound}"
+    return f">{METRIC_STATS_SIZE_CLASSES[-1]}"
+
+
+class JobResourceUsage:
+    """Resources used by a job in its worker process, from the creation of the object on."""
+
+    def __init__(self, node_count: int = 0, link_count: int = 0):
+        self.node_count = node_count
+        self.link_count = link_count
+        self.metric_times: dict[str, float] = {}
+        self._start_cpu_time = time.process_time()
+
+    def add_metric_time(self, method: str, seconds: float) -> None:
+        self.metric_times[method] = seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "cpu_time": time.process_time() - self._start_cpu_time,
+            "peak_rss": get_peak_rss(),
+            "node_count": self.node_count,
+            "link_count": self.link_count,
+            "metric_times": dict(self.metric_times),
+        }
+
+
+def _summarize(times: list[float]) -> dict[str, Any]:
+    ordered = sorted(times)
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[(len(ordered) - 1) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "max": ordered[-1],
+    }
+
+
+class MetricTimeStats:
+    """Thread-safe rolling statistics of the wall times per metric, over all graphs and per graph size class."""
+
+    def __init__(self, window: int = METRIC_STATS_WINDOW):
+        self.window = window
+        self._samples: dict[str, deque[tuple[float, int]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, method: str, seconds: float, node_count: int) -> None:
+        with self._lock:
+            if method not in self._samples:
+                self._samples[method] = deque(maxlen=self.window)
+            self._samples[method].append((seconds, node_count))
+
+    def add_job(self, resources: dict[str, Any]) -> None:
+        """Add the metric times of the resources of a finished job (see `JobResourceUsage.to_dict`)."""
+        for method, seconds in resources.get("metric_times", {}).items():
+            self.add(method, seconds, resources.get("node_count", 0))
+
+    def get(self, method: str) -> dict[str, Any] | None:
+        with self._lock:
+            samples = list(self._samples.get(method, ()))
+        if not samples:
+            return None
+
+        by_size: dict[str, list[float]] = {}
+        for seconds, node_count in samples:
+            by_size.setdefault(get_size_class(node_count), []).append(seconds)
+
+        return {
+            **_summarize([seconds for seconds, _ in samples]),
+            "max_node_count": max(node_count for _, node_count in samples),
+            "by_size": {size_class: _summarize(times) for size_class, times in by_size.items()},
+        }
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            methods = list(self._samples.keys())
+        return {method: stats for method in methods if (stats := self.get(method)) is not None}
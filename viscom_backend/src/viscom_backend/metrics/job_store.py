@@ -0,0 +1,326 @@
+"""
+Durable storage of the metrics jobs.
+
+The store keeps the metadata, the payload and the results of the jobs beyond the in-memory registry of the `MetricsProcessor`,
+so that results can be retrieved later (by job id or by the hash of the layout) and unfinished jobs can be re-queued after a restart.
+
+The store is selected with `VISCOM_JOB_STORE` ("sqlite", the default, or "memory"). SQLite databases can be shared by the
+server and its worker processes, as each operation opens its own connection. Several server instances may share a database:
+each job records the instance that owns it and a lease, which the owner renews while it runs (see `JOB_LEASE_SEC`).
+Unfinished jobs whose lease expired are orphaned and can be claimed and re-queued by any instance.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing
+from typing import Any, Iterable
+
+JOB_STORE_TYPE = os.environ.get("VISCOM_JOB_STORE", "sqlite").lower()
+JOB_STORE_PATH = os.environ.get("VISCOM_JOB_STORE_PATH", os.path.join(tempfile.gettempdir(), "viscom_jobs.sqlite3"))
+
+# Time in seconds after which stored jobs expire
+JOB_STORE_TTL = float(os.environ.get("VISCOM_JOB_STORE_TTL", 7 * 24 * 3600))
+
+# Time in seconds for which the owner of a job holds it without renewing the lease
+JOB_LEASE_SEC = float(os.environ.get("VISCOM_JOB_LEASE", 30))
+
+# Fields of a job record, the JSON fields are stored serialized
+JOB_FIELDS = (
+    "job_id",
+    "layout_hash",
+    "method",
+    "status",
+    "payload",
+    "options",
+    "results",
+    "error",
+    "resources",
+    "created_at",
+    "started_at",
+    "completed_at",
+    "expires_at",
+    "owner",
+    "lease_until",
+)
+JOB_JSON_FIELDS = ("payload", "options", "results", "resources")
+
+
+def get_layout_hash(data_dict: dict[str, Any]) -> str:
+    """Return a hash of a layout payload that is independent of the key order."""
+    return hashlib.sha256(json.dumps(data_dict, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def get_owner_id() -> str:
+    """
+    Return a new id for a server instance, recorded as owner of the jobs it processes.
+
+    The random part distinguishes restarts that keep the host name and pid (e.g. of a container).
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class JobStore(ABC):
+    """Storage of job records, i.e. dicts with the `JOB_FIELDS`."""
+
+    def __init__(self, ttl: float = JOB_STORE_TTL, lease: float = JOB_LEASE_SEC):
+        self.ttl = ttl
+        self.lease = lease
+
+    def create(
+        self,
+        job_id: str,
+        layout_hash: str,
+        method: str | None,
+        status: str,
+        payload: dict[str, Any],
+        options: dict[str, Any],
+        owner: str | None = None,
+    ) -> None:
+        created_at = time.time()
+        self.save(
+            {
+                "job_id": job_id,
+                "layout_hash": layout_hash,
+                "method": method,
+                "status": status,
+                "payload": payload,
+                "options": options,
+                "results": [],
+                "error": None,
+                "resources": None,
+                "created_at": created_at,
+                "started_at": None,
+                "completed_at": None,
+                "expires_at": created_at + self.ttl,
+                "owner": owner,
+                "lease_until": created_at + self.lease,
+            }
+        )
+
+    @abstractmethod
+    def save(self, record: dict[str, Any]) -> None:
+        """Insert or replace a job record."""
+
+    @abstractmethod
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Update fields of a job record."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        """Return the job record, or None if it does not exist or expired."""
+
+    @abstractmethod
+    def find_by_layout_hash(self, layout_hash: str, method: str | None = None) -> list[dict[str, Any]]:
+        """Return the (not expired) jobs of a layout, optionally only of one method (None for all metrics), newest first."""
+
+    @abstractmethod
+    def claim(self, job_id: str, owner: str, previous_owner: str | None) -> bool:
+        """
+        Take over a job whose lease expired, if it is still owned by `previous_owner`, and give the new owner a lease.
+        Returns whether the job was claimed.
+        """
+
+    @abstractmethod
+    def renew_leases(self, owner: str, statuses: Iterable[str]) -> None:
+        """Extend the leases of the jobs of the owner with one of the statuses."""
+
+    @abstractmethod
+    def get_by_status(self, statuses: Iterable[str]) -> list[dict[str, Any]]:
+        """Return the (not expired) jobs with one of the statuses, oldest first."""
+
+    @abstractmethod
+    def delete_expired(self) -> int:
+        """Delete the expired jobs and return their number."""
+
+
+class MemoryJobStore(JobStore):
+    """Job store in the memory of the server process (not shared with the worker processes, lost on restart)."""
+
+    def __init__(self, ttl: float = JOB_STORE_TTL, lease: float = JOB_LEASE_SEC):
+        super().__init__(ttl, lease)
+        self.records: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _is_alive(self, record: dict[str, Any]) -> bool:
+        return record["expires_at"] > time.time()
+
+    def save(self, record: dict[str, Any]) -> None:
+        with self._lock:
+            self.records[record["job_id"]] = dict(record)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            if job_id in self.records:
+                self.records[job_id].update(fields)
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            record = self.records.get(job_id)
+            return dict(record) if record is not None and self._is_alive(record) else None
+
+    def find_by_layout_hash(self, layout_hash: str, method: str | None = None) -> list[dict[str, Any]]:
+        with self._lock:
+            records = [
+                dict(record)
+                for record in self.records.values()
+                if record["layout_hash"] == layout_hash and record["method"] == method and self._is_alive(record)
+            ]
+        return sorted(records, key=lambda record: record["created_at"], reverse=True)
+
+    def claim(self, job_id: str, owner: str, previous_owner: str | None) -> bool:
+        now = time.time()
+        with self._lock:
+            record = self.records.get(job_id)
+            if record is None or record.get("owner") != previous_owner or (record.get("lease_until") or 0) >= now:
+                return False
+            record["owner"] = owner
+            record["lease_until"] = now + self.lease
+            return True
+
+    def renew_leases(self, owner: str, statuses: Iterable[str]) -> None:
+        statuses = set(statuses)
+        lease_until = time.time() + self.lease
+        with self._lock:
+            for record in self.records.values():
+                if record.get("owner") == owner and record["status"] in statuses:
+                    record["lease_until"] = lease_until
+
+    def get_by_status(self, statuses: Iterable[str]) -> list[dict[str, Any]]:
+        statuses = set(statuses)
+        with self._lock:
+            records = [dict(record) for record in self.records.values() if record["status"] in statuses and self._is_alive(record)]
+        return sorted(records, key=lambda record: record["created_at"])
+
+    def delete_expired(self) -> int:
+        with self._lock:
+            expired = [job_id for job_id, record in self.records.items() if not self._is_alive(record)]
+            for job_id in expired:
+                del self.records[job_id]
+        return len(expired)
+
+
+class SQLiteJobStore(JobStore):
+    """Job store in an SQLite database, shared by the server and the worker processes and kept across restarts."""
+
+    def __init__(self, path: str = JOB_STORE_PATH, ttl: float = JOB_STORE_TTL, lease: float = JOB_LEASE_SEC):
+        super().__init__(ttl, lease)
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    layout_hash TEXT NOT NULL,
+                    method TEXT,
+                    status TEXT NOT NULL,
+                    payload TEXT,
+                    options TEXT,
+                    results TEXT,
+                    error TEXT,
+                    resources TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    completed_at REAL,
+                    expires_at REAL NOT NULL,
+                    owner TEXT,
+                    lease_until REAL
+                )
+                """
+            )
+            # Databases created before jobs had an owner and a lease
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in (("owner", "TEXT"), ("lease_until", "REAL")):
+                if column not in columns:
+                    connection.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_layout_hash ON jobs (layout_hash)")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # A new connection per operation, as connections must not be shared across threads and forked processes
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _execute(self, query: str, params: tuple[Any, ...] = ()) -> list[sqlite3.Row]:
+        with closing(self._connect()) as connection, connection:
+            return connection.execute(query, params).fetchall()
+
+    @staticmethod
+    def _serialize(fields: dict[str, Any]) -> dict[str, Any]:
+        return {key: json.dumps(value) if key in JOB_JSON_FIELDS and value is not None else value for key, value in fields.items()}
+
+    @staticmethod
+    def _deserialize(row: sqlite3.Row) -> dict[str, Any]:
+        return {key: json.loads(row[key]) if key in JOB_JSON_FIELDS and row[key] is not None else row[key] for key in row.keys()}
+
+    def save(self, record: dict[str, Any]) -> None:
+        record = self._serialize({field: record.get(field) for field in JOB_FIELDS})
+        self._execute(f"INSERT OR REPLACE INTO jobs ({', '.join(JOB_FIELDS)}) VALUES ({', '.join('?' * len(JOB_FIELDS))})", tuple(record.values()))
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        unknown_fields = set(fields) - set(JOB_FIELDS)
+        if unknown_fields:
+            raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown_fields))}")
+        if not fields:
+            return
+        fields = self._serialize(fields)
+        self._execute(f"UPDATE jobs SET {', '.join(f'{key} = ?' for key in fields)} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        rows = self._execute("SELECT * FROM jobs WHERE job_id = ? AND expires_at > ?", (job_id, time.time()))
+        return self._deserialize(rows[0]) if rows else None
+
+    def find_by_layout_hash(self, layout_hash: str, method: str | None = None) -> list[dict[str, Any]]:
+        rows = self._execute(
+            "SELECT * FROM jobs WHERE layout_hash = ? AND method IS ? AND expires_at > ? ORDER BY created_at DESC", (layout_hash, method, time.time())
+        )
+        return [self._deserialize(row) for row in rows]
+
+    def claim(self, job_id: str, owner: str, previous_owner: str | None) -> bool:
+        now = time.time()
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET owner = ?, lease_until = ? WHERE job_id = ? AND owner IS ? AND (lease_until IS NULL OR lease_until < ?)",
+                (owner, now + self.lease, job_id, previous_owner, now),
+            )
+            return cursor.rowcount == 1
+
+    def renew_leases(self, owner: str, statuses: Iterable[str]) -> None:
+        statuses = tuple(statuses)
+        self._execute(
+            f"UPDATE jobs SET lease_until = ? WHERE owner = ? AND status IN ({', '.join('?' * len(statuses))})",
+            (time.time() + self.lease, owner, *statuses),
+        )
+
+    def get_by_status(self, statuses: Iterable[str]) -> list[dict[str, Any]]:
+        statuses = tuple(statuses)
+        rows = self._execute(
+            f"SELECT * FROM jobs WHERE status IN ({', '.join('?' * len(statuses))}) AND expires_at > ? ORDER BY created_at", (*statuses, time.time())
+        )
+        return [self._deserialize(row) for row in rows]
+
+    def delete_expired(self) -> int:
+        with closing(self._connect()) as connection, connection:
+            return connection.execute("DELETE FROM jobs WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+def create_job_store(store_type: str = JOB_STORE_TYPE) -> JobStore:
+    """Create the job store configured with `VISCOM_JOB_STORE`."""
+    if store_type == "sqlite":
+        return SQLiteJobStore()
+    if store_type == "memory":
+        return MemoryJobStore()
+    raise ValueError(f"Unknown job store: {store_type} (available: sqlite, memory)")
@@ -0,0 +1,202 @@
+"""
+Synthetic layouts for the metric calculators.
+
+Places the nodes of a graph with a simple layout and connects them with SVG paths in the format sent by the playground, so that
+the metrics can be benchmarked and profiled without a browser:
+
+    python -m viscom_backend.metrics.layout_fixtures path/to/dataset.json --layout spring --paths cubic -o layout.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from typing import Any, Literal
+
+import networkx as nx
+import numpy as np
+
+from viscom_backend.metrics.metrics_calculator import LaidOutData, convert_dict_to_laid_out_data
+
+LayoutType = Literal["circular", "grid", "random", "spring"]
+PathStyle = Literal["straight", "cubic", "arc"]
+
+LAYOUT_TYPES: tuple[str, ...] = ("circular", "grid", "random", "spring")
+PATH_STYLES: tuple[str, ...] = ("straight", "cubic", "arc")
+
+# Default node radius and the space per node (distance between neighbored grid nodes, circumference of the circle per node)
+NODE_RADIUS = 10.0
+NODE_SPACING = 60.0
+
+# Bend of curved paths relative to the link length, increased for each further parallel link between the same nodes
+PATH_BEND = 0.2
+
+
+def get_node_positions(graph: nx.Graph, layout: LayoutType = "circular", spacing: float = NODE_SPACING, seed: int | None = 42) -> np.ndarray:
+    """Return an (n, 2) array with the positions of the nodes (in the order of `graph.nodes`)."""
+    n = graph.number_of_nodes()
+    if n == 0:
+        return np.zeros((0, 2))
+
+    if layout == "circular":
+        angles = 2 * np.pi * np.arange(n) / n
+        radius = max(spacing, spacing * n / (2 * np.pi))
+        return radius * np.column_stack((np.cos(angles), np.sin(angles)))
+
+    if layout == "grid":
+        columns = math.ceil(math.sqrt(n))
+        indices = np.arange(n)
+        return spacing * np.column_stack((indices % columns, indices // columns)).astype(float)
+
+    # Random and spring layouts cover a square with roughly the same area per node as the grid
+    size = spacing * math.sqrt(n)
+    if layout == "random":
+        return np.random.default_rng(seed).uniform(0, size, size=(n, 2))
+
+    if layout == "spring":
+        positions = nx.spring_layout(nx.Graph(graph.to_undirected(as_view=True)), seed=seed, scale=size / 2)
+        return np.array([positions[node] for node in graph.nodes])
+
+    raise ValueError(f"Unknown layout: {layout} (available: {', '.join(LAYOUT_TYPES)})")
+
+
+def _format_numbers(values: np.ndarray) -> np.ndarray:
+    return np.char.mod("%.4f", values)
+
+
+def _join(*parts: np.ndarray | str) -> np.ndarray:
+    """Concatenate arrays of strings (and constant strings) element-wise."""
+    result = parts[0]
+    for part in parts[1:]:
+        result = np.char.add(result, part)
+    return np.asarray(result)
+
+
+def get_link_paths(
+    starts: np.ndarray, ends: np.ndarray, style: PathStyle = "straight", node_radius: float = NODE_RADIUS, bends: np.ndarray | None = None
+) -> list[str]:
+    """
+    Return the SVG path strings from the start to the end positions (both (m, 2) arrays), shortened by the node radius at both ends.
+
+    `bends` scales the curvature of cubic and arc paths per link (e.g. to separate parallel links), its sign selects the side.
+    """
+    m = len(starts)
+    if m == 0:
+        return []
+    bends = np.full(m, PATH_BEND) if bends is None else bends
+
+    directions = ends - starts
+    lengths = np.linalg.norm(directions, axis=1)
+    units = np.divide(directions, lengths[:, None], out=np.zeros_like(directions), where=lengths[:, None] > 0)
+
+    # Start and end on the node circles, unless the nodes overlap
+    offsets = np.where(lengths > 2 * node_radius, node_radius, 0.0)[:, None] * units
+    starts = starts + offsets
+    ends = ends - offsets
+
+    start_x, start_y, end_x, end_y = (_format_numbers(values) for values in (starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]))
+    move = _join("M ", start_x, " ", start_y)
+    end = _join(end_x, " ", end_y)
+
+    if style == "straight":
+        return _join(move, " L ", end).tolist()
+
+    if style == "cubic":
+        # Control points at 1/3 and 2/3 of the link, moved sideways by the bend
+        normals = np.column_stack((-units[:, 1], units[:, 0])) * (bends * np.linalg.norm(ends - starts, axis=1))[:, None]
+        control_1 = starts + (ends - starts) / 3 + normals
+        control_2 = starts + 2 * (ends - starts) / 3 + normals
+        c1x, c1y, c2x, c2y = (_format_numbers(values) for values in (control_1[:, 0], control_1[:, 1], control_2[:, 0], control_2[:, 1]))
+        return _join(move, " C ", c1x, " ", c1y, " ", c2x, " ", c2y, " ", end).tolist()
+
+    if style == "arc":
+        # Circular arc through both ends, the radius follows from the chord length and the bend (the sagitta relative to the chord)
+        chords = np.linalg.norm(ends - starts, axis=1)
+        sagittas = np.maximum(np.abs(bends), 1e-3) * chords
+        radii = np.divide(chords**2 / 4 + sagittas**2, 2 * sagittas, out=np.ones_like(chords), where=sagittas > 0)
+        sweep = np.where(bends >= 0, "0", "1")
+        radius = _format_numbers(radii)
+        return _join(move, " A ", radius, " ", radius, " 0 0 ", sweep, " ", end).tolist()
+
+    raise ValueError(f"Unknown path style: {style} (available: {', '.join(PATH_STYLES)})")
+
+
+def generate_layout_fixture(
+    graph: nx.Graph,
+    layout: LayoutType = "circular",
+    path_style: PathStyle = "straight",
+    node_radius: float = NODE_RADIUS,
+    spacing: float = NODE_SPACING,
+    seed: int | None = 42,
+) -> dict[str, Any]:
+    """
+    Lay out a graph and return it in the format of the `/metrics/calculate` request body (see `convert_dict_to_laid_out_data`).
+
+    The node score is the normalized degree. Links keep the "weight" and "distance" of the edges (e.g. of a weighted commgraph, 1 otherwise).
+    Self loops are skipped, parallel links between the same nodes get increasing bends, so that curved paths do not overlap.
+    """
+    nodes = list(graph.nodes)
+    positions = get_node_positions(graph, layout, spacing=spacing, seed=seed)
+    node_index = {node: i for i, node in enumerate(nodes)}
+
+    degrees = np.array([graph.degree(node) for node in nodes], dtype=float)
+    scores = degrees / degrees.max() if len(degrees) and degrees.max() > 0 else np.ones(len(nodes))
+
+    edges = [(source, target, edge_data) for source, target, edge_data in graph.edges(data=True) if source != target]
+    sources = np.array([node_index[source] for source, _, _ in edges], dtype=np.int64)
+    targets = np.array([node_index[target] for _, target, _ in edges], dtype=np.int64)
+
+    # Number of previous links between the same (unordered) node pair, to fan out parallel links
+    parallel_index = np.zeros(len(edges))
+    pair_counts: dict[tuple[int, int], int] = {}
+    for i, (source, target) in enumerate(zip(sources.tolist(), targets.tolist())):
+        pair = (min(source, target), max(source, target))
+        parallel_index[i] = pair_counts.get(pair, 0)
+        pair_counts[pair] = pair_counts.get(pair, 0) + 1
+    bends = PATH_BEND * (1 + parallel_index)
+
+    paths = get_link_paths(positions[sources].reshape(-1, 2), positions[targets].reshape(-1, 2), path_style, node_radius=node_radius, bends=bends)
+
+    return {
+        "nodes": [
+            {"id": str(node), "x": float(x), "y": float(y), "score": float(score), "radius": node_radius}
+            for node, (x, y), score in zip(nodes, positions.tolist(), scores.tolist())
+        ],
+        "links": [
+            {
+                "source": str(source),
+                "target": str(target),
+                "weight": float(edge_data.get("weight", 1.0)),
+                "distance": float(edge_data.get("distance", 1.0)),
+                "path": path,
+            }
+            for (source, target, edge_data), path in zip(edges, paths)
+        ],
+    }
+
+
+def get_layout_fixture(graph: nx.Graph, layout: LayoutType = "circular", path_style: PathStyle = "straight", **kwargs) -> LaidOutData:
+    """`generate_layout_fixture` converted into the input of the metric calculators."""
+    return convert_dict_to_laid_out_data(generate_layout_fixture(graph, layout, path_style, **kwargs))
+
+
+def main(argv: list[str] | None = None) -> None:
+    from viscom_backend.commgraph.converter import convert_to_weighted_graph
+    from viscom_backend.data.reader import RosMetaSysGraphGenerator
+
+    parser = argparse.ArgumentParser(description="Write a synthetic layout of a dataset in the format of the /metrics/calculate request body.")
+    parser.add_argument("dataset", help="Path of a ROS meta system dataset file")
+    parser.add_argument("--layout", choices=LAYOUT_TYPES, default="circular")
+    parser.add_argument("--paths", choices=PATH_STYLES, default="straight")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", "-o", default="layout.json")
+    args = parser.parse_args(argv)
+
+    graph = convert_to_weighted_graph(RosMetaSysGraphGenerator.read_graph_from_file(args.dataset))
+    with open(args.output, "w") as file:
+        json.dump(generate_layout_fixture(graph, args.layout, args.paths, seed=args.seed), file)
+
+
+if __name__ == "__main__":
+    main()
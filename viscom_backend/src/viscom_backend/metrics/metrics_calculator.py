@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import math
+import signal
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Literal, Optional, Type
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Literal, Optional, Type
 
 from svgpathtools.parser import parse_path
 from svgpathtools.path import Path
 
+from viscom_backend.instrumentation import increment, timed, timer
+
 # Import the metric calculators
 
 
@@ -85,11 +90,13 @@ class LaidOutData:
 class MetricResult:
     """Result of a metric calculation."""
 
-    def __init__(self, key: str, value: float, type: Literal["lower-better", "higher-better"], error: Optional[str] = None):
+    def __init__(self, key: str, value: float, type: Literal["lower-better", "higher-better"], error: Optional[str] = None, truncated: bool = False):
         self.key: str = key
         self.value: float = value
         self.type: Literal["lower-better", "higher-better"] = type
         self.error: Optional[str] = error
+        # The calculation exceeded its time budget, the value is approximated from the partial calculation (or missing)
+        self.truncated: bool = truncated
 
     def __str__(self) -> str:
         """Return a user-friendly string representation of the metric result."""
@@ -99,7 +106,15 @@ class MetricResult:
 
     def __repr__(self) -> str:
         """Return a detailed string representation for debugging."""
-        return f"MetricResult(key='{self.key}', value={self.value}, type='{self.type}', error={repr(self.error)})"
+        return f"MetricResult(key='{self.key}', value={self.value}, type='{self.type}', error={repr(self.error)}, truncated={self.truncated})"
+
+
+class MetricTimeoutError(BaseException):
+    """
+    Raised in a metric calculation that exceeds its time budget.
+
+    Derived from BaseException, so that the broad exception handlers inside the calculators do not swallow it.
+    """
 
 
 class MetricCalculator(ABC):
@@ -137,27 +152,65 @@ class MetricCalculator(ABC):
         """Calculate the metric. Must be implemented by subclasses."""
         pass
 
+    def get_partial_result(self) -> Optional[MetricResult]:
+        """Return an approximation from the progress of an interrupted `calculate`, if the calculator supports it."""
+        return None
+
+
+@contextmanager
+def metric_time_budget(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Raise MetricTimeoutError in the block once it ran for `seconds` (wall time).
+
+    The budget relies on SIGALRM, so it is only enforced in the main thread of a process on Unix, e.g. in the metrics worker processes.
+    """
+    if not seconds or not hasattr(signal, "SIGALRM") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def handler(signum, frame):
+        raise MetricTimeoutError(f"Exceeded the time budget of {seconds:g} s")
+
+    previous_handler = signal.signal(signal.SIGALRM, handler)
+    try:
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
 
-def calculate_metrics(data: LaidOutData, method: str) -> MetricResult:
+def calculate_metrics(data: LaidOutData, method: str, time_budget: Optional[float] = None) -> MetricResult:
     """
     Calculate a specific metric for the given graph layout data.
 
     Args:
         data: The layout data to analyze
         method: The specific metric method to calculate
+        time_budget: Optional wall time budget of the calculation in seconds (see `metric_time_budget`)
 
     Returns:
-        A single metric result
+        A single metric result, flagged as truncated if the calculation exceeded the time budget
     """
     # Check if the requested method exists
     if method not in MetricCalculator.AVAILABLE_METRICS:
         return MetricResult(key=method, value=-1, type="lower-better", error=f"Unknown metric method: {method}")
 
+    calculator: Optional[MetricCalculator] = None
     try:
         calculator_class = MetricCalculator.AVAILABLE_METRICS[method]
         calculator = calculator_class(data)
-        return calculator.calculate()
+        with timer(f"metrics.{method}"), metric_time_budget(time_budget):
+            return calculator.calculate()
+    except MetricTimeoutError as e:
+        increment("metric_timeouts", metric=method)
+        partial_result = calculator.get_partial_result() if calculator is not None else None
+        if partial_result is not None:
+            partial_result.truncated = True
+            return partial_result
+        return MetricResult(key=method, value=-1, type="lower-better", error=str(e), truncated=True)
     except Exception as e:
+        increment("metric_errors", metric=method)
         print(f"Error calculating {method} metric: {e}")
         return MetricResult(key=method, value=-1, type="lower-better", error=str(e))
 
@@ -181,6 +234,7 @@ def calculate_all_metrics(data: LaidOutData) -> List[MetricResult]:
     return results
 
 
+@timed("metrics.parse_layout")
 def convert_dict_to_laid_out_data(data_dict: Dict[str, Any]) -> LaidOutData:
     """Convert a dictionary to a LaidOutData object."""
     nodes: List[LaidOutNode] = [
@@ -9,7 +9,11 @@ import traceback
 import uuid
 from typing import Any, Dict, List, Optional
 
-from .metrics_calculator import calculate_all_metrics, calculate_metrics, convert_dict_to_laid_out_data
+from ..instrumentation import instrumentation
+from ..profiling import profiled
+from .job_stats import JobResourceUsage, MetricTimeStats
+from .job_store import JobStore, create_job_store, get_layout_hash, get_owner_id
+from .metrics_calculator import MetricCalculator, calculate_metrics, convert_dict_to_laid_out_data
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
@@ -20,29 +24,86 @@ JOB_STATUS_PENDING = "pending"
 JOB_STATUS_PROCESSING = "processing"
 JOB_STATUS_COMPLETED = "completed"
 JOB_STATUS_FAILED = "failed"
+JOB_STATUS_CANCELLED = "cancelled"
 
-# Process timeout in seconds
+JOB_FINISHED_STATUSES = (JOB_STATUS_COMPLETED, JOB_STATUS_FAILED, JOB_STATUS_CANCELLED)
+JOB_UNFINISHED_STATUSES = (JOB_STATUS_PENDING, JOB_STATUS_PROCESSING)
+
+# Process timeout in seconds, for jobs with per-metric time budgets it is extended by the budgets of their metrics
 PROCESS_TIMEOUT = 120
 
+# Default wall time budget per metric in seconds, a metric exceeding it returns a truncated result (0 disables the budget)
+METRIC_TIME_BUDGET = float(os.environ.get("VISCOM_METRIC_TIME_BUDGET", 60))
+
+
+def get_job_timeout(method: Optional[str], time_budget: Optional[float]) -> float:
+    """
+    Return the wall time after which the worker of a job is terminated.
+
+    With a time budget each metric is truncated on its own, so the job gets the budgets of all its metrics on top of PROCESS_TIMEOUT
+    and a single slow metric does not cost the results of the other metrics.
+    """
+    if not time_budget:
+        return PROCESS_TIMEOUT
+    metric_count = 1 if method else len(MetricCalculator.AVAILABLE_METRICS)
+    return PROCESS_TIMEOUT + time_budget * metric_count
+
+
+def get_job_fingerprint(layout_hash: str, method: Optional[str], time_budget: Optional[float]) -> str:
+    """Identify jobs that calculate the same results: same layout, same metric (or all metrics) and same time budget."""
+    return f"{layout_hash}|{method or ''}|{time_budget}"
+
 
 class JobInfo:
     """Information about a metrics calculation job."""
 
-    def __init__(self, job_id: str, method: Optional[str] = None):
+    def __init__(
+        self,
+        job_id: str,
+        method: Optional[str] = None,
+        profile: bool = False,
+        layout_hash: Optional[str] = None,
+        time_budget: Optional[float] = METRIC_TIME_BUDGET,
+    ):
         self.job_id: str = job_id
         self.method: Optional[str] = method
+        self.profile: bool = profile
+        self.layout_hash: Optional[str] = layout_hash
+        self.time_budget: Optional[float] = time_budget
         self.status: str = JOB_STATUS_PENDING
         self.results: List[Dict[str, Any]] = []
         self.error: Optional[str] = None
         self.created_at: float = time.time()
         self.started_at: Optional[float] = None
         self.completed_at: Optional[float] = None
+        # CPU time, peak RSS and metric wall times of the worker, see JobResourceUsage
+        self.resources: Optional[Dict[str, Any]] = None
+        # Whether the final state is written to the job store
+        self.stored: bool = False
+        # Number of submissions that were coalesced into this job
+        self.subscribers: int = 1
+
+    @staticmethod
+    def from_record(record: Dict[str, Any]) -> "JobInfo":
+        """Create the job info from a record of the job store."""
+        time_budget = (record["options"] or {}).get("time_budget", METRIC_TIME_BUDGET)
+        job_info = JobInfo(job_id=record["job_id"], method=record["method"], layout_hash=record["layout_hash"], time_budget=time_budget)
+        job_info.status = record["status"]
+        job_info.results = record["results"] or []
+        job_info.error = record["error"]
+        job_info.created_at = record["created_at"]
+        job_info.started_at = record["started_at"]
+        job_info.completed_at = record["completed_at"]
+        job_info.resources = record["resources"]
+        job_info.stored = job_info.status in JOB_FINISHED_STATUSES
+        return job_info
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert job info to a dictionary."""
         return {
             "job_id": self.job_id,
             "method": self.method,
+            "layout_hash": self.layout_hash,
             "status": self.status,
             "results": self.results,
             "error": self.error,
@@ -50,16 +111,30 @@ class JobInfo:
             "started_at": self.started_at,
             "completed_at": self.completed_at,
             "execution_time": (self.completed_at - self.started_at) if self.completed_at and self.started_at else None,
+            "resources": self.resources,
+            "time_budget": self.time_budget,
+            "subscribers": self.subscribers,
+            # Profiles of jobs are stored under the job id, see /debug/profiles/<profile_id>
+            "profile_id": self.job_id if self.profile else None,
         }
 
 
-def _calculate_metrics_process(data_dict: Dict[str, Any], method: Optional[str], result_dict: Dict[str, Any], job_id: str, pid_dict: Dict[str, int]) -> None:
+def _calculate_metrics_process(
+    data_dict: Dict[str, Any],
+    method: Optional[str],
+    result_dict: Dict[str, Any],
+    job_id: str,
+    pid_dict: Dict[str, int],
+    job_store: JobStore,
+    profile: bool = False,
+    time_budget: Optional[float] = METRIC_TIME_BUDGET,
+) -> None:
     """Worker function to calculate metrics in a separate process."""
     try:
         job_result_dict = result_dict[job_id]
 
         # Record PID for potential termination
-        pid_dict["pid"] = os.getpid()
+        pid_dict[job_id] = os.getpid()
 
         logger.info(f"Process {os.getpid()} started for method {method}")
 
@@ -75,30 +150,35 @@ def _calculate_metrics_process(data_dict: Dict[str, Any], method: Optional[str],
         # Mark as processing
         job_result_dict["status"] = JOB_STATUS_PROCESSING
         job_result_dict["started_at"] = time.time()
+        _update_stored_job(job_store, job_id, status=JOB_STATUS_PROCESSING, started_at=job_result_dict["started_at"])
 
         # Convert data and calculate metrics
-        laid_out_data = convert_dict_to_laid_out_data(data_dict)
-
-        if method:
-            # Calculate single metric
-            metric_result = calculate_metrics(laid_out_data, method)
-            metrics_results = [metric_result]
-            logger.info(f"Process {os.getpid()}: Calculated metric for method {method}: {metric_result}")
-        else:
-            # Calculate all metrics
-            metrics_results = calculate_all_metrics(laid_out_data)
-            logger.info(f"Process {os.getpid()}: Calculated all metrics")
+        with profiled(job_id, {"job_id": job_id, "metric": method}, enabled=profile):
+            laid_out_data = convert_dict_to_laid_out_data(data_dict)
+            usage = JobResourceUsage(node_count=len(laid_out_data.nodes), link_count=len(laid_out_data.links))
+
+            # Calculate the single metric or all metrics, measuring each metric
+            metrics_results = []
+            for metric_method in [method] if method else list(MetricCalculator.AVAILABLE_METRICS):
+                start = time.perf_counter()
+                metrics_results.append(calculate_metrics(laid_out_data, metric_method, time_budget=time_budget))
+                usage.add_metric_time(metric_method, time.perf_counter() - start)
+            logger.info(f"Process {os.getpid()}: Calculated metrics for method {method or 'all'}")
 
         # Store results - Convert MetricResult objects to dictionaries
         # and make sure to explicitly update the shared dictionary
-        metric_dicts = [{"key": metric.key, "value": metric.value, "type": metric.type, "error": metric.error} for metric in metrics_results]
+        metric_dicts = [
+            {"key": metric.key, "value": metric.value, "type": metric.type, "error": metric.error, "truncated": metric.truncated} for metric in metrics_results
+        ]
 
         # Must update the shared dictionary explicitly
         job_result_dict["results"] = metric_dicts
+        job_result_dict["resources"] = usage.to_dict()
         job_result_dict["status"] = JOB_STATUS_COMPLETED
         job_result_dict["completed_at"] = time.time()
 
         result_dict[job_id] = job_result_dict
+        _store_finished_job(job_store, job_id, job_result_dict)
         # Make sure changes are flushed before exiting
         logger.info(f"Process {os.getpid()} completed successfully with status: {job_result_dict['status']}")
 
@@ -110,12 +190,38 @@ def _calculate_metrics_process(data_dict: Dict[str, Any], method: Optional[str],
         job_result_dict["status"] = JOB_STATUS_FAILED
         job_result_dict["error"] = f"{str(e)}\n{traceback.format_exc()}"
         job_result_dict["completed_at"] = time.time()
+        _store_finished_job(job_store, job_id, job_result_dict)
 
     result_dict[job_id] = job_result_dict
     # Sleep briefly to ensure updates are synchronized
     time.sleep(0.1)
 
 
+def _update_stored_job(job_store: JobStore, job_id: str, **fields: Any) -> None:
+    """Update a job in the store, the job itself does not fail if the store is not available."""
+    try:
+        job_store.update(job_id, **fields)
+    except Exception as e:
+        logger.error(f"Error updating job {job_id} in the job store: {e}")
+
+
+def _store_finished_job(job_store: JobStore, job_id: str, result: Dict[str, Any]) -> None:
+    """Store the final state of a job, without its payload, which is only needed to re-queue unfinished jobs."""
+    fields = {key: result.get(key) for key in ("status", "results", "error", "resources", "started_at", "completed_at")}
+    _update_stored_job(job_store, job_id, payload=None, **fields)
+
+
+def _reap_process(process: multiprocessing.Process) -> None:
+    """Join a terminated worker process, killing it if it does not exit within 2 seconds."""
+    try:
+        process.join(2.0)  # Give it 2 seconds to clean up
+        if process.is_alive():
+            process.kill()
+            process.join(0.5)
+    except Exception as e:
+        logger.error(f"Error terminating process: {e}")
+
+
 class MetricsProcessor:
     """Manager for processing metrics calculations in separate processes."""
 
@@ -133,7 +239,7 @@ class MetricsProcessor:
                     cls._instance = cls()
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, job_store: Optional[JobStore] = None):
         # Prevent direct instantiation outside of get_instance
         if MetricsProcessor._instance is not None:
             logger.warning("Attempted to create a second MetricsProcessor instance!")
@@ -156,41 +262,143 @@ class MetricsProcessor:
         self.pids: Dict[str, int] = self.manager.dict()
         self.processes: Dict[str, multiprocessing.Process] = {}
         self.job_cleanup_threshold_sec = 120  # Clean up jobs after 60 seconds
+        self.metric_stats = MetricTimeStats()
+        # Unfinished jobs by their fingerprint, identical submissions attach to them instead of starting another worker
+        self.inflight_jobs: Dict[str, str] = {}
+        # Serializes submissions, status updates and cancellations, as several clients may poll the same (coalesced) job at once
+        self._lock = threading.RLock()
+        self.job_store: JobStore = job_store or create_job_store()
+        # Server instance that owns the jobs of this processor, its leases keep other instances sharing the job store from re-queueing them
+        self.owner_id: str = get_owner_id()
+        self._stop_lease_thread = threading.Event()
         logger.info(f"Initialized MetricsProcessor with multiprocessing start method: {multiprocessing.get_start_method()}")
 
-    def submit_job(self, data_dict: Dict[str, Any], method: Optional[str] = None) -> str:
+        self._requeue_unfinished_jobs()
+        self._lease_thread = threading.Thread(target=self._renew_leases, name="metrics-job-leases", daemon=True)
+        self._lease_thread.start()
+
+    def submit_job(
+        self, data_dict: Dict[str, Any], method: Optional[str] = None, profile: bool = False, time_budget: Optional[float] = METRIC_TIME_BUDGET
+    ) -> str:
         """
         Submit a metrics calculation job to be processed asynchronously.
 
+        If an identical job (same layout, method and time budget) is still pending or processing, the submission attaches to it
+        and returns its job ID instead of starting another worker. Profiled submissions always start their own job.
+
         Args:
             data_dict: Layout data dictionary
             method: Optional specific metric method to calculate
+            profile: Whether to profile the job in the worker process (stored under the job id)
+            time_budget: Wall time budget per metric in seconds, metrics exceeding it return a truncated result
 
         Returns:
             Job ID that can be used to check status and retrieve results
         """
-        # Generate unique job ID
-        job_id = str(uuid.uuid4())
+        layout_hash = get_layout_hash(data_dict)
+        fingerprint = get_job_fingerprint(layout_hash, method, time_budget)
+
+        with self._lock:
+            if not profile and (inflight_job_id := self._get_inflight_job(fingerprint)) is not None:
+                self.jobs[inflight_job_id].subscribers += 1
+                logger.info(f"Attached submission to in-flight metrics calculation job {inflight_job_id}")
+                return inflight_job_id
+
+            # Generate unique job ID
+            job_id = str(uuid.uuid4())
+
+            # Create job info
+            job_info = JobInfo(job_id=job_id, method=method, profile=profile, layout_hash=layout_hash, time_budget=time_budget)
+            self.jobs[job_id] = job_info
+
+            # Keep the payload in the job store until the job is finished, to re-queue it after a restart
+            try:
+                self.job_store.create(job_id, layout_hash, method, JOB_STATUS_PENDING, data_dict, {"time_budget": time_budget}, owner=self.owner_id)
+            except Exception as e:
+                logger.error(f"Error storing job {job_id} in the job store: {e}")
+
+            self._start_job(job_info, data_dict)
+            self.inflight_jobs[fingerprint] = job_id
+
+            # Schedule cleanup of old jobs
+            self._cleanup_old_jobs()
+
+        return job_id
 
-        # Create job info
-        job_info = JobInfo(job_id=job_id, method=method)
-        self.jobs[job_id] = job_info
+    def _get_inflight_job(self, fingerprint: str) -> Optional[str]:
+        """Return the ID of the unfinished job with the fingerprint, if any."""
+        job_id = self.inflight_jobs.get(fingerprint)
+        if job_id is None:
+            return None
+
+        job_status = self._get_job_status(job_id)
+        if job_status is None or job_status["status"] in JOB_FINISHED_STATUSES:
+            del self.inflight_jobs[fingerprint]
+            return None
+        return job_id
+
+    def _start_job(self, job_info: JobInfo, data_dict: Dict[str, Any]) -> None:
+        job_id = job_info.job_id
 
         # Set up shared result dictionary
         self.results[job_id] = {"status": JOB_STATUS_PENDING, "results": [], "error": None, "started_at": None, "completed_at": None}
 
         # Start process
-        process = multiprocessing.Process(target=_calculate_metrics_process, args=(data_dict, method, self.results, job_id, self.pids))
+        process = multiprocessing.Process(
+            target=_calculate_metrics_process, args=(data_dict, job_info.method, self.results, job_id, self.pids, self.job_store, job_info.profile, job_info.time_budget)
+        )
         process.daemon = True  # Allow the process to be terminated when the main process exits
         process.start()
 
         self.processes[job_id] = process
         logger.info(f"Started metrics calculation job {job_id}")
 
-        # Schedule cleanup of old jobs
-        self._cleanup_old_jobs()
+    def _requeue_unfinished_jobs(self) -> None:
+        """
+        Start the jobs of the job store that are pending or processing, but whose owner stopped renewing their lease.
 
-        return job_id
+        Each orphaned job is claimed first, so that instances checking at the same time do not both re-queue it.
+        """
+        try:
+            records = self.job_store.get_by_status(JOB_UNFINISHED_STATUSES)
+        except Exception as e:
+            logger.error(f"Error reading unfinished jobs from the job store: {e}")
+            return
+
+        now = time.time()
+        for record in records:
+            if record["owner"] == self.owner_id or (record["lease_until"] or 0) >= now:
+                continue
+            try:
+                if not self.job_store.claim(record["job_id"], self.owner_id, record["owner"]):
+                    continue
+            except Exception as e:
+                logger.error(f"Error claiming job {record['job_id']} in the job store: {e}")
+                continue
+
+            job_info = JobInfo.from_record(record)
+            job_info.status = JOB_STATUS_PENDING
+            job_info.started_at = None
+            self.jobs[job_info.job_id] = job_info
+
+            if record["payload"] is None:
+                self._finish_job(job_info.job_id, JOB_STATUS_FAILED, "Job could not be re-queued without its payload")
+                continue
+
+            logger.info(f"Re-queueing unfinished job {job_info.job_id}")
+            _update_stored_job(self.job_store, job_info.job_id, status=JOB_STATUS_PENDING, started_at=None)
+            self._start_job(job_info, record["payload"])
+            self.inflight_jobs[get_job_fingerprint(job_info.layout_hash, job_info.method, job_info.time_budget)] = job_info.job_id
+
+    def _renew_leases(self) -> None:
+        """Renew the leases of the unfinished jobs of this instance and take over orphaned jobs of other instances, until shutdown."""
+        while not self._stop_lease_thread.wait(self.job_store.lease / 3):
+            try:
+                self.job_store.renew_leases(self.owner_id, JOB_UNFINISHED_STATUSES)
+            except Exception as e:
+                logger.error(f"Error renewing the job leases: {e}")
+            with self._lock:
+                self._requeue_unfinished_jobs()
 
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -202,10 +410,19 @@ class MetricsProcessor:
         Returns:
             Job status information or None if job not found
         """
-        # Check if job exists
+        with self._lock:
+            return self._get_job_status(job_id)
+
+    def _get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        # Jobs that are not in the registry (anymore) may be in the job store, e.g. from before a restart
         if job_id not in self.jobs:
             logger.debug(f"Job {job_id} not found in job registry")
-            return None
+            try:
+                record = self.job_store.get(job_id)
+            except Exception as e:
+                logger.error(f"Error reading job {job_id} from the job store: {e}")
+                return None
+            return JobInfo.from_record(record).to_dict() if record is not None else None
 
         job_info = self.jobs[job_id]
 
@@ -229,6 +446,11 @@ class MetricsProcessor:
             if "results" in result_dict and result_dict["results"]:
                 job_info.results = result_dict["results"]
 
+            # Aggregate the resources of a finished job once
+            if result_dict.get("resources") and job_info.resources is None:
+                job_info.resources = result_dict["resources"]
+                self._add_job_resources(job_info.resources)
+
         # Check if process is still running
         process_alive = False
         if job_id in self.processes:
@@ -248,25 +470,103 @@ class MetricsProcessor:
         logger.debug(f"Job {job_id} process_alive={process_alive}, final status={job_info.status}")
 
         # Handle timeout
-        if job_info.status == JOB_STATUS_PROCESSING and job_info.started_at and time.time() - job_info.started_at > PROCESS_TIMEOUT:
-            # Terminate the process if it's still running
-            if job_id in self.processes and self.processes[job_id].is_alive():
-                try:
-                    logger.warning(f"Terminating job {job_id} due to timeout")
-                    if job_id in self.pids:
-                        # Try to terminate gracefully first using the process's own PID
-                        os.kill(self.pids[job_id], signal.SIGTERM)
-                    self.processes[job_id].join(2.0)  # Give it 2 seconds to clean up
-                    if self.processes[job_id].is_alive():
-                        self.processes[job_id].terminate()
-                except Exception as e:
-                    logger.error(f"Error terminating process: {e}")
-
-            job_info.status = JOB_STATUS_FAILED
-            job_info.error = "Job timed out after {PROCESS_TIMEOUT} seconds"
+        job_timeout = get_job_timeout(job_info.method, job_info.time_budget)
+        if job_info.status == JOB_STATUS_PROCESSING and job_info.started_at and time.time() - job_info.started_at > job_timeout:
+            logger.warning(f"Terminating job {job_id} due to timeout")
+            self._terminate_process(job_id)
+            self._finish_job(job_id, JOB_STATUS_FAILED, f"Job timed out after {job_timeout:g} seconds")
+
+        # The worker stores its final state itself, this covers jobs whose worker died and stores that are not shared with the workers
+        if job_info.status in JOB_FINISHED_STATUSES and not job_info.stored:
+            self._store_job(job_info)
 
         return job_info.to_dict()
 
+    def find_jobs(self, layout_hash: str, method: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the jobs of a layout from the job store, newest first.
+
+        Args:
+            layout_hash: The hash of the layout payload (see `get_layout_hash`), reported as `layout_hash` in the job status
+            method: The specific metric method of the jobs, or None for jobs calculating all metrics
+        """
+        return [
+            self.get_job_status(record["job_id"]) if record["job_id"] in self.jobs else JobInfo.from_record(record).to_dict()
+            for record in self.job_store.find_by_layout_hash(layout_hash, method)
+        ]
+
+    def _store_job(self, job_info: JobInfo) -> None:
+        _store_finished_job(self.job_store, job_info.job_id, job_info.to_dict())
+        job_info.stored = True
+
+    def cancel_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a pending or running job and terminate its worker process.
+
+        A job with multiple subscribers (coalesced submissions) keeps running until the last subscriber cancels it.
+
+        Args:
+            job_id: The ID of the job to cancel
+
+        Returns:
+            Job status information (unchanged for already finished jobs) or None if job not found
+        """
+        with self._lock:
+            return self._cancel_job(job_id)
+
+    def _cancel_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job_status = self._get_job_status(job_id)
+        if job_status is None or job_status["status"] in JOB_FINISHED_STATUSES:
+            return job_status
+
+        job_info = self.jobs[job_id]
+        if job_info.subscribers > 1:
+            job_info.subscribers -= 1
+            logger.info(f"Detached a subscriber from job {job_id}, {job_info.subscribers} remaining")
+            return job_info.to_dict()
+
+        logger.info(f"Cancelling job {job_id}")
+        self._terminate_process(job_id)
+        self._finish_job(job_id, JOB_STATUS_CANCELLED, "Job was cancelled")
+        return self.jobs[job_id].to_dict()
+
+    def _terminate_process(self, job_id: str) -> None:
+        """
+        Terminate the worker process of a job, gracefully with SIGTERM first.
+
+        This is called under the processor lock, so the process is only signalled here and joined (or killed if it does not exit in
+        time) by a background thread.
+        """
+        process = self.processes.pop(job_id, None)
+        if process is None or not process.is_alive():
+            return
+        try:
+            process.terminate()
+        except Exception as e:
+            logger.error(f"Error terminating process: {e}")
+            return
+        threading.Thread(target=_reap_process, args=(process,), name=f"reap-{job_id}", daemon=True).start()
+
+    def _finish_job(self, job_id: str, status: str, error: str) -> None:
+        """Set the final status of a job whose worker did not finish it, also in the shared results, so that polling keeps it."""
+        job_info = self.jobs[job_id]
+        job_info.status = status
+        job_info.error = error
+        job_info.completed_at = time.time()
+        if job_id in self.results:
+            self.results[job_id] = {**self.results[job_id], "status": status, "error": error, "completed_at": job_info.completed_at}
+        self._store_job(job_info)
+
+    def _add_job_resources(self, resources: Dict[str, Any]) -> None:
+        """Add the metric times of a finished job to the rolling statistics and the instrumentation of the server."""
+        self.metric_stats.add_job(resources)
+        for method, seconds in resources.get("metric_times", {}).items():
+            instrumentation.observe(f"metrics.{method}", seconds, source="worker")
+
+    def get_metric_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the rolling wall time statistics per metric of the finished jobs."""
+        return self.metric_stats.to_dict()
+
     def _cleanup_old_jobs(self):
         """Clean up old jobs to prevent memory leaks."""
         current_time = time.time()
@@ -274,7 +574,7 @@ class MetricsProcessor:
 
         for job_id, job_info in self.jobs.items():
             # Remove old completed or failed jobs
-            if job_info.status in (JOB_STATUS_COMPLETED, JOB_STATUS_FAILED) and current_time - job_info.created_at > self.job_cleanup_threshold_sec:
+            if job_info.status in JOB_FINISHED_STATUSES and current_time - job_info.created_at > self.job_cleanup_threshold_sec:
                 jobs_to_remove.append(job_id)
 
         for job_id in jobs_to_remove:
@@ -294,8 +594,17 @@ class MetricsProcessor:
 
             logger.info(f"Cleaned up old job {job_id}")
 
+        removed_job_ids = set(jobs_to_remove)
+        self.inflight_jobs = {fingerprint: job_id for fingerprint, job_id in self.inflight_jobs.items() if job_id not in removed_job_ids}
+
+        try:
+            self.job_store.delete_expired()
+        except Exception as e:
+            logger.error(f"Error deleting expired jobs from the job store: {e}")
+
     def shutdown(self):
         """Shutdown the processor and terminate all running processes."""
+        self._stop_lease_thread.set()
         for job_id, process in self.processes.items():
             if process.is_alive():
                 logger.info(f"Terminating process for job {job_id}")
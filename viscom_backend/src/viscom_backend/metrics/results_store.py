@@ -0,0 +1,141 @@
+"""
+Append-only columnar store of the metric results exported by the evaluation playground.
+
+Each export (see `downloadMetricsAsJson` in the playground) is flattened to one row per visualization and metric and written
+as a new Parquet file, partitioned by dataset and timestamp:
+
+    <store>/<dataset>/<timestamp>/<id>.parquet
+
+Files are never modified, so readers (e.g. the latex-helper) can index them incrementally and load all of them with one
+vectorized read. Existing JSON exports can be imported with:
+
+    python -m viscom_backend.metrics.results_store path/to/metrics_*.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import uuid
+from typing import Any
+
+from viscom_backend.data.catalog import DATASETS_DIR
+
+# Optional dependency (extra "results"), the store is not available without it
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+    pq = None
+
+RESULTS_STORE_DIR = os.environ.get("VISCOM_RESULTS_STORE_DIR", os.path.join(os.path.dirname(DATASETS_DIR), "results"))
+
+# Columns of the stored rows with their Arrow types
+RESULT_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("dataset", "string"),
+    ("timestamp", "string"),
+    ("node_count", "int64"),
+    ("connection_count", "int64"),
+    ("is_synthetic", "bool"),
+    ("visualization_id", "string"),
+    ("visualization_name", "string"),
+    ("visualization_type", "string"),
+    ("metric", "string"),
+    ("value", "float64"),
+    ("error", "string"),
+)
+
+_INVALID_PARTITION_CHARS = re.compile(r"[^A-Za-z0-9_.\-]")
+
+
+def get_results_schema() -> pa.Schema:
+    return pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in RESULT_COLUMNS])
+
+
+def get_partition_name(value: str) -> str:
+    return _INVALID_PARTITION_CHARS.sub("_", value) or "_"
+
+
+def get_result_columns(export: dict[str, Any]) -> dict[str, list[Any]]:
+    """Flatten a metrics export to columns with one row per visualization and metric (see `RESULT_COLUMNS`)."""
+    dataset = export["dataset"]
+    columns: dict[str, list[Any]] = {name: [] for name, _ in RESULT_COLUMNS}
+
+    for visualization_id, visualization in export["visualizations"].items():
+        for metric, result in visualization["metrics"].items():
+            value = result.get("value")
+            columns["visualization_id"].append(str(visualization.get("id", visualization_id)))
+            columns["visualization_name"].append(visualization["name"])
+            columns["visualization_type"].append(visualization["type"])
+            columns["metric"].append(metric)
+            columns["value"].append(float(value) if isinstance(value, (int, float)) else None)
+            columns["error"].append(result.get("error"))
+
+    row_count = len(columns["metric"])
+    columns["dataset"] = [dataset["title"]] * row_count
+    columns["timestamp"] = [dataset["timestamp"]] * row_count
+    columns["node_count"] = [dataset.get("nodeCount")] * row_count
+    columns["connection_count"] = [dataset.get("connectionCount")] * row_count
+    columns["is_synthetic"] = [dataset.get("isSynthetic", dataset["title"].startswith("S_"))] * row_count
+    return columns
+
+
+class MetricsResultStore:
+    """Directory of Parquet files with the flattened metric exports, see the module docstring."""
+
+    def __init__(self, directory: str = RESULTS_STORE_DIR):
+        self.directory = directory
+
+    @staticmethod
+    def is_available() -> bool:
+        return pa is not None
+
+    def append(self, export: dict[str, Any]) -> tuple[str, int]:
+        """Write a metrics export as new Parquet file and return its path and the number of rows."""
+        if not self.is_available():
+            raise RuntimeError("The metrics result store requires pyarrow (install the 'results' extra)")
+
+        dataset = export["dataset"]
+        partition_dir = os.path.join(self.directory, get_partition_name(dataset["title"]), get_partition_name(dataset["timestamp"]))
+        os.makedirs(partition_dir, exist_ok=True)
+
+        table = pa.Table.from_pydict(get_result_columns(export), schema=get_results_schema())
+
+        # Write to a temporary file first, so that readers never see partial files
+        path = os.path.join(partition_dir, f"{uuid.uuid4().hex}.parquet")
+        temp_path = f"{path}.tmp"
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, path)
+        return path, table.num_rows
+
+    def list_files(self) -> list[str]:
+        """Return the paths of all Parquet files, relative to the store directory."""
+        files = []
+        for root, _, file_names in os.walk(self.directory):
+            files.extend(os.path.relpath(os.path.join(root, file_name), self.directory) for file_name in file_names if file_name.endswith(".parquet"))
+        return sorted(files)
+
+
+metrics_result_store = MetricsResultStore()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Import metrics exports of the evaluation playground into the columnar result store.")
+    parser.add_argument("paths", nargs="+", help="Export JSON files or directories containing them")
+    parser.add_argument("--store", default=RESULTS_STORE_DIR, help="Directory of the result store")
+    args = parser.parse_args(argv)
+
+    store = MetricsResultStore(args.store)
+    for path in args.paths:
+        files = [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".json")] if os.path.isdir(path) else [path]
+        for file_path in files:
+            with open(file_path) as file:
+                stored_path, row_count = store.append(json.load(file))
+            print(f"{file_path}: {row_count} rows -> {stored_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import networkx as nx
+
+from viscom_backend.commgraph.converter import get_topic_name
+from viscom_backend.noderank.commgraph_centrality import CommGraphShortestPaths, calculate_commgraph_centrality
+
+logger = logging.getLogger(__name__)
+
+# Number of centrality results kept in memory
+CENTRALITY_CACHE_MAX_ENTRIES = 128
+
+# Number of threads computing centralities in the background
+CENTRALITY_WORKERS = 2
+
+# Edge attributes that are added by `convert_to_weighted_graph` and ignored by the topic graph conversion
+_IGNORED_EDGE_ATTRIBUTES = ("distance", "weight")
+
+
+def get_commgraph_fingerprint(graph: nx.Graph) -> str:
+    """
+    Return a fingerprint of the communication structure of a graph: its nodes and the (source, target, topic) connections.
+
+    Node and edge attributes that do not influence the commgraph centrality (e.g. a previously computed centrality or the edge
+    distances and weights of the weighted graph) are ignored, so that a generated graph and its weighted variant sent back
+    by the client have the same fingerprint.
+    """
+    nodes = sorted(repr(node) for node in graph.nodes)
+    connections = sorted(
+        f"{source!r}|{target!r}|{get_topic_name(topic_type, topic)}"
+        for source, target, edge_data in graph.edges(data=True)
+        for topic_type, topic in edge_data.items()
+        if topic_type not in _IGNORED_EDGE_ATTRIBUTES
+    )
+
+    sha = hashlib.sha1()
+    sha.update("\n".join(nodes).encode("utf-8"))
+    sha.update(b"\n\n")
+    sha.update("\n".join(connections).encode("utf-8"))
+    return sha.hexdigest()
+
+
+class CentralityCache:
+    """Thread-safe LRU cache of commgraph centralities keyed by graph fingerprint, mode and normalization."""
+
+    def __init__(self, max_entries: int = CENTRALITY_CACHE_MAX_ENTRIES, workers: int = CENTRALITY_WORKERS):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple[str, str, bool], dict] = OrderedDict()
+        self.pending: dict[tuple[str, str, bool], Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+
+    def get(self, fingerprint: str, mode: str, normalize: bool = True) -> dict | None:
+        key = (fingerprint, mode, normalize)
+        with self._lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return dict(result)
+
+    def put(self, fingerprint: str, mode: str, normalize: bool, result: dict) -> None:
+        key = (fingerprint, mode, normalize)
+        with self._lock:
+            self.entries[key] = dict(result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached results (pending calculations are kept)."""
+        with self._lock:
+            self.entries.clear()
+
+    def is_pending(self, fingerprint: str, mode: str, normalize: bool = True) -> bool:
+        with self._lock:
+            return (fingerprint, mode, normalize) in self.pending
+
+    def calculate(
+        self,
+        graph: nx.MultiDiGraph,
+        mode: str = "significance",
+        normalize: bool = True,
+        fingerprint: str | None = None,
+        paths: CommGraphShortestPaths | None = None,
+    ) -> dict:
+        """Return the commgraph centrality of the graph, computing it (with the given shared shortest paths) only if it is not cached yet."""
+        fingerprint = fingerprint or get_commgraph_fingerprint(graph)
+        result = self.get(fingerprint, mode, normalize)
+        if result is not None:
+            return result
+
+        # Wait for a running background calculation of the same graph instead of computing it twice
+        with self._lock:
+            future = self.pending.get((fingerprint, mode, normalize))
+        if future is not None:
+            return dict(future.result())
+
+        result = calculate_commgraph_centrality(graph, mode=mode, normalize=normalize, paths=paths)  # type: ignore
+        self.put(fingerprint, mode, normalize, result)
+        return result
+
+    def submit(self, graph: nx.MultiDiGraph, mode: str = "significance", normalize: bool = True) -> str:
+        """Schedule the calculation in a background thread (unless it is cached or running) and return the graph fingerprint."""
+        fingerprint = get_commgraph_fingerprint(graph)
+        key = (fingerprint, mode, normalize)
+        with self._lock:
+            if key in self.entries or key in self.pending:
+                return fingerprint
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="centrality")
+
+            # The graph is copied, as the caller continues to use (and modify) it
+            future = self._executor.submit(calculate_commgraph_centrality, graph.copy(), mode=mode, normalize=normalize)
+            self.pending[key] = future
+
+        def on_done(future: Future):
+            # Store the result before removing the pending entry, so that waiting callers always find one of both
+            if future.exception() is None:
+                self.put(fingerprint, mode, normalize, future.result())
+            else:
+                logger.error("Background centrality calculation for %s failed: %r", fingerprint, future.exception())
+            with self._lock:
+                self.pending.pop(key, None)
+
+        future.add_done_callback(on_done)
+        return fingerprint
+
+
+centrality_cache = CentralityCache()
+
+
+def get_commgraph_centrality(graph: nx.MultiDiGraph, mode: str = "significance", normalize: bool = True) -> dict:
+    """Cached variant of `calculate_commgraph_centrality`."""
+    return centrality_cache.calculate(graph, mode=mode, normalize=normalize)
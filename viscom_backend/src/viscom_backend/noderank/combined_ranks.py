@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import inspect
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Hashable
+
+import networkx as nx
+
+from viscom_backend.commgraph.converter import convert_multigraph_to_normal_graph
+from viscom_backend.noderank.centrality_cache import centrality_cache, get_commgraph_fingerprint
+from viscom_backend.noderank.commgraph_centrality import CommGraphShortestPaths
+from viscom_backend.noderank.node_rank_methods import node_rank_methods_config
+from viscom_backend.noderank.sparse_rank import SparseRankGraph
+
+logger = logging.getLogger(__name__)
+
+# Number of threads computing the node ranks of one request
+NODERANK_WORKERS = min(4, os.cpu_count() or 1)
+
+# Separator between a method and the value of its choice parameter in a method spec, e.g. "commgraph_centrality:harmonic"
+METHOD_SPEC_SEPARATOR = ":"
+
+
+class NodeRankContext:
+    """
+    A weighted graph (see `convert_to_weighted_graph`) and its preprocessed representations, shared by all node rank methods of a request.
+
+    The sparse matrices, the shortest path distances and the commgraph shortest paths are only computed when a method needs them,
+    and only once, even if methods running in parallel request them at the same time.
+    """
+
+    def __init__(self, graph: nx.MultiDiGraph):
+        self.graph = graph
+        self._sparse_graph: SparseRankGraph | None = None
+        self._commgraph_paths: CommGraphShortestPaths | None = None
+        self._fingerprint: str | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def sparse_graph(self) -> SparseRankGraph:
+        with self._lock:
+            if self._sparse_graph is None:
+                self._sparse_graph = SparseRankGraph(self.graph)
+            return self._sparse_graph
+
+    @property
+    def commgraph_paths(self) -> CommGraphShortestPaths:
+        with self._lock:
+            if self._commgraph_paths is None:
+                self._commgraph_paths = CommGraphShortestPaths(self.graph)
+            return self._commgraph_paths
+
+    @property
+    def fingerprint(self) -> str:
+        with self._lock:
+            if self._fingerprint is None:
+                self._fingerprint = get_commgraph_fingerprint(self.graph)
+            return self._fingerprint
+
+
+def calculate_nx_noderank(method: str, graph: nx.MultiDiGraph, params: dict[str, Any]) -> Any:
+    """Run the networkx implementation of a node rank method on the weighted graph, applying the conversions of its config."""
+    config = node_rank_methods_config[method]
+    params = dict(params)
+
+    if config.get("reverse_graph", False):
+        graph = graph.reverse()
+
+    if config.get("convert_to_simple_graph", False):
+        graph = convert_multigraph_to_normal_graph(graph)
+
+    # Check if the method has a distance parameter
+    method_cb = config["method"]
+    parameters = inspect.signature(method_cb).parameters
+
+    if (d := config.get("distance", None)) is not None and "distance" in parameters:
+        params["distance"] = d
+
+    if (w := config.get("weight", None)) is not None and "weight" in parameters:
+        params["weight"] = w
+
+    return method_cb(graph, **params)
+
+
+def calculate_noderank(context: NodeRankContext, method: str, params: dict[str, Any]) -> Any:
+    """Compute a node rank method on the shared representations of the context."""
+    if method == "commgraph_centrality":
+        return centrality_cache.calculate(context.graph, fingerprint=context.fingerprint, paths=context.commgraph_paths, **params)
+
+    if (sparse_method := node_rank_methods_config[method].get("sparse_method", None)) is not None:
+        return sparse_method(context.sparse_graph, **params)
+
+    return calculate_nx_noderank(method, context.graph, params)
+
+
+def normalize_ranks(result: dict[Hashable, float]) -> dict[Hashable, float]:
+    """Scale the ranks so that the highest rank is 1."""
+    max_value = max(result.values(), default=0)
+    if max_value == 0:
+        return dict(result)
+    return {node: value / max_value for node, value in result.items()}
+
+
+def get_default_method_specs() -> list[str]:
+    """All node rank methods, methods with a choice parameter (e.g. the commgraph centrality modes) once per choice."""
+    specs = []
+    for method, config in node_rank_methods_config.items():
+        choice_params = [param for param in config["params"] if param["type"] == "choice"]
+        if choice_params:
+            specs.extend(f"{method}{METHOD_SPEC_SEPARATOR}{choice}" for choice in choice_params[0]["choices"])
+        else:
+            specs.append(method)
+    return specs
+
+
+def parse_method_spec(spec: str) -> tuple[str, dict[str, Any]]:
+    """
+    Split a method spec into the method and the parameters given by the spec.
+
+    A spec is either a method name or "<method>:<choice>", which sets the choice parameter of the method (e.g. "commgraph_centrality:harmonic").
+    Raises ValueError for unknown methods or choices.
+    """
+    method, _, choice = spec.partition(METHOD_SPEC_SEPARATOR)
+    if method not in node_rank_methods_config:
+        raise ValueError(f"Unknown method: {method}")
+    if not choice:
+        return method, {}
+
+    choice_params = [param for param in node_rank_methods_config[method]["params"] if param["type"] == "choice"]
+    if not choice_params or choice not in choice_params[0]["choices"]:
+        raise ValueError(f"Invalid choice '{choice}' for method {method}")
+    return method, {choice_params[0]["key"]: choice}
+
+
+def calculate_noderank_table(
+    graph: nx.MultiDiGraph, method_params: dict[str, tuple[str, dict[str, Any]]], workers: int = NODERANK_WORKERS
+) -> dict[str, Any]:
+    """
+    Compute multiple node ranks of a weighted graph in a thread pool and return them as table.
+
+    `method_params` maps a column name (the method spec) to the method and its parameters.
+    The result contains the node ids, the normalized ranks per column in the order of the nodes (None for nodes without a rank)
+    and an error message for each method that failed.
+    """
+    context = NodeRankContext(graph)
+    nodes = list(graph.nodes)
+
+    def calculate_column(method: str, params: dict[str, Any]) -> dict[Hashable, float]:
+        result = calculate_noderank(context, method, params)
+        if not isinstance(result, dict):
+            raise ValueError(f"Method {method} does not return a rank per node")
+        return normalize_ranks(result)
+
+    ranks: dict[str, list[float | None]] = {}
+    errors: dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="noderank") as executor:
+        futures = {column: executor.submit(calculate_column, method, params) for column, (method, params) in method_params.items()}
+        for column, future in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning("Node rank %s failed: %r", column, e)
+                errors[column] = str(e) or type(e).__name__
+                continue
+            ranks[column] = [result.get(node) for node in nodes]
+
+    return {"nodes": nodes, "methods": list(ranks.keys()), "ranks": ranks, "errors": errors}
@@ -1,14 +1,50 @@
 from __future__ import annotations
 
+import logging
 import math
-from typing import Literal
+import threading
+from typing import Hashable, Literal
 
 import networkx as nx
 
 from viscom_backend.commgraph.converter import convert_node_connections_graph_to_topic_graph
+from viscom_backend.instrumentation import timed
 
+logger = logging.getLogger(__name__)
 
-def calculate_commgraph_centrality(graph: nx.MultiDiGraph, mode: Literal["reachability", "closeness", "significance", "degree", "harmonic"], normalize=True) -> dict[str, float]:
+
+ShortestPaths = tuple[dict[Hashable, list[Hashable]], dict[Hashable, float]]
+
+
+class CommGraphShortestPaths:
+    """
+    The topic graph of a commgraph and the shortest paths (predecessors and distances) from each node on it.
+
+    The paths are computed on first use and can be shared by the different centrality modes of the same graph.
+    """
+
+    def __init__(self, graph: nx.MultiDiGraph):
+        self.nodes = list(graph.nodes())
+        self.topic_graph = convert_node_connections_graph_to_topic_graph(graph)
+        self._paths: dict[bool, dict[Hashable, ShortestPaths]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, reverse: bool = False) -> dict[Hashable, ShortestPaths]:
+        """Return the shortest paths from each node, on the reversed topic graph if `reverse` is True."""
+        with self._lock:
+            if reverse not in self._paths:
+                topic_graph = self.topic_graph.reverse() if reverse else self.topic_graph
+                self._paths[reverse] = {node: nx.dijkstra_predecessor_and_distance(topic_graph, node, weight="distance") for node in self.nodes}
+            return self._paths[reverse]
+
+
+@timed()
+def calculate_commgraph_centrality(
+    graph: nx.MultiDiGraph,
+    mode: Literal["reachability", "closeness", "significance", "degree", "harmonic"],
+    normalize=True,
+    paths: CommGraphShortestPaths | None = None,
+) -> dict[str, float]:
     """
     Compute the commgraph centrality for nodes.
 
@@ -17,9 +53,11 @@ def calculate_commgraph_centrality(graph: nx.MultiDiGraph, mode: Literal["reacha
     - "closeness": The closeness extends the reachability by adding the inverse of the shortest path lengths from u to all other nodes v also to the start node v.
     - "significance": The significance not only values the start and end node of the shortest path, but also the nodes on the shortest path between the start and end node.
 
+    The shortest paths can be passed as `paths` to share them between the calculation of multiple modes.
     """
 
-    topic_graph = convert_node_connections_graph_to_topic_graph(graph)
+    paths = paths or CommGraphShortestPaths(graph)
+    topic_graph = paths.topic_graph
     # topic_graph = graph
 
     centrality = dict.fromkeys(graph, 0.0)
@@ -55,10 +93,11 @@ def calculate_commgraph_centrality(graph: nx.MultiDiGraph, mode: Literal["reacha
 
     elif mode == "harmonic":
         # do_sqrt = False
-        reverse_graph = topic_graph.reverse()
+        forward_paths = paths.get()
+        reverse_paths = paths.get(reverse=True)
         for start_node in graph.nodes():
-            shortest_paths = nx.dijkstra_predecessor_and_distance(topic_graph, start_node, weight="distance")
-            shortest_paths_reverse = nx.dijkstra_predecessor_and_distance(reverse_graph, start_node, weight="distance")
+            shortest_paths = forward_paths[start_node]
+            shortest_paths_reverse = reverse_paths[start_node]
 
             for end_node in graph.nodes():
                 if end_node in shortest_paths[1] and shortest_paths[1][end_node] > 0:
@@ -69,11 +108,12 @@ def calculate_commgraph_centrality(graph: nx.MultiDiGraph, mode: Literal["reacha
                     # centrality[start_node] += (1 / shortest_paths_reverse[1][end_node]) ** 1
 
     else:
+        forward_paths = paths.get()
         for start_node in graph.nodes():
             # print(start_node)
             # On the topic graph we now calculate the shortest paths between all node-pairs of the original graph
             # Get shortest path to all other nodes
-            shortest_paths = nx.dijkstra_predecessor_and_distance(topic_graph, start_node, weight="distance")
+            shortest_paths = forward_paths[start_node]
             for end_node in graph.nodes():
                 if end_node not in shortest_paths[1]:
                     continue
@@ -133,10 +173,6 @@ def calculate_commgraph_centrality(graph: nx.MultiDiGraph, mode: Literal["reacha
     # betweenness = nx.betweenness_centrality(graph, weight="distance", normalized=True)
     # centrality = {node: value / (betweenness[node] if betweenness[node] > 0 else 1) for node, value in centrality.items()}
 
-    for node in centrality:
-        # print(node, round(centrality[node], 4), round(betweenness[node], 4))
-        print(node, round(centrality[node], 4))
-
     # Normalize the values
     if normalize:
         values = list(centrality.values())
@@ -145,10 +181,6 @@ def calculate_commgraph_centrality(graph: nx.MultiDiGraph, mode: Literal["reacha
             if max_value > 0:
                 centrality = {node: value / max_value for node, value in centrality.items()}
 
-    for node in centrality:
-        # print(node, round(centrality[node], 4), round(betweenness[node], 4))
-        print(node, round(centrality[node], 4))
-
     return centrality
 
 
@@ -260,8 +292,9 @@ def get_commgraph_node_clusters(graph: nx.MultiDiGraph):
     combined_centrality = {node: degree_centrality[node] * significance_centrality[node] for node in graph.nodes()}
     combined_centrality = dict(sorted(combined_centrality.items(), key=lambda item: item[1], reverse=True))
 
-    for node in combined_centrality:
-        print(node, combined_centrality[node])
+    if logger.isEnabledFor(logging.DEBUG):
+        for node in combined_centrality:
+            logger.debug("Combined centrality of %s: %s", node, combined_centrality[node])
 
     # For each node, we want to store the distances to all other nodes in the graph
     distance_maps: dict[str, dict[str, int | None]] = dict()
@@ -345,17 +378,11 @@ def get_commgraph_node_clusters(graph: nx.MultiDiGraph):
         cluster.add_distance_result(target_node, distance)
         node_to_distance_in_cluster_map[target_node] = distance
 
-    # Print the clusters
-    for node in cluster_map:
-        cluster = cluster_map[node]
-        print(cluster.center_node)
-        for distance_result in cluster.distance_results:
-            print("\t", distance_result)
-
-    # Print the duplicated nodes
-    print("\nDuplicated nodes:")
-    for node in duplicated_nodes:
-        print(node)
+    # Log the clusters and the duplicated nodes
+    if logger.isEnabledFor(logging.DEBUG):
+        for node in cluster_map:
+            logger.debug("Cluster %s: %s", cluster_map[node].center_node, cluster_map[node].distance_results)
+        logger.debug("Duplicated nodes: %s", duplicated_nodes)
 
     # resolved_cluster = ResolvedCluster("i2c_bridge_node")
     # resolved_cluster.resolve(cluster_map)
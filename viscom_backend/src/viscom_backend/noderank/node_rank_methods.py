@@ -1,4 +1,16 @@
-from viscom_backend.noderank.commgraph_centrality import calculate_commgraph_centrality
+from functools import partial
+
+from viscom_backend.noderank.centrality_cache import get_commgraph_centrality
+from viscom_backend.noderank.sparse_rank import (
+    sparse_betweenness_centrality,
+    sparse_closeness_centrality,
+    sparse_eigenvector_centrality,
+    sparse_harmonic_centrality,
+    sparse_katz_centrality,
+    sparse_mirrored_harmonic_centrality,
+    sparse_pagerank,
+    sparse_percolation_centrality,
+)
 import networkx as nx
 
 def mirrored_harmonic_centrality(G, distance="distance"):
@@ -12,11 +24,15 @@ def mirrored_harmonic_centrality(G, distance="distance"):
 
     return centrality
 
+# Methods with a "sparse_method" are computed on a `SparseRankGraph` built from the weighted graph, which replaces the
+# "reverse_graph" and "convert_to_simple_graph" conversions. The networkx "method" is kept as reference implementation.
+# Betweenness and percolation accept the pivot parameters "k" / "epsilon" for approximations, which networkx does not support.
 node_rank_methods_config = {
     "pagerank": {
         "params": [{"key": "alpha", "type": "float", "description": "Damping parameter for PageRank", "range": [0.0, 1.0], "default": 0.85}],
         "description": "PageRank computes a ranking of the nodes in the graph G based on the structure of the incoming links.",
         "method": nx.pagerank,
+        "sparse_method": sparse_pagerank,
     },
     "degree_centrality": {
         "params": [],
@@ -27,6 +43,7 @@ node_rank_methods_config = {
         "params": [{"key": "max_iter", "type": "int", "description": "Maximum number of iterations in power method eigenvalue solver", "range": [1, 1000], "default": 100}],
         "description": "Compute the eigenvector centrality for the graph G.",
         "method": nx.eigenvector_centrality,
+        "sparse_method": sparse_eigenvector_centrality,
         "convert_to_simple_graph": True,
         "weight": "weight",
     },
@@ -37,6 +54,7 @@ node_rank_methods_config = {
         "reverse_graph": True,
         "convert_to_simple_graph": True,
         "method": nx.closeness_centrality,
+        "sparse_method": partial(sparse_closeness_centrality, reverse=True),
     },
     "closeness_centrality_reversed": {
         "params": [{"key": "wf_improved", "type": "bool", "description": "Use Wasserman and Faust's formula for closeness", "default": False}],
@@ -45,6 +63,7 @@ node_rank_methods_config = {
         "convert_to_simple_graph": True,
         "reverse_graph": False,
         "method": nx.closeness_centrality,
+        "sparse_method": sparse_closeness_centrality,
     },
     "betweenness_centrality": {
         "params": [
@@ -53,12 +72,28 @@ node_rank_methods_config = {
                 "type": "bool",
                 "description": "If True the betweenness values are normalized by 2/((n-1)(n-2)) for graphs, and 1/((n-1)(n-2)) for directed graphs where n is the number of nodes in G.",
                 "default": True,
-            }
+            },
+            {
+                "key": "k",
+                "type": "int",
+                "description": "Number of randomly sampled pivot (source) nodes for an approximation. 0 computes the exact value, unless epsilon is set.",
+                "range": [0, 100000],
+                "default": 0,
+            },
+            {
+                "key": "epsilon",
+                "type": "float",
+                "description": "Maximum error of the approximation (with 90% confidence), determines the number of pivots if k is 0. 0 computes the exact value.",
+                "range": [0.0, 1.0],
+                "default": 0.0,
+            },
+            {"key": "seed", "type": "int", "description": "Seed for the pivot sampling", "range": [0, 2**32 - 1], "default": 42},
         ],
         # "distance": "weight",
         "weight": "distance",
         "description": "Compute the shortest-path betweenness centrality for nodes.",
         "method": nx.betweenness_centrality,
+        "sparse_method": sparse_betweenness_centrality,
     },
     "commgraph_centrality": {
         "params": [
@@ -71,7 +106,8 @@ node_rank_methods_config = {
             }
         ],
         "description": "Compute the commgraph centrality for nodes.",
-        "method": calculate_commgraph_centrality,
+        # Cached by graph fingerprint, so that the centrality of a graph annotated by /generate is returned instantly
+        "method": get_commgraph_centrality,
     },
     # "local_reaching_centrality": {
     #     "params": [],
@@ -82,12 +118,14 @@ node_rank_methods_config = {
         "params": [],
         "description": "Compute harmonic centrality for nodes.",
         "method": nx.harmonic_centrality,
+        "sparse_method": sparse_harmonic_centrality,
         "distance": "distance",
     },
     "mirrored_harmonic_centrality": {
         "params": [],
         "description": "Compute harmonic centrality for nodes.",
         "method": mirrored_harmonic_centrality,
+        "sparse_method": sparse_mirrored_harmonic_centrality,
         "distance": "distance",
     },
     "katz_centrality": {
@@ -96,6 +134,7 @@ node_rank_methods_config = {
         "weight": "weight",
         "convert_to_simple_graph": True,
         "method": nx.katz_centrality,
+        "sparse_method": sparse_katz_centrality,
     },
     "global_reaching_centrality": {
         "params": [],
@@ -108,9 +147,26 @@ node_rank_methods_config = {
         "method": nx.voterank,
     },
     "percolation_centrality": {
-        "params": [],
+        "params": [
+            {
+                "key": "k",
+                "type": "int",
+                "description": "Number of randomly sampled pivot (source) nodes for an approximation. 0 computes the exact value, unless epsilon is set.",
+                "range": [0, 100000],
+                "default": 0,
+            },
+            {
+                "key": "epsilon",
+                "type": "float",
+                "description": "Maximum error of the approximation (with 90% confidence), determines the number of pivots if k is 0. 0 computes the exact value.",
+                "range": [0.0, 1.0],
+                "default": 0.0,
+            },
+            {"key": "seed", "type": "int", "description": "Seed for the pivot sampling", "range": [0, 2**32 - 1], "default": 42},
+        ],
         "description": "Compute the percolation centrality for nodes.",
         "method": nx.percolation_centrality,
+        "sparse_method": sparse_percolation_centrality,
         "weight": "distance",
     },
     "laplacian_centrality": {
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Hashable, Iterator
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+
+class SparseRankGraph:
+    """
+    Sparse matrix representation of a weighted commgraph (see `convert_to_weighted_graph`) shared by the sparse node rank methods.
+
+    The matrices are built once per graph:
+    - `weight`: the weights of parallel edges summed up, as in `convert_multigraph_to_normal_graph`
+    - `simple_distance`: the distances of the simple graph, 1 / weight^2 of the summed weights
+    - `multi_distance`: the shortest of the parallel edges, as used by networkx shortest paths on the multigraph
+
+    All-pairs shortest path distances are computed lazily and only once per distance matrix, as are the Brandes dependency sums
+    shared by betweenness and percolation centrality.
+    """
+
+    def __init__(self, graph: nx.MultiDiGraph, weight: str = "weight", distance: str = "distance"):
+        self.nodes: list[Hashable] = list(graph.nodes)
+        node_index = {node: i for i, node in enumerate(self.nodes)}
+        n = len(self.nodes)
+
+        edge_count = graph.number_of_edges()
+        sources = np.empty(edge_count, dtype=np.int64)
+        targets = np.empty(edge_count, dtype=np.int64)
+        weights = np.empty(edge_count, dtype=np.float64)
+        distances = np.empty(edge_count, dtype=np.float64)
+        for i, (source, target, edge_data) in enumerate(graph.edges(data=True)):
+            sources[i] = node_index[source]
+            targets[i] = node_index[target]
+            weights[i] = edge_data.get(weight, 1)
+            distances[i] = edge_data.get(distance, 1)
+
+        # Duplicate entries (parallel edges) are summed up by the conversion to csr
+        self.weight = sparse.csr_array((weights, (sources, targets)), shape=(n, n))
+        self.weight.sum_duplicates()
+
+        self.simple_distance = self.weight.copy()
+        self.simple_distance.data = 1 / self.simple_distance.data**2
+
+        # Keep only the shortest of parallel edges: sort by (pair, distance) and take the first entry of each pair
+        pairs = sources * n + targets
+        order = np.lexsort((distances, pairs))
+        _, first = np.unique(pairs[order], return_index=True)
+        shortest = order[first]
+        self.multi_distance = sparse.csr_array((distances[shortest], (sources[shortest], targets[shortest])), shape=(n, n))
+
+        self._shortest_paths: dict[bool, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._dependency_sums: dict[bytes | None, np.ndarray] = {}
+        self._dependency_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def get_shortest_path_distances(self, simple: bool) -> np.ndarray:
+        """
+        Return the dense matrix of shortest path distances, D[i, j] being the distance from node i to node j (inf if unreachable).
+
+        If `simple` is True, the distances of the simple graph are used, otherwise the shortest parallel edges of the multigraph.
+        """
+        with self._lock:
+            if simple not in self._shortest_paths:
+                matrix = self.simple_distance if simple else self.multi_distance
+                self._shortest_paths[simple] = csgraph.dijkstra(matrix, directed=True)
+            return self._shortest_paths[simple]
+
+    def get_cached_shortest_path_distances(self, simple: bool) -> np.ndarray | None:
+        """Return the shortest path distances if they were already computed, otherwise None."""
+        with self._lock:
+            return self._shortest_paths.get(simple)
+
+    def get_dependency_sums(self, pivots: np.ndarray | None) -> np.ndarray:
+        """
+        Return the Brandes dependencies summed over the sources per node, with all nodes as sources if `pivots` is None.
+
+        The sums are computed once per source set, so that betweenness and percolation centrality of the same graph share them.
+        """
+        key = None if pivots is None else pivots.tobytes()
+        with self._dependency_lock:
+            if key not in self._dependency_sums:
+                sources = np.arange(len(self)) if pivots is None else pivots
+                dependency_sums = np.zeros(len(self))
+                for _, delta in iter_brandes_dependencies(self, sources):
+                    dependency_sums += delta.sum(axis=0)
+                self._dependency_sums[key] = dependency_sums
+            return self._dependency_sums[key]
+
+    def to_dict(self, values: np.ndarray) -> dict[Hashable, float]:
+        return {node: float(value) for node, value in zip(self.nodes, values)}
+
+
+def sparse_pagerank(graph: SparseRankGraph, alpha: float = 0.85, max_iter: int = 100, tol: float = 1.0e-6) -> dict[Hashable, float]:
+    """PageRank as power iteration on the row-normalized weight matrix, equivalent to `nx.pagerank`."""
+    n = len(graph)
+    if n == 0:
+        return {}
+
+    out_weights = np.asarray(graph.weight.sum(axis=1)).ravel()
+    is_dangling = out_weights == 0
+    inverse_out_weights = np.divide(1.0, out_weights, out=np.zeros(n), where=~is_dangling)
+    transition = sparse.diags_array(inverse_out_weights) @ graph.weight
+
+    x = np.full(n, 1.0 / n)
+    p = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        x_last = x
+        x = alpha * (x @ transition + x[is_dangling].sum() * p) + (1 - alpha) * p
+        if np.abs(x - x_last).sum() < n * tol:
+            return graph.to_dict(x)
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
+
+def sparse_eigenvector_centrality(graph: SparseRankGraph, max_iter: int = 100, tol: float = 1.0e-6) -> dict[Hashable, float]:
+    """Eigenvector centrality (of the in-edges) as power iteration on (A + I), equivalent to `nx.eigenvector_centrality`."""
+    n = len(graph)
+    if n == 0:
+        raise nx.NetworkXPointlessConcept("cannot compute centrality for the null graph")
+
+    transposed = graph.weight.T.tocsr()
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        x_last = x
+        x = x_last + transposed @ x_last
+        x = x / (np.linalg.norm(x) or 1)
+        if np.abs(x - x_last).sum() < n * tol:
+            return graph.to_dict(x)
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
+
+def sparse_katz_centrality(
+    graph: SparseRankGraph, alpha: float = 0.1, beta: float = 1.0, max_iter: int = 1000, tol: float = 1.0e-6, normalized: bool = True
+) -> dict[Hashable, float]:
+    """Katz centrality as fixed point iteration x = alpha * A^T x + beta, equivalent to `nx.katz_centrality`."""
+    n = len(graph)
+    if n == 0:
+        return {}
+
+    transposed = graph.weight.T.tocsr()
+    x = np.zeros(n)
+    for _ in range(max_iter):
+        x_last = x
+        # For alpha above 1 / lambda_max the iteration diverges, stop once it overflowed instead of computing inf - inf
+        with np.errstate(over="ignore"):
+            x = alpha * (transposed @ x_last) + beta
+        if not np.isfinite(x).all():
+            break
+        if np.abs(x - x_last).sum() < n * tol:
+            if normalized:
+                norm = np.linalg.norm(x)
+                x = x / norm if norm > 0 else x
+            return graph.to_dict(x)
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
+
+def _closeness(distances: np.ndarray, wf_improved: bool) -> np.ndarray:
+    """Closeness per row of a distance matrix, with the formula of `nx.closeness_centrality`."""
+    n = distances.shape[0]
+    reachable = np.isfinite(distances)
+    reachable_count = reachable.sum(axis=1)
+    total_distance = np.where(reachable, distances, 0).sum(axis=1)
+
+    closeness = np.zeros(n)
+    valid = (total_distance > 0) & (n > 1)
+    closeness[valid] = (reachable_count[valid] - 1) / total_distance[valid]
+    if wf_improved and n > 1:
+        closeness *= (reachable_count - 1) / (n - 1)
+    return closeness
+
+
+def sparse_closeness_centrality(graph: SparseRankGraph, wf_improved: bool = True, reverse: bool = False) -> dict[Hashable, float]:
+    """
+    Closeness centrality on the simple graph, equivalent to `nx.closeness_centrality` with distance="distance".
+
+    As in networkx, the closeness of a node is based on the distances to it (the incoming distances).
+    With `reverse` the outgoing distances are used instead, which is the closeness of the reversed graph.
+    """
+    if len(graph) == 0:
+        return {}
+
+    distances = graph.get_shortest_path_distances(simple=True)
+    return graph.to_dict(_closeness(distances if reverse else distances.T, wf_improved))
+
+
+def _inverse_distances(distances: np.ndarray) -> np.ndarray:
+    """1 / d for finite, non-zero distances and 0 otherwise (the node itself and unreachable nodes)."""
+    return np.divide(1.0, distances, out=np.zeros_like(distances), where=np.isfinite(distances) & (distances != 0))
+
+
+def sparse_harmonic_centrality(graph: SparseRankGraph) -> dict[Hashable, float]:
+    """Harmonic centrality (sum of inverse incoming distances) on the multigraph, equivalent to `nx.harmonic_centrality`."""
+    if len(graph) == 0:
+        return {}
+
+    inverse = _inverse_distances(graph.get_shortest_path_distances(simple=False))
+    return graph.to_dict(inverse.sum(axis=0))
+
+
+def sparse_mirrored_harmonic_centrality(graph: SparseRankGraph) -> dict[Hashable, float]:
+    """
+    Mean of the harmonic centrality of the graph and of the reversed graph.
+
+    Both are computed from the same distance matrix: the incoming distances are its columns, the outgoing distances its rows.
+    """
+    if len(graph) == 0:
+        return {}
+
+    inverse = _inverse_distances(graph.get_shortest_path_distances(simple=False))
+    return graph.to_dict((inverse.sum(axis=0) + inverse.sum(axis=1)) / 2)
+
+
+# Upper bound for the number of (pivot, edge) entries processed per batch of the Brandes engine
+BRANDES_BATCH_ENTRIES = 1 << 22
+
+# Confidence of the error bound used to derive the number of pivots from `epsilon`
+PIVOT_CONFIDENCE = 0.9
+
+
+def get_pivot_count(node_count: int, epsilon: float, confidence: float = PIVOT_CONFIDENCE) -> int:
+    """
+    Number of pivots, such that the normalized approximation deviates at most `epsilon` from the exact value for all nodes
+    with probability `confidence` (Hoeffding bound with a union bound over the nodes).
+    """
+    if node_count == 0:
+        return 0
+    return min(node_count, math.ceil(math.log(2 * node_count / (1 - confidence)) / (2 * epsilon**2)))
+
+
+def select_pivots(node_count: int, k: int = 0, epsilon: float = 0.0, seed: int | None = None) -> np.ndarray | None:
+    """
+    Sample the pivot (source) nodes of an approximation, given either by their number `k` or by the error bound `epsilon`.
+
+    Returns None if the exact value is requested (k and epsilon are 0) or if all nodes would be sampled anyway.
+    """
+    if k <= 0 and epsilon > 0:
+        k = get_pivot_count(node_count, epsilon)
+    if k <= 0 or k >= node_count:
+        return None
+    return np.sort(np.random.default_rng(seed).choice(node_count, size=k, replace=False))
+
+
+def iter_brandes_dependencies(graph: SparseRankGraph, sources: np.ndarray) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Yield (batch sources, dependencies) with the Brandes dependencies delta[i, v] of each source on each node (0 for the source itself).
+
+    The sources are processed in batches. For each batch, the shortest path distances are computed with one csgraph Dijkstra call,
+    or taken from the all-pairs distances of the multigraph if another method (e.g. harmonic centrality) already computed them.
+    The shortest path DAGs of the batch are stacked into one block diagonal matrix. Path counts and dependencies then follow from
+    sparse matrix products, iterated until the longest path of the DAGs is covered. As in networkx, parallel edges count once with
+    their shortest distance and ties are exact float equality.
+    """
+    n = len(graph)
+    if len(sources) == 0:
+        return
+    matrix = graph.multi_distance.tocoo()
+    not_loop = matrix.row != matrix.col
+    edge_sources, edge_targets, edge_distances = matrix.row[not_loop], matrix.col[not_loop], matrix.data[not_loop]
+
+    # Only reuse the all-pairs distances if another method computed them, the batches keep the memory bounded otherwise
+    all_distances = graph.get_cached_shortest_path_distances(simple=False)
+
+    batch_size = max(1, min(len(sources), BRANDES_BATCH_ENTRIES // max(1, len(edge_distances), n)))
+    for start in range(0, len(sources), batch_size):
+        batch = sources[start : start + batch_size]
+        b = len(batch)
+        if all_distances is not None:
+            distances = all_distances[batch]
+        else:
+            distances = np.atleast_2d(csgraph.dijkstra(graph.multi_distance, directed=True, indices=batch))
+
+        # Edges on a shortest path from the source of the row
+        source_distances = distances[:, edge_sources]
+        on_path = np.isfinite(source_distances) & (source_distances + edge_distances == distances[:, edge_targets])
+        rows, edges = np.nonzero(on_path)
+        dag_sources = rows * n + edge_sources[edges]
+        dag_targets = rows * n + edge_targets[edges]
+
+        # Number of shortest paths: sigma = e_s + A^T sigma
+        start_vector = np.zeros(b * n)
+        start_vector[np.arange(b) * n + batch] = 1
+        dag_transposed = sparse.csr_array((np.ones(len(edges)), (dag_targets, dag_sources)), shape=(b * n, b * n))
+        sigma = start_vector
+        while True:
+            next_sigma = start_vector + dag_transposed @ sigma
+            if np.array_equal(next_sigma, sigma):
+                break
+            sigma = next_sigma
+
+        # Dependencies: delta[v] = sum over DAG successors w of sigma[v] / sigma[w] * (1 + delta[w])
+        shares = sparse.csr_array((sigma[dag_sources] / sigma[dag_targets], (dag_sources, dag_targets)), shape=(b * n, b * n))
+        delta = np.zeros(b * n)
+        while True:
+            next_delta = shares @ (1 + delta)
+            if np.array_equal(next_delta, delta):
+                break
+            delta = next_delta
+
+        delta = delta.reshape(b, n)
+        delta[np.arange(b), batch] = 0
+        yield batch, delta
+
+
+def sparse_betweenness_centrality(
+    graph: SparseRankGraph, normalized: bool = True, k: int = 0, epsilon: float = 0.0, seed: int | None = 42
+) -> dict[Hashable, float]:
+    """
+    Shortest path betweenness centrality on the multigraph distances, equivalent to `nx.betweenness_centrality` with weight="distance".
+
+    By default all nodes are used as sources (exact). With `k` pivots, or with the number of pivots derived from the error bound
+    `epsilon`, only a random sample of sources is used and the sums are rescaled as in networkx.
+    """
+    n = len(graph)
+    pivots = select_pivots(n, k, epsilon, seed)
+    sources = np.arange(n) if pivots is None else pivots
+    betweenness = graph.get_dependency_sums(pivots)
+
+    # Rescale as `networkx.algorithms.centrality.betweenness._rescale` (without endpoints)
+    if n - 1 < 2:
+        return graph.to_dict(betweenness)
+    k = len(sources)
+    if pivots is None:
+        scale = 1 / ((n - 1) * (n - 2)) if normalized else 1.0
+        return graph.to_dict(betweenness * scale)
+
+    if normalized:
+        scale_source = 1 / ((k - 1) * (n - 2)) if k > 1 else math.nan
+        scale_nonsource = 1 / (k * (n - 2))
+    else:
+        scale_source = (n - 1) / (k - 1) if k > 1 else math.nan
+        scale_nonsource = (n - 1) / k
+    scale = np.full(n, scale_nonsource)
+    scale[pivots] = scale_source
+    return graph.to_dict(betweenness * scale)
+
+
+def sparse_percolation_centrality(graph: SparseRankGraph, k: int = 0, epsilon: float = 0.0, seed: int | None = 42) -> dict[Hashable, float]:
+    """
+    Percolation centrality with equal percolation states on the multigraph distances, equivalent to `nx.percolation_centrality`.
+
+    Pivot sampling works as for `sparse_betweenness_centrality`, the sum over the pivots is scaled by n / k.
+    """
+    n = len(graph)
+    if n <= 2:
+        return graph.to_dict(np.zeros(n))
+
+    pivots = select_pivots(n, k, epsilon, seed)
+    sources = np.arange(n) if pivots is None else pivots
+
+    # With equal states, the percolation weight of each (source, node) pair is 1 / (n - 1)
+    percolation = graph.get_dependency_sums(pivots) / ((n - 1) * (n - 2))
+
+    if pivots is not None:
+        percolation *= n / len(sources)
+    return graph.to_dict(percolation)
@@ -0,0 +1,176 @@
+"""
+Opt-in cProfile profiles of single requests and metrics jobs.
+
+A request is profiled if it sets the header `X-Viscom-Profile: 1` or the query parameter `profile=true`.
+The profile is stored under an id, returned in the `X-Viscom-Profile-Id` header, and served by `/debug/profiles/<id>`.
+Metrics jobs submitted by a profiled request are profiled in their worker process and stored under their job id.
+
+Profiles are stored as pstats files in a directory (`VISCOM_PROFILE_DIR`), so that worker processes can store them as well
+and they can be opened with the usual tools (e.g. snakeviz).
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Viscom-Profile"
+PROFILE_ID_HEADER = "X-Viscom-Profile-Id"
+
+# Directory of the stored profiles, shared by the server and the metrics worker processes
+PROFILE_DIR = os.environ.get("VISCOM_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "viscom_profiles"))
+
+# Number of stored profiles, older profiles are deleted
+PROFILE_MAX_COUNT = 100
+
+PROFILE_SORT_KEYS = tuple(key.value for key in pstats.SortKey)
+
+_PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_\-]+$")
+
+# Only one profiler can be active per process (cProfile is process wide since Python 3.12), concurrent profile requests are not profiled
+_profiler_lock = threading.Lock()
+_active_profiler: cProfile.Profile | None = None
+
+
+def _reset_profiler() -> None:
+    # A forked worker must neither inherit the profiler nor the lock of a request that is profiled in the parent at the time of the fork
+    global _profiler_lock, _active_profiler
+    if _active_profiler is not None:
+        _active_profiler.disable()
+        _active_profiler = None
+    _profiler_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_profiler)
+
+
+def is_profile_flag(value: str | None) -> bool:
+    return value is not None and value.lower() in ("true", "1", "yes")
+
+
+def is_profile_request() -> bool:
+    """Return whether the current request asks to be profiled (header `X-Viscom-Profile` or query parameter `profile`)."""
+    return is_profile_flag(request.headers.get(PROFILE_HEADER)) or is_profile_flag(request.args.get("profile"))
+
+
+class ProfileStore:
+    """Directory of pstats files (`<id>.prof`) with their metadata (`<id>.json`), bounded by the number of profiles."""
+
+    def __init__(self, directory: str = PROFILE_DIR, max_count: int = PROFILE_MAX_COUNT):
+        self.directory = directory
+        self.max_count = max_count
+
+    def _get_path(self, profile_id: str, extension: str) -> str:
+        if not _PROFILE_ID_PATTERN.match(profile_id):
+            raise ValueError(f"Invalid profile id: {profile_id}")
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def save(self, profile_id: str, profiler: cProfile.Profile, info: dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        profiler.dump_stats(self._get_path(profile_id, "prof"))
+        with open(self._get_path(profile_id, "json"), "w") as file:
+            json.dump({"id": profile_id, "created_at": time.time(), "pid": os.getpid(), **info}, file)
+        self._prune()
+
+    def _prune(self) -> None:
+        profiles = self.list()
+        for profile in profiles[self.max_count :]:
+            self.delete(profile["id"])
+
+    def delete(self, profile_id: str) -> None:
+        for extension in ("prof", "json"):
+            try:
+                os.remove(self._get_path(profile_id, extension))
+            except FileNotFoundError:
+                pass
+
+    def list(self) -> list[dict[str, Any]]:
+        """Return the metadata of all stored profiles, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(".json") and (info := self.get_info(file_name[: -len(".json")])) is not None:
+                profiles.append(info)
+        return sorted(profiles, key=lambda info: info.get("created_at", 0), reverse=True)
+
+    def get_info(self, profile_id: str) -> dict[str, Any] | None:
+        try:
+            with open(self._get_path(profile_id, "json")) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def get_stats_path(self, profile_id: str) -> str | None:
+        path = self._get_path(profile_id, "prof")
+        return path if os.path.exists(path) else None
+
+    def render(self, profile_id: str, sort: str = "cumulative", limit: int = 50) -> str | None:
+        """Return the profile as pstats text report, sorted by `sort` and limited to the `limit` top functions."""
+        path = self.get_stats_path(profile_id)
+        if path is None:
+            return None
+        stream = io.StringIO()
+        pstats.Stats(path, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+
+profile_store = ProfileStore()
+
+
+def start_profiler() -> cProfile.Profile | None:
+    """Start a profiler, or return None if another profile is running in this process."""
+    global _active_profiler
+    if not _profiler_lock.acquire(blocking=False):
+        logger.warning("Another profile is running, the request is not profiled")
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Another profiling tool (e.g. a debugger) is active
+        _profiler_lock.release()
+        logger.warning("Could not start the profiler: %s", e)
+        return None
+    _active_profiler = profiler
+    return profiler
+
+
+def stop_profiler(profiler: cProfile.Profile, profile_id: str, info: dict[str, Any]) -> None:
+    """Stop a profiler started with `start_profiler` and store its profile."""
+    global _active_profiler
+    profiler.disable()
+    _active_profiler = None
+    _profiler_lock.release()
+    try:
+        profile_store.save(profile_id, profiler, info)
+    except OSError as e:
+        logger.error("Could not store profile %s: %s", profile_id, e)
+
+
+@contextmanager
+def profiled(profile_id: str, info: dict[str, Any], enabled: bool = True) -> Iterator[bool]:
+    """Profile the block and store the profile under `profile_id`, yields whether the block is profiled."""
+    profiler = start_profiler() if enabled else None
+    if profiler is None:
+        yield False
+        return
+    start = time.perf_counter()
+    try:
+        yield True
+    finally:
+        stop_profiler(profiler, profile_id, {**info, "duration": time.perf_counter() - start})
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable
+
+from flask import Response, request
+
+from viscom_backend.transport import get_response_mimetype
+
+# Optional brotli support, gzip is always available
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Bump this if the generated output changes for the same input, so that clients drop their cached versions
+CACHE_VERSION = 1
+
+RESPONSE_CACHE_MAX_ENTRIES = 64
+RESPONSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Responses smaller than this are not worth compressing
+COMPRESSION_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def get_supported_encodings() -> list[str]:
+    """Return the content encodings that can be produced with the installed libraries (preferred first)."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def get_accepted_encoding() -> str | None:
+    """Return the best content encoding accepted by the client of the current request."""
+    return request.accept_encodings.best_match(get_supported_encodings())
+
+
+@lru_cache(maxsize=256)
+def _get_file_hash(file_path: str, mtime_ns: int, size: int) -> str:
+    sha = hashlib.sha1()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def get_file_hash(file_path: str) -> str:
+    """Return the content hash of a file. The hash is only recomputed if the file changed."""
+    stat = os.stat(file_path)
+    return _get_file_hash(file_path, stat.st_mtime_ns, stat.st_size)
+
+
+def get_cache_key(*parts: Any) -> str:
+    """Build a stable cache key for the given (JSON serializable) parts."""
+    return json.dumps([CACHE_VERSION, *parts], sort_keys=True, default=str)
+
+
+class CachedResponse:
+    """Serialized response body together with its lazily created compressed variants."""
+
+    def __init__(self, etag: str, body: bytes, mimetype: str):
+        self.etag: str = etag
+        self.mimetype: str = mimetype
+        self.variants: dict[str | None, bytes] = {None: body}
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return sum(len(body) for body in self.variants.values())
+
+    def get_body(self, encoding: str | None) -> bytes:
+        if encoding not in self.variants:
+            with self._lock:
+                if encoding not in self.variants:
+                    self.variants[encoding] = compress(self.variants[None], encoding)  # type: ignore
+        return self.variants[encoding]
+
+    def to_response(self, encoding: str | None) -> Response:
+        if len(self.variants[None]) < COMPRESSION_MIN_SIZE:
+            encoding = None
+        response = Response(self.get_body(encoding), mimetype=self.mimetype)
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+        response.set_etag(self.etag)
+        response.vary.update(["Accept", "Accept-Encoding"])
+        return response
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of serialized responses, bounded by entry count and total byte size."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return sum(entry.size for entry in self.entries.values())
+
+    def get(self, etag: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self.entries.get(etag)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(etag)
+            return entry
+
+    def put(self, entry: CachedResponse) -> None:
+        with self._lock:
+            self.entries[entry.etag] = entry
+            self.entries.move_to_end(entry.etag)
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self.entries) > self.max_entries or (len(self.entries) > 1 and self.size > self.max_bytes):
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def create_cached_response(cache_key: str, create_response: Callable[[], Response]) -> Response:
+    """
+    Return the response for a deterministic request.
+
+    The ETag is derived from the cache key and the negotiated response mimetype.
+    Conditional requests with a matching If-None-Match header are answered with 304 without creating the response at all.
+    Otherwise the serialized response is taken from (or stored in) the LRU cache and compressed according to the Accept-Encoding header.
+    """
+    mimetype = get_response_mimetype()
+    etag = hashlib.sha1(f"{cache_key}|{mimetype}".encode("utf-8")).hexdigest()
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.vary.update(["Accept", "Accept-Encoding"])
+        return response
+
+    entry = response_cache.get(etag)
+    if entry is None:
+        response = create_response()
+        if response.status_code != 200:
+            return response
+        entry = CachedResponse(etag, response.get_data(), response.mimetype)
+        response_cache.put(entry)
+
+    response = entry.to_response(get_accepted_encoding())
+    # Re-insert the entry to account for a newly created compressed variant in the byte bound
+    response_cache.put(entry)
+    return response
+
+
+def compress_response(response: Response) -> Response:
+    """Compress a response according to the Accept-Encoding header of the current request (to be used as `after_request` hook)."""
+    if (
+        response.direct_passthrough
+        or response.status_code < 200
+        or response.status_code >= 300
+        or "Content-Encoding" in response.headers
+        or response.content_length is None
+        or response.content_length < COMPRESSION_MIN_SIZE
+    ):
+        return response
+
+    encoding = get_accepted_encoding()
+    if encoding is None:
+        return response
+
+    response.set_data(compress(response.get_data(), encoding))
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import networkx as nx
+from flask import Response, request
+from werkzeug.exceptions import BadRequest
+
+from viscom_backend.instrumentation import timed
+
+# Optional fast serializers, the backend falls back to the standard library if they are missing
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+MIME_JSON = "application/json"
+MIME_MSGPACK = "application/msgpack"
+MIME_MSGPACK_LEGACY = "application/x-msgpack"
+MIME_COLUMNAR_JSON = "application/vnd.viscom.columnar+json"
+MIME_COLUMNAR_MSGPACK = "application/vnd.viscom.columnar+msgpack"
+
+COLUMNAR_FORMAT = "columnar"
+
+
+def get_supported_mimetypes() -> list[str]:
+    """Return the response mimetypes that can be served with the installed serializers (preferred first)."""
+    mimetypes = [MIME_JSON, MIME_COLUMNAR_JSON]
+    if msgpack is not None:
+        mimetypes += [MIME_MSGPACK, MIME_MSGPACK_LEGACY, MIME_COLUMNAR_MSGPACK]
+    return mimetypes
+
+
+####################################################################################################
+# Encoding / decoding of raw payloads
+####################################################################################################
+
+
+def _json_default(obj: Any) -> Any:
+    # Numpy scalars and sets are the only non-JSON types that show up in our payloads
+    if hasattr(obj, "item"):
+        return obj.item()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Serialize an object to JSON bytes, using orjson if available."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # e.g. integers exceeding 64 bit, let the standard library handle these cases
+            pass
+    return json.dumps(obj, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def loads_json(data: bytes | str) -> Any:
+    """Parse JSON bytes, using orjson if available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_msgpack(obj: Any) -> bytes:
+    if msgpack is None:
+        raise RuntimeError("MessagePack support requires the 'msgpack' package")
+    return msgpack.packb(obj, default=_json_default, use_bin_type=True)
+
+
+def loads_msgpack(data: bytes) -> Any:
+    if msgpack is None:
+        raise RuntimeError("MessagePack support requires the 'msgpack' package")
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+####################################################################################################
+# Graph <-> payload conversion
+####################################################################################################
+
+
+def graph_to_node_link(graph: nx.Graph) -> dict[str, Any]:
+    """Equivalent of `nx.node_link_data(graph, edges="links")` without the per-call argument validation."""
+    multigraph = graph.is_multigraph()
+    data: dict[str, Any] = {
+        "directed": graph.is_directed(),
+        "multigraph": multigraph,
+        "graph": graph.graph,
+        "nodes": [{**node_data, "id": node} for node, node_data in graph.nodes(data=True)],
+    }
+    if multigraph:
+        data["links"] = [{**d, "source": u, "target": v, "key": k} for u, v, k, d in graph.edges(keys=True, data=True)]
+    else:
+        data["links"] = [{**d, "source": u, "target": v} for u, v, d in graph.edges(data=True)]
+    return data
+
+
+def _create_empty_graph(directed: bool, multigraph: bool) -> nx.Graph:
+    if multigraph:
+        return nx.MultiDiGraph() if directed else nx.MultiGraph()
+    return nx.DiGraph() if directed else nx.Graph()
+
+
+def node_link_to_graph(data: dict[str, Any], directed: bool = False, multigraph: bool = True) -> nx.Graph:
+    """
+    Build a graph from node-link data (with "links" as edge key).
+
+    As for `nx.node_link_graph`, the "directed" and "multigraph" flags of the data take precedence over the arguments.
+    Nodes and edges are inserted in bulk instead of one by one.
+    """
+    multigraph = data.get("multigraph", multigraph)
+    directed = data.get("directed", directed)
+    graph = _create_empty_graph(directed, multigraph)
+    graph.graph.update(data.get("graph", {}))
+
+    graph.add_nodes_from((node["id"], {k: v for k, v in node.items() if k != "id"}) for node in data.get("nodes", []))
+
+    links = data.get("links", data.get("edges", []))
+    if multigraph:
+        graph.add_edges_from(
+            (link["source"], link["target"], link.get("key"), {k: v for k, v in link.items() if k not in ("source", "target", "key")}) for link in links
+        )
+    else:
+        graph.add_edges_from((link["source"], link["target"], {k: v for k, v in link.items() if k not in ("source", "target")}) for link in links)
+
+    return graph
+
+
+def graph_to_columnar(graph: nx.Graph) -> dict[str, Any]:
+    """
+    Convert a graph into a columnar representation.
+
+    Node ids are stored once, edges reference them by index.
+    Every attribute becomes a column, missing attribute values are stored as None.
+    """
+    node_ids = list(graph.nodes)
+    node_index = {node: i for i, node in enumerate(node_ids)}
+
+    node_columns: dict[str, list[Any]] = {}
+    for i, (_, node_data) in enumerate(graph.nodes(data=True)):
+        for attr, value in node_data.items():
+            if attr not in node_columns:
+                node_columns[attr] = [None] * len(node_ids)
+            node_columns[attr][i] = value
+
+    multigraph = graph.is_multigraph()
+    edges = list(graph.edges(keys=True, data=True)) if multigraph else [(u, v, None, d) for u, v, d in graph.edges(data=True)]
+
+    sources = [node_index[u] for u, _, _, _ in edges]
+    targets = [node_index[v] for _, v, _, _ in edges]
+    edge_columns: dict[str, list[Any]] = {}
+    for i, (_, _, _, edge_data) in enumerate(edges):
+        for attr, value in edge_data.items():
+            if attr not in edge_columns:
+                edge_columns[attr] = [None] * len(edges)
+            edge_columns[attr][i] = value
+
+    links: dict[str, Any] = {"source": sources, "target": targets, "attributes": edge_columns}
+    if multigraph:
+        links["key"] = [k for _, _, k, _ in edges]
+
+    return {
+        "format": COLUMNAR_FORMAT,
+        "directed": graph.is_directed(),
+        "multigraph": multigraph,
+        "graph": graph.graph,
+        "nodes": {"id": node_ids, "attributes": node_columns},
+        "links": links,
+    }
+
+
+def columnar_to_graph(data: dict[str, Any], directed: bool = False, multigraph: bool = True) -> nx.Graph:
+    """Build a graph from the columnar representation created by `graph_to_columnar`. None values are treated as missing attributes."""
+    multigraph = data.get("multigraph", multigraph)
+    directed = data.get("directed", directed)
+    graph = _create_empty_graph(directed, multigraph)
+    graph.graph.update(data.get("graph", {}))
+
+    node_ids: list[Any] = data["nodes"]["id"]
+    node_columns: dict[str, list[Any]] = data["nodes"].get("attributes", {})
+    node_attrs: list[dict[str, Any]] = [{} for _ in node_ids]
+    for attr, column in node_columns.items():
+        for i, value in enumerate(column):
+            if value is not None:
+                node_attrs[i][attr] = value
+    graph.add_nodes_from(zip(node_ids, node_attrs))
+
+    links = data["links"]
+    sources: list[int] = links["source"]
+    targets: list[int] = links["target"]
+    edge_attrs: list[dict[str, Any]] = [{} for _ in sources]
+    for attr, column in links.get("attributes", {}).items():
+        for i, value in enumerate(column):
+            if value is not None:
+                edge_attrs[i][attr] = value
+
+    if multigraph:
+        keys = links.get("key") or [None] * len(sources)
+        graph.add_edges_from((node_ids[s], node_ids[t], k, d) for s, t, k, d in zip(sources, targets, keys, edge_attrs))
+    else:
+        graph.add_edges_from((node_ids[s], node_ids[t], d) for s, t, d in zip(sources, targets, edge_attrs))
+
+    return graph
+
+
+def is_columnar(data: Any) -> bool:
+    return isinstance(data, dict) and data.get("format") == COLUMNAR_FORMAT
+
+
+####################################################################################################
+# Flask helpers
+####################################################################################################
+
+
+@timed("transport.parse")
+def get_request_data() -> Any:
+    """Decode the body of the current request according to its content type (JSON, MessagePack or columnar variants)."""
+    mimetype = request.mimetype
+    body = request.get_data(cache=True)
+
+    try:
+        if mimetype in (MIME_MSGPACK, MIME_MSGPACK_LEGACY, MIME_COLUMNAR_MSGPACK):
+            return loads_msgpack(body)
+        if not body:
+            return None
+        return loads_json(body)
+    except RuntimeError as e:
+        raise BadRequest(str(e))
+    except ValueError as e:
+        # json.JSONDecodeError and orjson.JSONDecodeError are both subclasses of ValueError
+        raise BadRequest(f"Failed to decode request body: {e}")
+
+
+@timed("transport.parse_graph")
+def get_request_graph(directed: bool = False, multigraph: bool = True) -> nx.Graph:
+    """Decode the body of the current request directly into a graph."""
+    data = get_request_data()
+    if not isinstance(data, dict):
+        raise BadRequest("Request body must contain a graph")
+    if is_columnar(data):
+        return columnar_to_graph(data, directed=directed, multigraph=multigraph)
+    return node_link_to_graph(data, directed=directed, multigraph=multigraph)
+
+
+def get_response_mimetype() -> str:
+    """Return the mimetype negotiated from the Accept header of the current request."""
+    return request.accept_mimetypes.best_match(get_supported_mimetypes(), default=MIME_JSON) or MIME_JSON
+
+
+@timed("transport.serialize")
+def create_response(obj: Any, status: int = 200) -> Response:
+    """Create a response for a plain object, encoded as JSON or MessagePack depending on the Accept header."""
+    mimetype = get_response_mimetype()
+    if mimetype in (MIME_MSGPACK, MIME_MSGPACK_LEGACY, MIME_COLUMNAR_MSGPACK):
+        return Response(dumps_msgpack(obj), status=status, mimetype=MIME_MSGPACK)
+    return Response(dumps_json(obj), status=status, mimetype=MIME_JSON)
+
+
+@timed("transport.serialize_graph")
+def create_graph_response(graph: nx.Graph, status: int = 200) -> Response:
+    """Create a response for a graph. Clients can request the columnar representation via the Accept header."""
+    mimetype = get_response_mimetype()
+    if mimetype == MIME_COLUMNAR_MSGPACK:
+        return Response(dumps_msgpack(graph_to_columnar(graph)), status=status, mimetype=MIME_COLUMNAR_MSGPACK)
+    if mimetype in (MIME_MSGPACK, MIME_MSGPACK_LEGACY):
+        return Response(dumps_msgpack(graph_to_node_link(graph)), status=status, mimetype=MIME_MSGPACK)
+    if mimetype == MIME_COLUMNAR_JSON:
+        return Response(dumps_json(graph_to_columnar(graph)), status=status, mimetype=MIME_COLUMNAR_JSON)
+    return Response(dumps_json(graph_to_node_link(graph)), status=status, mimetype=MIME_JSON)
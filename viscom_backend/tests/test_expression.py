@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from viscom_backend.generator.expression import (
+    MAX_EXPONENT,
+    ExpressionError,
+    compile_expression,
+    evaluate_expression,
+)
+
+
+@pytest.mark.parametrize(
+    "expression, n, expected",
+    [
+        ("n", 10, 10),
+        ("sqrt(n) / 2 + 1", 16, 3),
+        ("-n ** 2", 3, -9),
+        ("max(1, floor(log2(n)))", 8, 3),
+        ("2 ** 10", None, 1024),
+        (5, None, 5),
+    ],
+)
+def test_evaluate(expression, n, expected):
+    assert evaluate_expression(expression, n) == pytest.approx(expected)
+
+
+def test_requires_n():
+    with pytest.raises(ExpressionError):
+        evaluate_expression("n + 1")
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "__import__('os').system('true')",
+        "().__class__.__bases__[0].__subclasses__()",
+        "open('/etc/passwd')",
+        "n.real",
+        "[n for n in range(10)]",
+        "lambda: 1",
+        "max(n, key=abs)",
+        "'a' * 10",
+        "x + 1",
+        "n if n else 1",
+        "n +",
+    ],
+)
+def test_rejects_non_arithmetic(expression):
+    with pytest.raises(ExpressionError):
+        compile_expression(expression)(3)
+
+
+def test_rejects_large_exponent():
+    with pytest.raises(ExpressionError):
+        evaluate_expression(f"2 ** {MAX_EXPONENT + 1}")
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "9 ** 9 ** 9",
+        "(((9 ** 64) ** 64) ** 64) ** 64",
+        "((((9 ** 64) ** 64) ** 64) ** 64) ** 64",
+        "(n ** 64) ** 64",
+    ],
+)
+def test_rejects_huge_results_quickly(expression):
+    start = time.perf_counter()
+    with pytest.raises(ExpressionError):
+        evaluate_expression(expression, 1000)
+    assert time.perf_counter() - start < 1
+
+
+def test_allows_moderate_powers():
+    assert evaluate_expression("2 ** 64") == 2**64
+    assert evaluate_expression("0.5 ** 64") == 0.5**64
+    assert evaluate_expression("(-2) ** 63") == (-2) ** 63
@@ -0,0 +1,122 @@
+import warnings
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from viscom_backend.noderank.combined_ranks import NodeRankContext, calculate_noderank, calculate_nx_noderank
+from viscom_backend.noderank.node_rank_methods import node_rank_methods_config
+from viscom_backend.noderank.sparse_rank import (
+    SparseRankGraph,
+    sparse_betweenness_centrality,
+    sparse_katz_centrality,
+    sparse_percolation_centrality,
+)
+
+
+def get_weighted_multigraph(node_count: int, seed: int) -> nx.MultiDiGraph:
+    """Random multigraph with parallel edges, self loops and integer distances (so that there are ties between shortest paths)."""
+    rng = np.random.default_rng(seed)
+    graph = nx.MultiDiGraph()
+    graph.add_nodes_from(f"n{i}" for i in range(node_count))
+    for _ in range(node_count * 3):
+        source, target = rng.integers(node_count, size=2)
+        distance = float(rng.integers(1, 4))
+        graph.add_edge(f"n{source}", f"n{target}", weight=1 / distance, distance=distance)
+    return graph
+
+
+def assert_ranks_equal(actual: dict, expected: dict) -> None:
+    assert actual.keys() == expected.keys()
+    for node, value in expected.items():
+        assert actual[node] == pytest.approx(value, rel=1e-12, abs=1e-15), node
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("method", ["betweenness_centrality", "percolation_centrality"])
+def test_exact_matches_networkx(method, seed):
+    graph = get_weighted_multigraph(30, seed)
+    expected = calculate_nx_noderank(method, graph, {})
+    actual = calculate_noderank(NodeRankContext(graph), method, {})
+    assert_ranks_equal(actual, expected)
+
+
+SPARSE_METHODS = [method for method, config in node_rank_methods_config.items() if "sparse_method" in config]
+
+
+# Pivot parameters of the approximations, which networkx does not support (their defaults compute the exact value)
+PIVOT_PARAMS = {"k", "epsilon", "seed"}
+
+
+def get_default_params(method: str) -> dict:
+    return {param["key"]: param["default"] for param in node_rank_methods_config[method]["params"] if param["key"] not in PIVOT_PARAMS}
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("use_defaults", [False, True])
+@pytest.mark.parametrize("method", SPARSE_METHODS)
+def test_sparse_method_matches_networkx(method, use_defaults, seed):
+    graph = get_weighted_multigraph(30, seed)
+    # The simple graph conversion of the networkx reference drops isolated nodes, which changes e.g. the closeness normalization
+    graph.remove_nodes_from(list(nx.isolates(graph)))
+    params = get_default_params(method) if use_defaults else {}
+    expected = calculate_nx_noderank(method, graph, params)
+    actual = calculate_noderank(NodeRankContext(graph), method, params)
+    assert_ranks_equal(actual, expected)
+
+
+def test_katz_divergence_raises():
+    graph = get_weighted_multigraph(30, 0)
+    with pytest.raises(nx.PowerIterationFailedConvergence):
+        calculate_nx_noderank("katz_centrality", graph, {"alpha": 1.0})
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        with pytest.raises(nx.PowerIterationFailedConvergence):
+            sparse_katz_centrality(SparseRankGraph(graph), alpha=1.0)
+
+
+def test_unnormalized_betweenness_matches_networkx():
+    graph = get_weighted_multigraph(25, 7)
+    expected = calculate_nx_noderank("betweenness_centrality", graph, {"normalized": False})
+    assert_ranks_equal(sparse_betweenness_centrality(SparseRankGraph(graph), normalized=False), expected)
+
+
+@pytest.mark.parametrize("node_count", [0, 1, 2, 3])
+def test_small_graphs(node_count):
+    graph = get_weighted_multigraph(node_count, 0)
+    sparse_graph = SparseRankGraph(graph)
+    assert_ranks_equal(sparse_betweenness_centrality(sparse_graph), nx.betweenness_centrality(graph, weight="distance"))
+    assert sparse_percolation_centrality(sparse_graph).keys() == set(graph.nodes)
+
+
+def test_dependencies_shared_between_methods():
+    graph = get_weighted_multigraph(20, 3)
+    sparse_graph = SparseRankGraph(graph)
+    sparse_betweenness_centrality(sparse_graph)
+    sparse_percolation_centrality(sparse_graph)
+    assert list(sparse_graph._dependency_sums) == [None]
+
+    # Exact runs use per-batch Dijkstra runs instead of building the dense all-pairs distances
+    assert sparse_graph.get_cached_shortest_path_distances(simple=False) is None
+
+
+def test_dependencies_reuse_cached_distances():
+    graph = get_weighted_multigraph(20, 5)
+    sparse_graph = SparseRankGraph(graph)
+    sparse_graph.get_shortest_path_distances(simple=False)
+    expected = calculate_nx_noderank("betweenness_centrality", graph, {})
+    assert_ranks_equal(sparse_betweenness_centrality(sparse_graph), expected)
+
+
+def test_pivots_reuse_cached_distances():
+    graph = get_weighted_multigraph(40, 1)
+    fresh = sparse_betweenness_centrality(SparseRankGraph(graph), k=10)
+
+    sparse_graph = SparseRankGraph(graph)
+    sparse_graph.get_shortest_path_distances(simple=False)
+    assert_ranks_equal(sparse_betweenness_centrality(sparse_graph, k=10), fresh)
+
+
+def test_all_pivots_is_exact():
+    graph = get_weighted_multigraph(15, 2)
+    assert_ranks_equal(sparse_betweenness_centrality(SparseRankGraph(graph), k=15), nx.betweenness_centrality(graph, weight="distance"))